@@ -0,0 +1,124 @@
+import asyncio
+import contextvars
+import json
+import logging
+import os
+from typing import List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from dotenv import load_dotenv
+from app.dao.dao_contact import ContactDAO
+from app.database.database import SessionLocal
+
+load_dotenv()
+
+CONTACT_BATCH_SIZE = int(os.getenv("CONTACT_BATCH_SIZE", "200"))
+CONTACT_FLUSH_INTERVAL = float(os.getenv("CONTACT_FLUSH_INTERVAL", "1"))
+CONTACT_QUEUE_MAX_SIZE = int(os.getenv("CONTACT_QUEUE_MAX_SIZE", "10000"))
+CONTACT_WRITE_RETRIES = int(os.getenv("CONTACT_WRITE_RETRIES", "3"))
+CONTACT_RETRY_BACKOFF = float(os.getenv("CONTACT_RETRY_BACKOFF", "2"))
+CONTACT_DRAIN_TIMEOUT = float(os.getenv("CONTACT_DRAIN_TIMEOUT", "10"))
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class ContactWriteBehind:
+
+    def __init__(self, session_factory: async_sessionmaker, batch_size: int, flush_interval: float, max_size: int):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self.closed = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+
+        if self._task is not None and self._task.done():
+            # Only a bug gets here, since _write handles every error; restart so submissions are not stranded
+            if not self._task.cancelled() and self._task.exception() is not None:
+                logger.error("Contact writer stopped, restarting: %r", self._task.exception())
+            self._task = None
+        if self._task is None:
+            # Start from an empty context so request-scoped state does not leak into the writer.
+            self._task = contextvars.Context().run(asyncio.create_task, self._run())
+
+    def submit(self, contact: dict):
+
+        if self.closed:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Shutting down, please retry")
+        self.start()
+        try:
+            self.queue.put_nowait(contact)
+        except asyncio.QueueFull as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many contact submissions, please retry",
+                headers={"Retry-After": str(max(int(self.flush_interval), 1))},
+            ) from e
+
+    async def _run(self):
+
+        loop = asyncio.get_running_loop()
+        while True:
+            # drain() may not have found room for the stop marker; closed with nothing left means done as well
+            if self.closed and self.queue.empty():
+                return
+            item = await self.queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            stopping = False
+            while len(batch) < self.batch_size and not (self.closed and self.queue.empty()):
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout=max(deadline - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._write(batch)
+            if stopping:
+                return
+
+    async def _write(self, batch: List[dict]):
+
+        for attempt in range(1, CONTACT_WRITE_RETRIES + 1):
+            try:
+                async with self.session_factory() as db:
+                    await ContactDAO(db).create_contacts(batch)
+                return
+            except Exception as e:
+                # Not only SQLAlchemyError: asyncpg raises plain OSError subclasses while the database is down
+                logger.warning("Contact batch of %d failed (attempt %d): %r", len(batch), attempt, e)
+                await asyncio.sleep(min(CONTACT_RETRY_BACKOFF * 2 ** (attempt - 1), 30))
+
+        logger.error("Dropping %d contact submissions: %s", len(batch), json.dumps(batch, default=str))
+
+    async def drain(self, timeout: float = CONTACT_DRAIN_TIMEOUT):
+
+        self.closed = True
+        if self._task is None:
+            return
+        self.start()
+        try:
+            self.queue.put_nowait(_STOP)
+        except asyncio.QueueFull:
+            # The writer stops by itself once it has emptied the queue, since closed is set
+            pass
+        try:
+            await asyncio.wait_for(self._task, timeout=timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+            logger.error("Contact queue did not drain in %ss, %d submissions lost", timeout, self.queue.qsize())
+        except Exception as e:
+            logger.error("Contact writer failed while draining, %d submissions lost: %r", self.queue.qsize(), e)
+
+
+contact_queue = ContactWriteBehind(SessionLocal, CONTACT_BATCH_SIZE, CONTACT_FLUSH_INTERVAL, CONTACT_QUEUE_MAX_SIZE)
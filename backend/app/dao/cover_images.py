@@ -0,0 +1,232 @@
+import asyncio
+import contextvars
+import importlib
+import logging
+import os
+import re
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Protocol, Tuple
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from dotenv import load_dotenv
+from app.dao.dao_cover_image import CoverImageDAO
+from app.database.database import SessionLocal
+from app.monitoring.metrics import cover_image_lookups_total
+
+load_dotenv()
+
+PEXELS_API_KEY = os.getenv("PEXELS_API_KEY", "")
+# pexels, stub, or "package.module:ClassName" for another provider; unset picks pexels when there is a key
+COVER_IMAGE_PROVIDER = os.getenv("COVER_IMAGE_PROVIDER") or ("pexels" if PEXELS_API_KEY else "stub")
+COVER_IMAGE_TTL_HOURS = float(os.getenv("COVER_IMAGE_TTL_HOURS", "168"))
+COVER_IMAGE_MISS_TTL_HOURS = float(os.getenv("COVER_IMAGE_MISS_TTL_HOURS", "24"))
+COVER_IMAGE_CACHE_SIZE = int(os.getenv("COVER_IMAGE_CACHE_SIZE", "2048"))
+COVER_IMAGE_CONCURRENCY = int(os.getenv("COVER_IMAGE_CONCURRENCY", "4"))
+COVER_IMAGE_TIMEOUT = float(os.getenv("COVER_IMAGE_TIMEOUT", "5"))
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def cover_term(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip().casefold()[:200]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class CoverImageProvider(Protocol):
+
+    name: str
+    # False keeps the provider's answers in memory only, so they never outlive a switch to a real provider
+    persist: bool
+
+    async def search(self, term: str) -> Optional[str]:
+        """Returns an image URL, or None when there is none. Raises when the lookup itself failed."""
+
+    async def close(self):
+        """Releases whatever the provider holds open."""
+
+
+class PexelsProvider:
+
+    name = "pexels"
+    persist = True
+    SEARCH_URL = "https://api.pexels.com/v1/search"
+
+    def __init__(self, api_key: str = PEXELS_API_KEY, timeout: float = COVER_IMAGE_TIMEOUT):
+        if not api_key:
+            raise ValueError("COVER_IMAGE_PROVIDER=pexels needs PEXELS_API_KEY")
+        self.api_key = api_key
+        self.timeout = timeout
+        self._client = None
+
+    async def search(self, term: str) -> Optional[str]:
+
+        if self._client is None:
+            # Imported on first use so workers that never miss the cache do not pay for it at startup
+            import httpx
+            self._client = httpx.AsyncClient(timeout=self.timeout, headers={"Authorization": self.api_key})
+        response = await self._client.get(self.SEARCH_URL, params={"query": term, "per_page": 1})
+        response.raise_for_status()
+        photos = response.json().get("photos") or []
+        return photos[0]["src"]["large"] if photos else None
+
+    async def close(self):
+
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class StubProvider:
+
+    # Answers from a dict and never touches the network; for tests and for running without an API key
+    name = "stub"
+    persist = False
+
+    def __init__(self, images: Optional[Dict[str, str]] = None):
+        self.images = images or {}
+        self.calls: List[str] = []
+
+    async def search(self, term: str) -> Optional[str]:
+
+        self.calls.append(term)
+        return self.images.get(term)
+
+    async def close(self):
+        pass
+
+
+PROVIDERS = {"pexels": PexelsProvider, "stub": StubProvider}
+
+
+def load_provider(name: str) -> CoverImageProvider:
+
+    if name in PROVIDERS:
+        return PROVIDERS[name]()
+    module, _, attribute = name.partition(":")
+    if not attribute:
+        raise ValueError(f"COVER_IMAGE_PROVIDER must be one of {', '.join(PROVIDERS)} or 'module:Class', got '{name}'")
+    return getattr(importlib.import_module(module), attribute)()
+
+
+class CoverImageResolver:
+
+    def __init__(self, session_factory: async_sessionmaker, provider: CoverImageProvider, size: int, ttl: timedelta, miss_ttl: timedelta, concurrency: int):
+        self.session_factory = session_factory
+        self.provider = provider
+        self.size = size
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self.entries: "OrderedDict[str, Tuple[Optional[str], datetime]]" = OrderedDict()
+        self.inflight: Dict[str, asyncio.Task] = {}
+        self._limit = asyncio.Semaphore(concurrency)
+
+    def _expires(self, url: Optional[str], fetched_at: datetime) -> datetime:
+        return fetched_at + (self.ttl if url else self.miss_ttl)
+
+    def _remember(self, term: str, url: Optional[str], fetched_at: datetime):
+
+        if self.size <= 0:
+            return
+        self.entries[term] = (url, self._expires(url, fetched_at))
+        self.entries.move_to_end(term)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def _cached(self, term: str, now: datetime) -> Tuple[bool, Optional[str]]:
+
+        entry = self.entries.get(term)
+        if entry is None:
+            return False, None
+        if entry[1] <= now:
+            del self.entries[term]
+            return False, None
+        self.entries.move_to_end(term)
+        return True, entry[0]
+
+    async def _search(self, term: str) -> Tuple[Optional[str], bool]:
+
+        async with self._limit:
+            try:
+                url = await self.provider.search(term)
+            except Exception as e:
+                # Not remembered, so the next page view retries
+                logger.warning("Cover image lookup for %r failed: %s", term, e)
+                return None, False
+        self._remember(term, url, _now())
+        return url, True
+
+    def _fetch(self, term: str) -> Tuple[asyncio.Task, bool]:
+
+        task = self.inflight.get(term)
+        if task is not None:
+            return task, False
+        # Its own task, so one request giving up does not cancel the lookup others are waiting on
+        task = contextvars.Context().run(asyncio.create_task, self._search(term))
+        self.inflight[term] = task
+        task.add_done_callback(lambda _: self.inflight.pop(term, None))
+        return task, True
+
+    async def resolve(self, terms: Iterable[str]) -> Dict[str, Optional[str]]:
+
+        now = _now()
+        found: Dict[str, Optional[str]] = {}
+        missing = []
+        for term in dict.fromkeys(terms):
+            hit, url = self._cached(term, now)
+            if hit:
+                found[term] = url
+            else:
+                missing.append(term)
+        cover_image_lookups_total.inc(len(found), source="memory")
+        if not missing:
+            return found
+
+        # Short sessions on either side of the provider call, so no pooled connection waits on the network
+        async with self.session_factory() as db:
+            rows = [row for row in await CoverImageDAO(db).get_many(missing) if self._expires(row.url, row.fetched_at) > now]
+        for row in rows:
+            self._remember(row.term, row.url, row.fetched_at)
+            found[row.term] = row.url
+        cover_image_lookups_total.inc(len(rows), source="database")
+        missing = [term for term in missing if term not in found]
+        if not missing:
+            return found
+
+        fetches = [self._fetch(term) for term in missing]
+        results = await asyncio.gather(*(asyncio.shield(task) for task, _ in fetches))
+        fetched = []
+        for term, (_, started), (url, ok) in zip(missing, fetches, results):
+            found[term] = url
+            cover_image_lookups_total.inc(source="provider" if started else "coalesced")
+            if started and ok:
+                fetched.append({"term": term, "url": url, "provider": self.provider.name, "fetched_at": now})
+
+        if fetched and getattr(self.provider, "persist", True):
+            try:
+                async with self.session_factory() as db:
+                    await CoverImageDAO(db).save_many(fetched)
+            except SQLAlchemyError as e:
+                logger.warning("Saving %d cover images failed, keeping them in memory only: %s", len(fetched), e)
+        return found
+
+    async def close(self):
+
+        for task in list(self.inflight.values()):
+            task.cancel()
+        await self.provider.close()
+
+
+cover_images = CoverImageResolver(
+    SessionLocal,
+    load_provider(COVER_IMAGE_PROVIDER),
+    COVER_IMAGE_CACHE_SIZE,
+    timedelta(hours=COVER_IMAGE_TTL_HOURS),
+    timedelta(hours=COVER_IMAGE_MISS_TTL_HOURS),
+    COVER_IMAGE_CONCURRENCY,
+)
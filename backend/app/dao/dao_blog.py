@@ -1,122 +1,300 @@
-from sqlalchemy import select
-from sqlalchemy import or_, select
+from sqlalchemy import bindparam, case, delete, insert, or_, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
 from app.models.model_blog import Blog
 from app.models.model_category import Category
-from sqlalchemy.orm import aliased
+from app.models.model_comment import Comment
+from app.models.model_user import User
+from sqlalchemy.orm import aliased, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.exc import SQLAlchemyError
+from fastapi import HTTPException, status
+from app.dao.pagination import Page, PageParams, comparable, paginate
+from app.dao.rendering import RenderedContent, render_cache, render_content
+from app.dao.feed_cache import feed_cache
+from app.database.search_index import build_search_query, build_fallback_query, highlight_snippet, search_terms
+
+BLOG_FIELDS = ("blog_id", "title", "content", "excerpt", "word_count", "reading_minutes", "is_published", "created_at", "modified_at", "revision", "user_id", "category_id")
+SUMMARY_FIELDS = tuple(field for field in BLOG_FIELDS if field != "content")
+# Evaluated in the same statement as modified_at's default and onupdate, so both get the same timestamp
+RENDERED_NOW = text("CURRENT_TIMESTAMP")
  
 class BlogDAO:
     
     def __init__(self, db: AsyncSession):
         self.db = db
+
+    def _output_fields(self, fields: Optional[Sequence[str]]) -> List[str]:
+
+        if not fields:
+            return list(BLOG_FIELDS)
+        return list(dict.fromkeys(["blog_id", "modified_at", "revision", *[field for field in fields if field in BLOG_FIELDS]]))
+
+    def _columns(self, fields: Optional[Sequence[str]]) -> Tuple[List[str], List]:
+
+        keys = self._output_fields(fields)
+        columns = [getattr(Blog, key) for key in keys]
+        if "created_at" not in keys:
+            columns.append(Blog.created_at)
+        return keys, columns
+
+    def _to_dicts(self, rows, keys: Sequence[str]) -> List[dict]:
+        return [dict(zip(keys, row)) for row in rows]
+
+    async def _attach_rendering(self, blog: Blog) -> Blog:
+
+        rendered = render_cache.get(blog.content)
+        if rendered is None:
+            if blog.rendered_at == blog.modified_at:
+                stored = (await self.db.execute(
+                    select(Blog.content_html, Blog.search_text).filter(Blog.blog_id == blog.blog_id)
+                )).first()
+                rendered = RenderedContent(stored.content_html, blog.excerpt, stored.search_text, blog.word_count, blog.reading_minutes)
+            else:
+                # Written before rendering was stored; backfill_renders saves it, until then this worker renders it once
+                rendered = render_content(blog.content)
+            render_cache.put(blog.content, rendered)
+        for key, value in rendered.values().items():
+            set_committed_value(blog, key, value)
+        return blog
     
-    async def get_all_blogs(self) -> List[Blog]:
+    async def get_all_blogs(self, page: Optional[PageParams] = None, fields: Optional[Sequence[str]] = None) -> Page:
 
-        result = await self.db.execute(select(Blog).filter(Blog.is_published == True))
-        return result.scalars().all()
+        keys, columns = self._columns(fields)
+        query = select(*columns).filter(Blog.is_published == True)
+        blogs = await paginate(self.db, query, (Blog.created_at, Blog.blog_id), page or PageParams(), scalars=False)
+        blogs.items = self._to_dicts(blogs.items, keys)
+        return blogs
  
     async def create_blog(self, title: str, content: str, is_published : bool, category_id : int, user_id: int):
     
+        rendered = render_content(content)
         try:
-            new_blog = Blog(title = title, content = content, is_published = is_published, category_id = category_id, user_id = user_id)
-            self.db.add(new_blog)
+            result = await self.db.execute(
+                insert(Blog)
+                .values(title = title, content = content, **rendered.values(), rendered_at = RENDERED_NOW, is_published = is_published, category_id = category_id, user_id = user_id)
+                .returning(*Blog.__table__.columns)
+            )
+            new_blog = result.first()
             await self.db.commit()
-            await self.db.refresh(new_blog)
+            render_cache.put(content, rendered)
+            await feed_cache.blogs_changed(self.db, [new_blog.blog_id])
             return new_blog
         except SQLAlchemyError as e:
             await self.db.rollback()
             raise e
  
+    async def create_blogs(self, blogs: List[dict], user_id: int) -> List:
+
+        try:
+            rendered = [render_content(blog["content"]) for blog in blogs]
+            rows = [{**blog, **render.values(), "user_id": user_id} for blog, render in zip(blogs, rendered)]
+            result = await self.db.execute(
+                insert(Blog).values(rendered_at=RENDERED_NOW).returning(*Blog.__table__.columns, sort_by_parameter_order=True),
+                rows
+            )
+            new_blogs = result.all()
+            await self.db.commit()
+            for blog, render in zip(blogs, rendered):
+                render_cache.put(blog["content"], render)
+            await feed_cache.blogs_changed(self.db, [blog.blog_id for blog in new_blogs])
+            return new_blogs
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise e
+
+    async def get_blogs_by_ids(self, blog_ids: Sequence[int], fields: Optional[Sequence[str]] = None) -> List:
+
+        keys, columns = self._columns(fields)
+        result = await self.db.execute(select(*columns).filter(Blog.blog_id.in_(blog_ids)))
+        by_id = {blog["blog_id"]: blog for blog in self._to_dicts(result.all(), keys)}
+        return [by_id[blog_id] for blog_id in dict.fromkeys(blog_ids) if blog_id in by_id]
+ 
     async def get_blogs_by_id(self, blog_id: int):
 
         result = await self.db.execute( select(Blog).filter(Blog.blog_id == blog_id))
-        return result.scalars().first()
+        blog = result.scalars().first()
+        if blog is not None:
+            await self._attach_rendering(blog)
+        return blog
  
-    async def get_blogs_by_user(self, user_id: int):
+    async def get_blog_detail(self, blog_id: int, comments_page: Optional[PageParams] = None) -> Tuple[Optional[Blog], Optional[Page]]:
+
+        result = await self.db.execute(
+            select(Blog)
+            .options(joinedload(Blog.user).load_only(User.id, User.username), joinedload(Blog.category))
+            .filter(Blog.blog_id == blog_id)
+        )
+        blog = result.scalars().first()
+        if blog is None:
+            return None, None
 
-        result = await self.db.execute( select(Blog).filter(Blog.user_id == user_id))
+        comments = await paginate(
+            self.db,
+            select(Comment).where(Comment.blog_id == blog_id),
+            (Comment.created_at, Comment.comment_id),
+            comments_page or PageParams(),
+            descending=False
+        )
+        set_committed_value(blog, "comments", comments.items)
+        return await self._attach_rendering(blog), comments
+ 
+    async def get_blogs_by_user(self, user_id: int, page: Optional[PageParams] = None, fields: Optional[Sequence[str]] = None) -> Page:
 
-        return result.scalars().all()
+        keys, columns = self._columns(fields)
+        query = select(*columns).filter(Blog.user_id == user_id)
+        blogs = await paginate(self.db, query, (Blog.created_at, Blog.blog_id), page or PageParams(), scalars=False)
+        blogs.items = self._to_dicts(blogs.items, keys)
+        return blogs
  
-    async def update_blog(self, blog_id: int, title: str, is_published : bool, content: str, category_id : int):
+    async def _raise_missing_or_forbidden(self, blog_id: int, action: str):
+
+        owner = await self.db.scalar(select(Blog.user_id).filter(Blog.blog_id == blog_id))
+        if owner is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Blog not found")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f"Not authorized to {action} this blog")
+
+    async def update_blog(self, blog_id: int, user_id: int, title: str, is_published : bool, content: str, category_id : int):
+
+        values = {}
+        rendered = None
+        if title:
+            values["title"] = title
+        if content:
+            rendered = render_content(content)
+            values.update(content=content, **rendered.values(), rendered_at=RENDERED_NOW)
+        else:
+            # Other edits still move modified_at, so a rendering that was current stays current
+            values["rendered_at"] = case((Blog.rendered_at == Blog.modified_at, RENDERED_NOW), else_=Blog.rendered_at)
+        if is_published is not None:
+            values["is_published"] = is_published
+        if category_id:
+            values["category_id"] = category_id
 
         try :
-            blog = await self.get_blogs_by_id(blog_id)
-            if blog:
-                blog.title = title if title else blog.title 
-                blog.content = content if content else blog.content
-                blog.is_published = is_published
-                blog.category_id = category_id if category_id else blog.category_id
-                await self.db.commit()
-                await self.db.refresh(blog)
+            result = await self.db.execute(
+                update(Blog)
+                .where(Blog.blog_id == blog_id, Blog.user_id == user_id)
+                .values(values)
+                .returning(*Blog.__table__.columns)
+            )
+            blog = result.first()
+            if blog is None:
+                await self.db.rollback()
+                await self._raise_missing_or_forbidden(blog_id, "update")
+            await self.db.commit()
+            if rendered is not None:
+                render_cache.put(content, rendered)
+            await feed_cache.blogs_changed(self.db, [blog_id])
             return blog
         except SQLAlchemyError as e:
             await self.db.rollback()
             raise e
  
-    async def delete_blog(self, blog_id: int):
+    async def delete_blog(self, blog_id: int, user_id: int):
+
+        owned = select(Blog.blog_id).where(Blog.blog_id == blog_id, Blog.user_id == user_id)
 
         try:
-            blog = await self.get_blogs_by_id(blog_id)
-            if blog:
-                await self.db.delete(blog)
-                await self.db.commit()
-            return blog
+            await self.db.execute(delete(Comment).where(Comment.blog_id.in_(owned)))
+            result = await self.db.execute(
+                delete(Blog).where(Blog.blog_id == blog_id, Blog.user_id == user_id).returning(Blog.blog_id)
+            )
+            if result.first() is None:
+                await self.db.rollback()
+                await self._raise_missing_or_forbidden(blog_id, "delete")
+            await self.db.commit()
+            feed_cache.blog_removed(blog_id)
         except SQLAlchemyError as e:
             await self.db.rollback()
             raise e
         
-    async def get_blogs_by_category_id(self, category_id : int):
+    async def get_blogs_by_category_id(self, category_id : int, page: Optional[PageParams] = None, fields: Optional[Sequence[str]] = None) -> Page:
 
         CategoryAlias = aliased(Category)
+        keys, columns = self._columns(fields)
 
-        result = await self.db.execute(
-            select(
-                Blog.blog_id, 
-                Blog.title, 
-                Blog.content, 
-                Blog.is_published, 
-                Blog.created_at, 
-                Blog.modified_at, 
-                Blog.user_id, 
-                Blog.category_id, 
-                CategoryAlias.name.label("category_name")
-            )
+        query = (
+            select(*columns, CategoryAlias.name.label("category_name"))
             .join(CategoryAlias, Blog.category_id == CategoryAlias.category_id)
             .filter(Blog.category_id == category_id)
         )
+        blogs = await paginate(self.db, query, (Blog.created_at, Blog.blog_id), page or PageParams(), scalars=False)
 
-        blogs = [
-        {
-            "blog_id": row.blog_id,
-            "title": row.title,
-            "content": row.content,
-            "is_published": row.is_published,
-            "created_at": row.created_at,
-            "modified_at": row.modified_at,
-            "user_id": row.user_id,
-            "category_id": row.category_id,
-            "name": row.category_name,
-        }
-        for row in result.all()
+        with_name = not fields or "name" in fields
+        blogs.items = [
+            {**dict(zip(keys, row)), **({"name": row.category_name} if with_name else {})}
+            for row in blogs.items
         ]
         
         return blogs
 
-    async def search_blogs( self, search_query: str):
-     
-        query = select(Blog)
+    async def stream_blogs(self, modified_since: Optional[datetime] = None, batch_size: int = 500) -> AsyncIterator[List[dict]]:
 
-        if search_query:
-            terms = search_query.strip().split()
-            search_conditions = [or_(Blog.title.ilike(f"%{term}%"), Blog.content.ilike(f"%{term}%")) for term in terms]
-            query = query.filter(*search_conditions)
+        query = select(*[getattr(Blog, key) for key in BLOG_FIELDS]).filter(Blog.is_published == True)
+        if modified_since is not None:
+            column, value = comparable(self.db, Blog.modified_at, modified_since)
+            query = query.filter(column >= value)
+
+        result = await self.db.stream(query.order_by(Blog.blog_id).execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield self._to_dicts(rows, BLOG_FIELDS)
+
+    async def backfill_renders(self, batch_size: int = 500) -> int:
+
+        # Each row is only written while it still holds the content that was rendered; an edit committed in between
+        # has rendered itself, and revision catches edits within the same second as modified_at
+        unchanged = (
+            update(Blog)
+            .where(Blog.blog_id == bindparam("b_id"), Blog.modified_at == bindparam("b_modified_at"), Blog.revision == bindparam("b_revision"))
+            .values(modified_at=Blog.modified_at, rendered_at=Blog.modified_at)
+        )
+        filled = 0
+        try:
+            while True:
+                result = await self.db.execute(
+                    select(Blog.blog_id, Blog.content, Blog.modified_at, Blog.revision)
+                    .filter(or_(Blog.rendered_at.is_(None), Blog.rendered_at != Blog.modified_at, Blog.search_text.is_(None)))
+                    .limit(batch_size)
+                )
+                rows = result.all()
+                if not rows:
+                    return filled
+                for row in rows:
+                    written = await self.db.execute(
+                        unchanged.values(render_content(row.content).values()),
+                        {"b_id": row.blog_id, "b_modified_at": row.modified_at, "b_revision": row.revision},
+                    )
+                    filled += written.rowcount
+                await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise e
+
+    async def search_blogs(self, search_query: str, limit: int = 20, offset: int = 0, fields: Optional[Sequence[str]] = None):
+
+        terms = search_terms(search_query)
+        query = None
+
+        keys, columns = self._columns(fields)
+
+        if terms:
+            query = build_search_query(self.db.bind.dialect.name, terms, limit, offset, columns)
+        if query is None:
+            query = build_fallback_query(terms, limit, offset, columns)
 
-        query = query.order_by(Blog.created_at.desc()).filter(Blog.is_published == True)
-        
         result = await self.db.execute(query)
-        blogs = result.scalars().all()
 
-        return blogs
\ No newline at end of file
+        with_rank = not fields or "rank" in fields
+        with_snippet = not fields or "snippet" in fields
+        blogs = [
+            {
+                **dict(zip(keys, row)),
+                **({"rank": row.rank} if with_rank else {}),
+                **({"snippet": highlight_snippet(row.snippet)} if with_snippet else {}),
+            }
+            for row in result.all()
+        ]
+
+        return blogs
@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Dict, List, Sequence
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.model_blog import Blog
+from app.models.model_blog_view import BlogView
+
+class BlogViewDAO:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add_views(self, counts: Sequence[dict]) -> None:
+
+        insert = sqlite.insert if self.db.bind.dialect.name == "sqlite" else postgresql.insert
+        statement = insert(BlogView)
+        statement = statement.on_conflict_do_update(
+            index_elements=[BlogView.hour, BlogView.blog_id],
+            set_={"views": BlogView.views + statement.excluded.views},
+        )
+        try:
+            await self.db.execute(statement, list(counts))
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise e
+
+    async def top_blogs(self, weights: Dict[datetime, float], limit: int) -> List:
+
+        score = func.sum(BlogView.views * case(weights, value=BlogView.hour, else_=0.0)).label("score")
+        result = await self.db.execute(
+            select(BlogView.blog_id, score, func.sum(BlogView.views).label("views"))
+            .join(Blog, Blog.blog_id == BlogView.blog_id)
+            .filter(BlogView.hour >= min(weights), Blog.is_published == True)
+            .group_by(BlogView.blog_id)
+            .order_by(score.desc(), BlogView.blog_id)
+            .limit(limit)
+        )
+        return result.all()
+
+    async def prune(self, before: datetime) -> int:
+
+        try:
+            result = await self.db.execute(delete(BlogView).where(BlogView.hour < before))
+            await self.db.commit()
+            return result.rowcount
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise e
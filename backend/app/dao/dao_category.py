@@ -1,8 +1,9 @@
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from typing import List, Optional
 from app.models.model_category import Category
+from app.dao.pagination import Page, PageParams, paginate
 
 class CategoryDAO:
     def __init__(self, db: AsyncSession):
@@ -11,21 +12,24 @@ class CategoryDAO:
     async def create_category(self, name: str, user_id : int, description: Optional[str] = None) -> Category:
 
         try:
-            new_category = Category(name=name, description=description, user_id = user_id)
-            self.db.add(new_category)
+            result = await self.db.execute(
+                insert(Category)
+                .values(name=name, description=description, user_id = user_id)
+                .returning(*Category.__table__.columns)
+            )
+            new_category = result.first()
             await self.db.commit()
-            await self.db.refresh(new_category)
             return new_category
         except SQLAlchemyError as e:
             await self.db.rollback()
             raise e
 
-    async def get_all_categories(self) -> List[Category]:
+    async def get_all_categories(self, page: Optional[PageParams] = None) -> Page:
 
         try:
-            query = select(Category)
-            result = await self.db.execute(query)
-            categories = result.scalars().all()
+            query = select(*Category.__table__.columns)
+            categories = await paginate(self.db, query, (Category.category_id,), page or PageParams(), descending=False, scalars=False)
+            categories.items = [dict(row._mapping) for row in categories.items]
             return categories
         except SQLAlchemyError as e:
             raise e
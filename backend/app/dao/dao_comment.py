@@ -1,8 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import delete, func, insert, or_, update
+from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException
-from typing import Optional
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Sequence
 from app.models.model_comment import Comment
+from app.models.model_blog import Blog
+from app.dao.pagination import DEFAULT_PAGE_SIZE, Page, PageParams, comparable, paginate
 
 class CommentDAO:
     def __init__(self, db: AsyncSession):
@@ -10,47 +15,105 @@ class CommentDAO:
 
     async def create_comment(self, content: str, blog_id: int, user_id: int) -> Comment:
 
-        new_comment = Comment(
-            content=content,
-            blog_id=blog_id,
-            user_id=user_id
+        result = await self.db.execute(
+            insert(Comment)
+            .values(content=content, blog_id=blog_id, user_id=user_id)
+            .returning(*Comment.__table__.columns)
         )
-        self.db.add(new_comment)
+        new_comment = result.first()
         await self.db.commit()
-        await self.db.refresh(new_comment)
         return new_comment
 
+    async def create_comments(self, comments: List[dict], user_id: int) -> List:
+
+        try:
+            result = await self.db.execute(insert(Comment).returning(*Comment.__table__.columns), [{**comment, "user_id": user_id} for comment in comments])
+            new_comments = result.all()
+            await self.db.commit()
+            return new_comments
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise e
+
     async def get_comment_by_id(self, comment_id: int) -> Optional[Comment]:
 
         result = await (self.db.execute(select(Comment).filter(Comment.comment_id == comment_id)))
         return result.scalars().first()
 
-    async def update_comment(self, comment_id: int, content: str) -> Optional[Comment]:
+    async def _raise_missing_or_forbidden(self, comment_id: int, action: str):
 
-        query = select(Comment).filter(Comment.comment_id == comment_id)
-        result = await self.db.execute(query)
-        comment = result.scalar_one_or_none()
-        
-        if comment:
-            comment.content = content
-            await self.db.commit()
-            await self.db.refresh(comment)
-            return comment
-        return None
+        exists = await self.db.scalar(select(Comment.comment_id).filter(Comment.comment_id == comment_id))
+        if exists is None:
+            raise HTTPException(status_code=404, detail="Comment not found")
+        raise HTTPException(status_code=403, detail=f"Not authorized to {action} this comment")
 
-    async def delete_comment(self, comment_id: int) -> None:
+    async def update_comment(self, comment_id: int, user_id: int, content: str) -> Optional[Comment]:
 
-        query = select(Comment).filter(Comment.comment_id == comment_id)
-        result = await self.db.execute(query)
-        comment = result.scalar_one_or_none()
+        result = await self.db.execute(
+            update(Comment)
+            .where(Comment.comment_id == comment_id, Comment.user_id == user_id)
+            .values(content=content if content is not None else Comment.content)
+            .returning(*Comment.__table__.columns)
+        )
+        comment = result.first()
 
-        if not comment:
-            raise HTTPException(status_code=404, detail="Comment not found")
+        if comment is None:
+            await self.db.rollback()
+            await self._raise_missing_or_forbidden(comment_id, "update")
+
+        await self.db.commit()
+        return comment
+
+    async def delete_comment(self, comment_id: int, user_id: int) -> None:
+
+        authored_blogs = select(Blog.blog_id).where(Blog.user_id == user_id)
+        result = await self.db.execute(
+            delete(Comment)
+            .where(Comment.comment_id == comment_id, or_(Comment.user_id == user_id, Comment.blog_id.in_(authored_blogs)))
+            .returning(Comment.comment_id)
+        )
+
+        if result.first() is None:
+            await self.db.rollback()
+            await self._raise_missing_or_forbidden(comment_id, "delete")
 
-        await self.db.delete(comment)
         await self.db.commit()
     
-    async def get_comments_by_blog_id(self, blog_id: int):
+    async def get_comments_by_blog_id(self, blog_id: int, page: Optional[PageParams] = None) -> Page:
+
+        query = select(*Comment.__table__.columns).where(Comment.blog_id == blog_id)
+        comments = await paginate(self.db, query, (Comment.created_at, Comment.comment_id), page or PageParams(), descending=False, scalars=False)
+        comments.items = [dict(row._mapping) for row in comments.items]
+        return comments
+
+    async def get_comments_by_blog_ids(self, blog_ids: Sequence[int], per_blog: int = DEFAULT_PAGE_SIZE) -> Dict[int, List[dict]]:
+
+        # The first per_blog comments of each blog, numbered along ix_comments_blog_created; the rest are paged per blog
+        position = func.row_number().over(
+            partition_by=Comment.blog_id, order_by=(Comment.created_at, Comment.comment_id)
+        ).label("position")
+        ranked = select(*Comment.__table__.columns, position).where(Comment.blog_id.in_(blog_ids)).subquery()
+        result = await self.db.execute(
+            select(*[ranked.c[column.name] for column in Comment.__table__.columns])
+            .where(ranked.c.position <= per_blog)
+            .order_by(ranked.c.blog_id, ranked.c.position)
+        )
+        grouped = {blog_id: [] for blog_id in blog_ids}
+        for comment in result.mappings():
+            grouped[comment["blog_id"]].append(dict(comment))
+        return grouped
+
+    async def stream_comments(self, modified_since: Optional[datetime] = None, batch_size: int = 500) -> AsyncIterator[List[dict]]:
+
+        query = (
+            select(*Comment.__table__.columns)
+            .join(Blog, Blog.blog_id == Comment.blog_id)
+            .filter(Blog.is_published == True)
+        )
+        if modified_since is not None:
+            column, value = comparable(self.db, Comment.modified_at, modified_since)
+            query = query.filter(column >= value)
 
-        result = await self.db.execute(select(Comment).where(Comment.blog_id == blog_id))
-        return result.scalars().all()
\ No newline at end of file
+        result = await self.db.stream(query.order_by(Comment.comment_id).execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield [dict(row._mapping) for row in rows]
@@ -1,6 +1,8 @@
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.model_contact import Contact
 from sqlalchemy.exc import SQLAlchemyError
+from typing import List
 
 class ContactDAO:
     def __init__(self, db: AsyncSession):
@@ -9,18 +11,25 @@ class ContactDAO:
     async def create_contact(self, name: str, email: str, subject: str, message: str) -> Contact:
 
         try:
-            new_contact = Contact(
-                name=name,
-                email=email,
-                subject=subject,
-                message=message
+            result = await self.db.execute(
+                insert(Contact)
+                .values(name=name, email=email, subject=subject, message=message)
+                .returning(*Contact.__table__.columns)
             )
-            self.db.add(new_contact)
+            new_contact = result.first()
             await self.db.commit()
-            await self.db.refresh(new_contact)
             
             return new_contact
         
         except SQLAlchemyError as e:
             await self.db.rollback()
-            raise e
\ No newline at end of file
+            raise e
+
+    async def create_contacts(self, contacts: List[dict]) -> None:
+
+        try:
+            await self.db.execute(insert(Contact), contacts)
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise e
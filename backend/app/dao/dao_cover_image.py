@@ -0,0 +1,36 @@
+from typing import List, Sequence
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.model_cover_image import CoverImage
+
+class CoverImageDAO:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_many(self, terms: Sequence[str]) -> List:
+
+        result = await self.db.execute(
+            select(CoverImage.term, CoverImage.url, CoverImage.fetched_at).filter(CoverImage.term.in_(terms))
+        )
+        return result.all()
+
+    async def save_many(self, images: Sequence[dict]) -> None:
+
+        insert = sqlite.insert if self.db.bind.dialect.name == "sqlite" else postgresql.insert
+        statement = insert(CoverImage)
+        statement = statement.on_conflict_do_update(
+            index_elements=[CoverImage.term],
+            set_={
+                "url": statement.excluded.url,
+                "provider": statement.excluded.provider,
+                "fetched_at": statement.excluded.fetched_at,
+            },
+        )
+        try:
+            await self.db.execute(statement, list(images))
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise e
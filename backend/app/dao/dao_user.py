@@ -1,12 +1,14 @@
-from sqlalchemy import select
+from sqlalchemy import insert, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
+from typing import Dict, Tuple
 from fastapi import HTTPException, status
 from app.models.model_user import User
+from app.dao.password_hasher import hash_password, verify_password
 from dotenv import load_dotenv
 import os
+import time
 import jwt
 
 load_dotenv()
@@ -17,23 +19,45 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS"))
 REFRESH_SECRET_KEY = os.getenv("REFRESH_SECRET_KEY")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+class TokenRevocations:
+
+    def __init__(self, ttl: timedelta):
+        self.ttl = ttl.total_seconds()
+        self._min_versions: Dict[int, Tuple[int, float]] = {}
+
+    def revoke(self, user_id: int, min_version: int):
+
+        now = time.monotonic()
+        self._min_versions = {uid: entry for uid, entry in self._min_versions.items() if entry[1] > now}
+        self._min_versions[user_id] = (min_version, now + self.ttl)
+
+    def is_revoked(self, user_id: int, token_version: int) -> bool:
+
+        entry = self._min_versions.get(user_id)
+        return entry is not None and token_version < entry[0]
+
+
+token_revocations = TokenRevocations(timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
 
 
 class UserDAO:
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
     async def create_user(self, username: str, password: str, email:str):
 
         try:
-            hashed_password = self.pwd_context.hash(password)
-            user = User(username=username, hashed_password=hashed_password,email = email)
-            
-            self.db.add(user)
+            if await self.user_exists(username, email):
+                return None
+
+            hashed_password = await hash_password(password)
+            result = await self.db.execute(
+                insert(User)
+                .values(username=username, hashed_password=hashed_password, email = email)
+                .returning(User.id, User.username, User.email)
+            )
+            user = result.first()
             await self.db.commit()
-            await self.db.refresh(user)
             return user
 
         except IntegrityError:
@@ -44,6 +68,14 @@ class UserDAO:
             await self.db.rollback()
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error: {str(e)}")
 
+    async def user_exists(self, username: str, email: str) -> bool:
+
+        try:
+            result = await self.db.execute(select(User.id).filter(or_(User.username == username, User.email == email)).limit(1))
+            return result.first() is not None
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error: {str(e)}") from e
+
     async def get_user_by_username(self, username: str):
 
         try:
@@ -56,12 +88,35 @@ class UserDAO:
 
         try:
             user = await self.get_user_by_username(username)
-            if user and self.pwd_context.verify(password, user.hashed_password):
+            if user and await verify_password(password, user.hashed_password):
                 return user
             return None
         except SQLAlchemyError as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error: {str(e)}") from e
 
+    async def update_password(self, user_id: int, password: str):
+
+        try:
+            hashed_password = await hash_password(password)
+            result = await self.db.execute(
+                update(User)
+                .where(User.id == user_id)
+                .values(hashed_password=hashed_password, token_version=User.token_version + 1)
+                .returning(User.id, User.username, User.token_version)
+            )
+            user = result.first()
+            await self.db.commit()
+            if user:
+                token_revocations.revoke(user.id, user.token_version)
+            return user
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error: {str(e)}") from e
+
+    def token_claims(self, user: User) -> dict:
+
+        return {"sub": user.username, "uid": user.id, "ver": user.token_version}
+
     def create_access_token(self, data: dict, expires_delta: timedelta = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)):
 
         try:
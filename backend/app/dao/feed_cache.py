@@ -0,0 +1,268 @@
+import asyncio
+import hashlib
+import heapq
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from xml.etree import ElementTree as ET
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from dotenv import load_dotenv
+from app.models.model_blog import Blog
+from app.models.model_category import Category
+from app.models.model_user import User
+
+load_dotenv()
+
+SITE_URL = os.getenv("SITE_URL", "http://localhost:5173").rstrip("/")
+SITE_TITLE = os.getenv("SITE_TITLE", "Blogifyy")
+FEED_SIZE = int(os.getenv("FEED_SIZE", "50"))
+FEED_CACHE_RELOAD_SECONDS = float(os.getenv("FEED_CACHE_RELOAD_SECONDS", "300"))
+SITEMAP_MAX_URLS = 50000
+SITEMAP_STATIC_PATHS = ("/", "/homepage", "/categories", "/about", "/contact")
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FeedEntry:
+    blog_id: int
+    title: str
+    excerpt: Optional[str]
+    created_at: datetime
+    modified_at: datetime
+    user_id: int
+    username: str
+    category_id: Optional[int]
+    category_name: Optional[str]
+
+
+@dataclass
+class RenderedFeed:
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime]
+
+
+FeedKey = Tuple[str, Optional[str], Optional[int]]
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _blog_url(entry: FeedEntry) -> str:
+    return f"{SITE_URL}/blogs/{entry.blog_id}"
+
+
+def _sub(parent: ET.Element, tag: str, text: Optional[str] = None, **attrib: str) -> ET.Element:
+
+    element = ET.SubElement(parent, tag, attrib)
+    if text is not None:
+        element.text = text
+    return element
+
+
+class FeedCache:
+
+    def __init__(self):
+        self.entries: Dict[int, FeedEntry] = {}
+        self.rendered: Dict[FeedKey, RenderedFeed] = {}
+        self.loaded = False
+        self._loading = asyncio.Lock()
+
+    def _query(self):
+
+        return (
+            select(
+                Blog.blog_id, Blog.title, Blog.excerpt, Blog.created_at, Blog.modified_at,
+                Blog.user_id, User.username, Blog.category_id, Category.name.label("category_name")
+            )
+            .join(User, User.id == Blog.user_id)
+            .outerjoin(Category, Category.category_id == Blog.category_id)
+            .filter(Blog.is_published == True)
+        )
+
+    async def load(self, db: AsyncSession):
+
+        result = await db.execute(self._query())
+        self.entries = {row.blog_id: FeedEntry(**row._mapping) for row in result}
+        self.rendered = {}
+        self.loaded = True
+
+    async def ensure_loaded(self, session_factory: async_sessionmaker):
+
+        # The first load runs after startup; a feed request arriving before it waits for it instead
+        if self.loaded:
+            return
+        async with self._loading:
+            if not self.loaded:
+                async with session_factory() as db:
+                    await self.load(db)
+
+    async def reload_periodically(self, session_factory: async_sessionmaker, interval: float):
+
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with session_factory() as db:
+                    await self.load(db)
+            except Exception as e:
+                # The loop is the only thing keeping feeds fresh, so it logs and waits for the next interval
+                logger.warning("Feed cache reload failed: %r", e)
+
+    async def blogs_changed(self, db: AsyncSession, blog_ids: Sequence[int]):
+
+        if not self.loaded or not blog_ids:
+            return
+        try:
+            result = await db.execute(self._query().filter(Blog.blog_id.in_(blog_ids)))
+        except Exception as e:
+            logger.warning("Feed cache refresh failed, waiting for the next reload: %r", e)
+            return
+
+        current = {row.blog_id: FeedEntry(**row._mapping) for row in result}
+        touched = []
+        for blog_id in blog_ids:
+            touched += [self.entries.pop(blog_id, None), current.get(blog_id)]
+            if blog_id in current:
+                self.entries[blog_id] = current[blog_id]
+        self._invalidate(touched)
+
+    def blog_removed(self, blog_id: int):
+        self._invalidate([self.entries.pop(blog_id, None)])
+
+    def _invalidate(self, touched: Iterable[Optional[FeedEntry]]):
+
+        touched = [entry for entry in touched if entry is not None]
+        if not touched:
+            return
+        categories = {entry.category_id for entry in touched}
+        authors = {entry.user_id for entry in touched}
+        self.rendered = {
+            key: feed for key, feed in self.rendered.items()
+            if (key[1] == "category" and key[2] not in categories) or (key[1] == "author" and key[2] not in authors)
+        }
+
+    def get(self, kind: str, scope: Optional[str] = None, scope_id: Optional[int] = None) -> RenderedFeed:
+
+        key = (kind, scope, scope_id)
+        feed = self.rendered.get(key)
+        if feed is not None:
+            return feed
+
+        entries = self._select(scope, scope_id)
+        feed = self._render(kind, scope, scope_id, entries)
+        # Only cache scopes that exist, so arbitrary ids cannot grow the cache.
+        if entries or scope is None:
+            self.rendered[key] = feed
+        return feed
+
+    def _select(self, scope: Optional[str], scope_id: Optional[int]) -> List[FeedEntry]:
+
+        entries = self.entries.values()
+        if scope == "category":
+            entries = [entry for entry in entries if entry.category_id == scope_id]
+        elif scope == "author":
+            entries = [entry for entry in entries if entry.user_id == scope_id]
+        return list(entries)
+
+    def _render(self, kind: str, scope: Optional[str], scope_id: Optional[int], entries: List[FeedEntry]) -> RenderedFeed:
+
+        if kind == "sitemap":
+            body = self._render_sitemap(entries)
+        else:
+            recent = heapq.nlargest(FEED_SIZE, entries, key=lambda entry: (entry.created_at, entry.blog_id))
+            title = self._title(scope, recent)
+            body = self._render_atom(title, recent) if kind == "atom" else self._render_rss(title, recent)
+
+        last_modified = max((entry.modified_at for entry in entries), default=None)
+        return RenderedFeed(body=body, etag=f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"', last_modified=last_modified)
+
+    def _title(self, scope: Optional[str], entries: List[FeedEntry]) -> str:
+
+        if scope == "category" and entries:
+            return f"{SITE_TITLE} - {entries[0].category_name}"
+        if scope == "author" and entries:
+            return f"{SITE_TITLE} - {entries[0].username}"
+        return SITE_TITLE
+
+    def _render_rss(self, title: str, entries: List[FeedEntry]) -> bytes:
+
+        rss = ET.Element("rss", version="2.0")
+        channel = _sub(rss, "channel")
+        _sub(channel, "title", title)
+        _sub(channel, "link", SITE_URL)
+        _sub(channel, "description", f"Latest posts on {title}")
+        if entries:
+            _sub(channel, "lastBuildDate", format_datetime(_utc(max(entry.modified_at for entry in entries))))
+
+        for entry in entries:
+            item = _sub(channel, "item")
+            _sub(item, "title", entry.title)
+            _sub(item, "link", _blog_url(entry))
+            _sub(item, "guid", _blog_url(entry), isPermaLink="true")
+            _sub(item, "description", entry.excerpt or "")
+            _sub(item, "pubDate", format_datetime(_utc(entry.created_at)))
+            if entry.category_name:
+                _sub(item, "category", entry.category_name)
+
+        return ET.tostring(rss, encoding="utf-8", xml_declaration=True)
+
+    def _render_atom(self, title: str, entries: List[FeedEntry]) -> bytes:
+
+        feed = ET.Element("feed", xmlns=ATOM_NS)
+        _sub(feed, "title", title)
+        _sub(feed, "id", f"{SITE_URL}/")
+        _sub(feed, "link", href=SITE_URL)
+        updated = max((entry.modified_at for entry in entries), default=datetime.now(timezone.utc))
+        _sub(feed, "updated", _utc(updated).isoformat())
+
+        for entry in entries:
+            item = _sub(feed, "entry")
+            _sub(item, "title", entry.title)
+            _sub(item, "id", _blog_url(entry))
+            _sub(item, "link", href=_blog_url(entry))
+            _sub(item, "published", _utc(entry.created_at).isoformat())
+            _sub(item, "updated", _utc(entry.modified_at).isoformat())
+            _sub(_sub(item, "author"), "name", entry.username)
+            _sub(item, "summary", entry.excerpt or "")
+            if entry.category_name:
+                _sub(item, "category", term=entry.category_name)
+
+        return ET.tostring(feed, encoding="utf-8", xml_declaration=True)
+
+    def _render_sitemap(self, entries: List[FeedEntry]) -> bytes:
+
+        urlset = ET.Element("urlset", xmlns=SITEMAP_NS)
+
+        def add(path: str, last_modified: Optional[datetime] = None):
+            url = _sub(urlset, "url")
+            _sub(url, "loc", f"{SITE_URL}{path}")
+            if last_modified is not None:
+                _sub(url, "lastmod", _utc(last_modified).date().isoformat())
+
+        for path in SITEMAP_STATIC_PATHS:
+            add(path)
+
+        categories: Dict[int, datetime] = {}
+        for entry in entries:
+            if entry.category_id is not None:
+                categories[entry.category_id] = max(entry.modified_at, categories.get(entry.category_id, entry.modified_at))
+        for category_id, last_modified in sorted(categories.items()):
+            add(f"/blogs/category/{category_id}", last_modified)
+
+        room = SITEMAP_MAX_URLS - len(SITEMAP_STATIC_PATHS) - len(categories)
+        for entry in heapq.nlargest(room, entries, key=lambda entry: (entry.modified_at, entry.blog_id)):
+            add(f"/blogs/{entry.blog_id}", entry.modified_at)
+
+        return ET.tostring(urlset, encoding="utf-8", xml_declaration=True)
+
+
+feed_cache = FeedCache()
@@ -1,13 +1,15 @@
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Query
+from typing import List, Optional, Tuple
 from sqlalchemy.ext.asyncio import  AsyncSession
 from app.dao.dao_category import CategoryDAO
-from app.dao.dao_blog import BlogDAO
+from app.dao.dao_blog import BlogDAO, BLOG_FIELDS, SUMMARY_FIELDS
 from app.dao.dao_comment import CommentDAO
 from app.dao.dao_contact import ContactDAO
-from app.dao.dao_user import UserDAO
-from app.database.database import get_db
+from app.dao.dao_user import UserDAO, token_revocations
+from app.dao.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PageParams
+from app.database.database import get_db, get_read_db
 from fastapi.security import OAuth2PasswordBearer
-from app.models.model_user import User
+from app.schemas.schema_user import CurrentUserDTO
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -20,22 +22,84 @@ def get_blog_dao(db: AsyncSession = Depends(get_db)) -> BlogDAO:
 def get_comment_dao(db: AsyncSession = Depends(get_db)) -> CommentDAO:
     return CommentDAO(db)
 
+def get_category_read_dao(db: AsyncSession = Depends(get_read_db)) -> CategoryDAO:
+    return CategoryDAO(db)
+
+def get_blog_read_dao(db: AsyncSession = Depends(get_read_db)) -> BlogDAO:
+    return BlogDAO(db)
+
+def get_comment_read_dao(db: AsyncSession = Depends(get_read_db)) -> CommentDAO:
+    return CommentDAO(db)
+
 def get_contact_dao(db: AsyncSession = Depends(get_db)) -> ContactDAO:
     return ContactDAO(db)
 
 def get_user_dao(db: AsyncSession = Depends(get_db)) -> UserDAO:
     return UserDAO(db)
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
+def get_page_params(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    include_total: bool = Query(False, description="Return the total number of rows in X-Total-Count")
+) -> PageParams:
+    return PageParams(limit=limit, cursor=cursor, include_total=include_total)
+
+MAX_BATCH_SIZE = 100
+
+def parse_ids(raw: str, name: str = "ids") -> List[int]:
+
+    try:
+        ids = list(dict.fromkeys(int(value) for value in raw.split(",") if value.strip()))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{name} must be a comma separated list of integers") from e
+    if not ids:
+        raise HTTPException(status_code=400, detail=f"{name} must not be empty")
+    if len(ids) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} {name} per request")
+    return ids
+
+def get_blog_fields(
+    view: str = Query("full", pattern="^(full|summary)$", description="summary omits content and returns the stored excerpt"),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return; blog_id, modified_at and revision are always included")
+) -> Optional[Tuple[str, ...]]:
+
+    if fields:
+        selected = tuple(field.strip() for field in fields.split(",") if field.strip())
+        unknown = set(selected) - set(BLOG_FIELDS) - {"name", "rank", "snippet"}
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        return selected
+    if view == "summary":
+        return SUMMARY_FIELDS
+    return None
+
+def get_search_fields(
+    view: str = Query("full", pattern="^(full|summary)$", description="summary omits content and returns the stored excerpt"),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return; blog_id, modified_at and revision are always included")
+) -> Optional[Tuple[str, ...]]:
+
+    # rank and snippet are what a result card shows, so only an explicit fields list leaves them out
+    selected = get_blog_fields(view, fields)
+    if not fields and selected is not None:
+        return (*selected, "rank", "snippet")
+    return selected
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> CurrentUserDTO:
     
     user_dao = UserDAO(db)
     
     payload = user_dao.decode_access_token(token)
     if payload is None:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
-    
-    db_user = await  user_dao.get_user_by_username(payload.get("sub"))
-    if db_user is None:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    return db_user
+
+    if "uid" not in payload:
+        db_user = await user_dao.get_user_by_username(payload.get("sub"))
+        if db_user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return CurrentUserDTO.model_validate(db_user)
+
+    current_user = CurrentUserDTO(id=payload["uid"], username=payload["sub"], token_version=payload.get("ver", 0))
+    if token_revocations.is_revoked(current_user.id, current_user.token_version):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+
+    return current_user
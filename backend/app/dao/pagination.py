@@ -0,0 +1,107 @@
+import base64
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Sequence, Tuple
+from fastapi import Response
+from sqlalchemy import Select, String, and_, func, or_, select, tuple_, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+@dataclass
+class PageParams:
+    limit: int = DEFAULT_PAGE_SIZE
+    cursor: Optional[str] = None
+    include_total: bool = False
+
+
+@dataclass
+class Page:
+    items: List[Any] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise ValueError("Cursor does not match this listing")
+        return [
+            datetime.fromisoformat(value) if column.type.python_type is datetime else column.type.python_type(value)
+            for value, column in zip(payload, columns)
+        ]
+    except (TypeError, json.JSONDecodeError, UnicodeDecodeError, base64.binascii.Error) as e:
+        raise ValueError("Malformed cursor") from e
+
+
+def comparable(db: AsyncSession, column: Any, value: Any) -> Tuple[Any, Any]:
+
+    if db.bind.dialect.name == "sqlite" and isinstance(value, datetime):
+        # SQLite stores timestamps as text, so compare against the same text form.
+        return type_coerce(column, String), value.isoformat(" ")
+    return column, value
+
+
+def _sqlite_datetime_seek(db: AsyncSession, columns: Sequence[Any], values: Sequence[Any], descending: bool):
+
+    # SQLite keeps timestamps as text: CURRENT_TIMESTAMP writes "12:05:00", SQLAlchemy writes "12:05:00.000000",
+    # and a decoded cursor only has one of those forms. Both forms of the cursor's timestamp fall inside
+    # [low, high), so ties are decided by the remaining columns whichever form the rows use. The bare range
+    # on the column keeps the index usable.
+    (column, *rest), (value, *rest_values) = columns, values
+    if db.bind.dialect.name != "sqlite" or not isinstance(value, datetime) or not rest:
+        return None
+    text = type_coerce(column, String)
+    low = value.isoformat(" ")
+    high = (value + timedelta(microseconds=1)).isoformat(" ", timespec="microseconds")
+    tied = and_(text >= low, text < high)
+    if descending:
+        return and_(text < high, or_(text < low, and_(tied, tuple_(*rest) < tuple_(*rest_values))))
+    return and_(text >= low, or_(text >= high, and_(tied, tuple_(*rest) > tuple_(*rest_values))))
+
+
+async def paginate(db: AsyncSession, query: Select, columns: Sequence[Any], page: PageParams, descending: bool = True, scalars: bool = True) -> Page:
+
+    total = None
+    if page.include_total:
+        total = await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+
+    if page.cursor:
+        decoded = decode_cursor(page.cursor, columns)
+        seek = _sqlite_datetime_seek(db, columns, decoded, descending)
+        if seek is None:
+            pairs = [comparable(db, column, value) for column, value in zip(columns, decoded)]
+            keys = [key for key, _ in pairs]
+            values = [value for _, value in pairs]
+            seek = tuple_(*keys) < tuple_(*values) if descending else tuple_(*keys) > tuple_(*values)
+        query = query.where(seek)
+
+    order = [column.desc() if descending else column.asc() for column in columns]
+    result = await db.execute(query.order_by(*order).limit(page.limit + 1))
+    items = result.scalars().all() if scalars else result.all()
+
+    next_cursor = None
+    if len(items) > page.limit:
+        items = items[:page.limit]
+        next_cursor = encode_cursor([getattr(items[-1], column.key) for column in columns])
+
+    return Page(items=items, next_cursor=next_cursor, total=total)
+
+
+def set_page_headers(response: Response, page: Page):
+
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.total is not None:
+        response.headers["X-Total-Count"] = str(page.total)
@@ -0,0 +1,253 @@
+import hashlib
+import html
+import math
+import os
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+from dotenv import load_dotenv
+from app.monitoring.metrics import render_cache_lookups_total
+
+load_dotenv()
+
+EXCERPT_LENGTH = 280
+WORDS_PER_MINUTE = int(os.getenv("WORDS_PER_MINUTE", "230"))
+RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", "512"))
+
+_HIDDEN_BLOCKS = re.compile(r"<(script|style)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_TAGS = re.compile(r"<[^>]+>")
+_WHITESPACE = re.compile(r"\s+")
+_CONTROL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+
+ALLOWED_TAGS = frozenset({
+    "a", "abbr", "b", "blockquote", "br", "code", "del", "em", "figcaption", "figure",
+    "h1", "h2", "h3", "h4", "h5", "h6", "hr", "i", "img", "ins", "li", "mark", "ol", "p", "pre",
+    "s", "small", "span", "strong", "sub", "sup", "table", "tbody", "td", "tfoot", "th", "thead", "tr", "u", "ul",
+})
+VOID_TAGS = frozenset({"br", "hr", "img"})
+# A second one of these closes the first, as in "<li>one<li>two"
+SIBLING_TAGS = frozenset({"li", "p", "td", "th", "tr"})
+# Removed together with everything inside them
+DROPPED_TAGS = frozenset({"script", "style", "template", "iframe", "object", "embed", "svg", "math", "noscript", "textarea", "select"})
+# The editor's blocks carry alignment and indentation as ql-* classes, and its colours as inline styles
+EDITOR_TAGS = frozenset({"p", "li", "h1", "h2", "h3", "h4", "h5", "h6", "span"})
+ALLOWED_ATTRIBUTES = {
+    "a": {"href", "title"},
+    "abbr": {"title"},
+    "img": {"src", "alt", "title", "width", "height"},
+    "code": {"class"},
+    "pre": {"class"},
+    "ol": {"start"},
+    "td": {"colspan", "rowspan"},
+    "th": {"colspan", "rowspan", "scope"},
+    **{tag: {"class", "style"} for tag in EDITOR_TAGS},
+    "li": {"class", "style", "data-list"},
+}
+URL_ATTRIBUTES = frozenset({"href", "src"})
+SAFE_SCHEMES = frozenset({"http", "https", "mailto"})
+LINK_REL = "nofollow noopener noreferrer"
+# Quill 2 marks every item of a list with data-list and wraps them all in <ol>
+LIST_TYPES = frozenset({"bullet", "ordered", "checked", "unchecked"})
+STYLE_PROPERTIES = frozenset({"color", "background-color"})
+
+_URL_IGNORED = re.compile(r"[\x00-\x20]+")
+_URL_SCHEME = re.compile(r"^([a-z][a-z0-9+.\-]*):", re.IGNORECASE)
+# Images pasted into the editor are stored inline; svg is left out because it can carry script
+_DATA_IMAGE = re.compile(r"^data:image/(png|jpeg|gif|webp);base64,[a-z0-9+/=\s]*$", re.IGNORECASE)
+_CLASS_NAMES = re.compile(r"^[\w\- ]*$")
+_EDITOR_CLASS = re.compile(r"^ql-[a-z0-9\-]+$")
+_STYLE_COLOR = re.compile(r"^(#[0-9a-f]{3,8}|rgba?\(\s*[\d.]+%?\s*(,\s*[\d.]+%?\s*){2,3}\)|[a-z]+)$", re.IGNORECASE)
+
+
+def plain_text(content: Optional[str]) -> str:
+
+    text = _HIDDEN_BLOCKS.sub(" ", content or "")
+    text = _CONTROL.sub("", html.unescape(_TAGS.sub(" ", text)))
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def make_excerpt(content: Optional[str], length: int = EXCERPT_LENGTH) -> str:
+
+    text = plain_text(content)
+    if len(text) <= length:
+        return text
+
+    cut = text.rfind(" ", 0, length)
+    if cut < length // 2:
+        cut = length
+    return text[:cut].rstrip() + "..."
+
+
+def _editor_classes(value: str) -> str:
+    return " ".join(name for name in value.split() if _EDITOR_CLASS.match(name))
+
+
+def _safe_style(value: str) -> str:
+
+    # Only colours survive; anything that could position, hide or load content is dropped
+    kept = []
+    for declaration in value.split(";"):
+        name, _, setting = declaration.partition(":")
+        name, setting = name.strip().lower(), setting.strip()
+        if name in STYLE_PROPERTIES and _STYLE_COLOR.match(setting):
+            kept.append(f"{name}: {setting}")
+    return "; ".join(kept)
+
+
+def safe_url(value: str) -> bool:
+
+    # Browsers skip whitespace and control characters inside schemes, so "java\tscript:" must not slip through
+    match = _URL_SCHEME.match(_URL_IGNORED.sub("", value))
+    return match is None or match.group(1).lower() in SAFE_SCHEMES
+
+
+class _Sanitizer(HTMLParser):
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out: List[str] = []
+        self.open: List[str] = []
+        self.dropping: Optional[str] = None
+        self.depth = 0
+
+    def _attributes(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> str:
+
+        allowed = ALLOWED_ATTRIBUTES.get(tag, ())
+        kept = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRIBUTES and not safe_url(value) and not (tag == "img" and _DATA_IMAGE.match(value)):
+                continue
+            if name == "class":
+                value = _editor_classes(value) if tag in EDITOR_TAGS else value
+                if not value or not _CLASS_NAMES.match(value):
+                    continue
+            if name == "style":
+                value = _safe_style(value)
+                if not value:
+                    continue
+            if name == "data-list" and value not in LIST_TYPES:
+                continue
+            kept.append(f' {name}="{html.escape(value)}"')
+        if tag == "a":
+            kept.append(f' rel="{LINK_REL}"')
+        return "".join(kept)
+
+    def handle_starttag(self, tag, attrs):
+
+        if self.dropping:
+            self.depth += tag == self.dropping
+            return
+        if tag in DROPPED_TAGS:
+            self.dropping, self.depth = tag, 1
+            return
+        if tag not in ALLOWED_TAGS:
+            return
+        if tag in SIBLING_TAGS and self.open and self.open[-1] == tag:
+            self.handle_endtag(tag)
+        self.out.append(f"<{tag}{self._attributes(tag, attrs)}>")
+        if tag not in VOID_TAGS:
+            self.open.append(tag)
+
+    def handle_endtag(self, tag):
+
+        if self.dropping:
+            if tag == self.dropping:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.dropping = None
+            return
+        if tag not in self.open:
+            return
+        # Closes anything left open inside it, so the output is always well nested
+        while True:
+            closed = self.open.pop()
+            self.out.append(f"</{closed}>")
+            if closed == tag:
+                return
+
+    def handle_data(self, data):
+
+        if not self.dropping:
+            self.out.append(html.escape(data, quote=False))
+
+    def result(self) -> str:
+
+        self.close()
+        return "".join(self.out) + "".join(f"</{tag}>" for tag in reversed(self.open))
+
+
+def sanitize_html(content: Optional[str]) -> str:
+
+    sanitizer = _Sanitizer()
+    sanitizer.feed(content or "")
+    return sanitizer.result()
+
+
+@dataclass(frozen=True)
+class RenderedContent:
+    content_html: str
+    excerpt: str
+    search_text: str
+    word_count: int
+    reading_minutes: int
+
+    def values(self) -> dict:
+        return {
+            "content_html": self.content_html, "excerpt": self.excerpt, "search_text": self.search_text,
+            "word_count": self.word_count, "reading_minutes": self.reading_minutes,
+        }
+
+
+def render_content(content: Optional[str]) -> RenderedContent:
+
+    content_html = sanitize_html(content)
+    text = plain_text(content_html)
+    words = len(text.split())
+    return RenderedContent(
+        content_html=content_html,
+        excerpt=make_excerpt(content_html),
+        search_text=text,
+        word_count=words,
+        reading_minutes=max(1, math.ceil(words / WORDS_PER_MINUTE)),
+    )
+
+
+class RenderCache:
+
+    def __init__(self, size: int):
+        self.size = size
+        self.entries: "OrderedDict[bytes, RenderedContent]" = OrderedDict()
+
+    def _key(self, content: Optional[str]) -> bytes:
+
+        # Keyed by what is rendered rather than by row: ids and whole-second modified_at values repeat across
+        # edits, workers and re-created rows, the content never renders differently
+        return hashlib.blake2b((content or "").encode(), digest_size=16).digest()
+
+    def get(self, content: Optional[str]) -> Optional[RenderedContent]:
+
+        key = self._key(content)
+        rendered = self.entries.get(key)
+        if rendered is None:
+            render_cache_lookups_total.inc(result="miss")
+            return None
+        self.entries.move_to_end(key)
+        render_cache_lookups_total.inc(result="hit")
+        return rendered
+
+    def put(self, content: Optional[str], rendered: RenderedContent):
+
+        if self.size <= 0:
+            return
+        key = self._key(content)
+        self.entries[key] = rendered
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+
+render_cache = RenderCache(RENDER_CACHE_SIZE)
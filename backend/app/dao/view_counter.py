@@ -0,0 +1,170 @@
+import asyncio
+import contextvars
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from dotenv import load_dotenv
+from app.dao.dao_blog import SUMMARY_FIELDS, BlogDAO
+from app.dao.dao_blog_view import BlogViewDAO
+from app.database.database import ReadSessionLocal, SessionLocal
+from app.monitoring.metrics import blog_views_dropped_total
+
+load_dotenv()
+
+VIEW_FLUSH_INTERVAL = float(os.getenv("VIEW_FLUSH_INTERVAL", "10"))
+# Unflushed (blog, hour) keys kept in memory; a flush starts early at half of it and new keys are dropped at the limit
+VIEW_MAX_PENDING = int(os.getenv("VIEW_MAX_PENDING", "50000"))
+VIEW_DRAIN_TIMEOUT = float(os.getenv("VIEW_DRAIN_TIMEOUT", "10"))
+VIEW_RETENTION_DAYS = int(os.getenv("VIEW_RETENTION_DAYS", "90"))
+TRENDING_WINDOW_HOURS = int(os.getenv("TRENDING_WINDOW_HOURS", "72"))
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "24"))
+TRENDING_SIZE = int(os.getenv("TRENDING_SIZE", "50"))
+TRENDING_REFRESH_SECONDS = float(os.getenv("TRENDING_REFRESH_SECONDS", "60"))
+
+logger = logging.getLogger(__name__)
+
+def current_hour() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None, minute=0, second=0, microsecond=0)
+
+
+def decay_weights(now: datetime) -> Dict[datetime, float]:
+
+    # A view loses half its weight every TRENDING_HALF_LIFE_HOURS; the current hour counts in full
+    return {
+        now - timedelta(hours=age): 0.5 ** (age / TRENDING_HALF_LIFE_HOURS)
+        for age in range(TRENDING_WINDOW_HOURS)
+    }
+
+
+class TrendingCache:
+
+    def __init__(self, session_factory: async_sessionmaker, size: int):
+        self.session_factory = session_factory
+        self.size = size
+        self.items: List[dict] = []
+        self.computed_at: Optional[datetime] = None
+        self._loading = asyncio.Lock()
+
+    async def refresh(self):
+
+        async with self.session_factory() as db:
+            top = await BlogViewDAO(db).top_blogs(decay_weights(current_hour()), self.size)
+            blogs = {blog["blog_id"]: blog for blog in await BlogDAO(db).get_blogs_by_ids([row.blog_id for row in top], SUMMARY_FIELDS)}
+
+        self.items = [
+            {**blogs[row.blog_id], "views": int(row.views), "score": round(float(row.score), 3)}
+            for row in top if row.blog_id in blogs
+        ]
+        self.computed_at = datetime.now(timezone.utc)
+
+    async def ensure_loaded(self):
+
+        if self.computed_at is not None:
+            return
+        async with self._loading:
+            if self.computed_at is None:
+                await self.refresh()
+
+
+class ViewCounter:
+
+    def __init__(self, session_factory: async_sessionmaker, trending: TrendingCache, flush_interval: float, max_pending: int):
+        self.session_factory = session_factory
+        self.trending = trending
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending: Counter = Counter()
+        self._flush_now = asyncio.Event()
+        self.closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, blog_id: int):
+
+        # Only touches memory, so the read path never turns into a write
+        key = (blog_id, current_hour())
+        if key not in self.pending and len(self.pending) >= self.max_pending:
+            # Flushes are failing and the counts are full; existing keys still count, new ones are dropped
+            blog_views_dropped_total.inc()
+            return
+        self.pending[key] += 1
+        if len(self.pending) >= self.max_pending // 2:
+            self._flush_now.set()
+        if not self.closing:
+            self.start()
+
+    def start(self):
+
+        if self._task is not None and self._task.done():
+            # flush and the refresh handle their own errors, so only a bug gets here; restart so counts keep flushing
+            if not self._task.cancelled() and self._task.exception() is not None:
+                logger.error("View counter stopped, restarting: %r", self._task.exception())
+            self._task = None
+        if self._task is None:
+            self._task = contextvars.Context().run(asyncio.create_task, self._run())
+
+    async def flush(self) -> int:
+
+        if not self.pending:
+            return 0
+        batch, self.pending = self.pending, Counter()
+        try:
+            async with self.session_factory() as db:
+                await BlogViewDAO(db).add_views(
+                    [{"blog_id": blog_id, "hour": hour, "views": views} for (blog_id, hour), views in batch.items()]
+                )
+        except asyncio.CancelledError:
+            self.pending.update(batch)
+            raise
+        except Exception as e:
+            # Not only SQLAlchemyError: asyncpg raises plain OSError subclasses while the database is down
+            logger.warning("View count flush of %d keys failed, retrying next interval: %r", len(batch), e)
+            self.pending.update(batch)
+            return 0
+        return sum(batch.values())
+
+    async def _run(self):
+
+        loop = asyncio.get_running_loop()
+        next_refresh = loop.time()
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            await self.flush()
+            if self.closing:
+                return
+
+            if TRENDING_REFRESH_SECONDS > 0 and loop.time() >= next_refresh:
+                next_refresh = loop.time() + TRENDING_REFRESH_SECONDS
+                try:
+                    await self.trending.refresh()
+                    async with self.session_factory() as db:
+                        await BlogViewDAO(db).prune(current_hour() - timedelta(days=VIEW_RETENTION_DAYS))
+                except Exception as e:
+                    logger.warning("Trending refresh failed: %r", e)
+
+    async def drain(self, timeout: float = VIEW_DRAIN_TIMEOUT):
+
+        self.closing = True
+        if self._task is not None:
+            self._flush_now.set()
+            try:
+                await asyncio.wait_for(self._task, timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.error("View counter did not stop in %ss", timeout)
+            except Exception as e:
+                # Logged, not raised, so the rest of the shutdown still runs
+                logger.error("View counter failed: %r", e)
+            self._task = None
+        await self.flush()
+        if self.pending:
+            logger.error("Dropping %d unflushed blog view counts", sum(self.pending.values()))
+
+
+trending = TrendingCache(ReadSessionLocal, TRENDING_SIZE)
+view_counter = ViewCounter(SessionLocal, trending, VIEW_FLUSH_INTERVAL, VIEW_MAX_PENDING)
@@ -0,0 +1,154 @@
+"""Rewrite stored blog content, rendered HTML and search text with a different compression codec.
+
+    cd backend
+    python -m app.database.compress_content --codec zstd
+    python -m app.database.compress_content --codec zlib --dry-run
+
+On SQLite every row is re-encoded in batches of --batch-size, skipping rows that
+are already stored in the requested form, so the command can be interrupted and
+re-run. Set CONTENT_COMPRESSION to the same codec so new writes match. The
+search index is switched along with the rows: it reads search_text through the
+app's blog_text() function while any of it is compressed, and reads
+blogs.search_text directly again once --codec off has decompressed every row.
+
+On Postgres these columns stay TEXT, because the generated search vector and
+ts_headline read search_text. The codec instead selects the column's native TOAST
+compression (zlib -> pglz, zstd -> lz4, off -> default), and the rows are
+rewritten so that existing values are recompressed with it.
+"""
+import argparse
+import asyncio
+import sys
+from sqlalchemy import Text, bindparam, select, text, type_coerce, update
+from app.database.compression import CODECS, CONTENT_COMPRESSION, compress_text, decompress_text
+from app.database.database import SessionLocal, engine
+from app.database.schema_version import forget_schema_hash
+from app.database.search_index import create_search_index
+from app.models.model_blog import Blog
+from app.models import model_category, model_comment, model_user  # noqa: F401, configures Blog's relationships
+
+POSTGRES_METHODS = {"off": "default", "zlib": "pglz", "zstd": "lz4"}
+COMPRESSED_COLUMNS = ("content", "content_html", "search_text")
+# column || '' builds a new datum, so TOAST compresses it again with the column's method
+POSTGRES_REWRITE = ", ".join(f"{column} = {column} || ''" for column in COMPRESSED_COLUMNS)
+POSTGRES_SIZE = " + ".join(f"coalesce(sum(pg_column_size({column})), 0)" for column in COMPRESSED_COLUMNS)
+
+
+def parse_args(argv=None):
+
+    parser = argparse.ArgumentParser(description="Re-encode blogs.content, content_html and search_text with another compression codec")
+    parser.add_argument("--codec", choices=CODECS, default=CONTENT_COMPRESSION, help="Target codec (default: CONTENT_COMPRESSION)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="Report the size change without writing")
+    return parser.parse_args(argv)
+
+
+def _size(value) -> int:
+    return len(value.encode()) if isinstance(value, str) else len(value)
+
+
+async def rewrite_sqlite(column: str, codec: str, batch_size: int, dry_run: bool):
+
+    # type_coerce to plain Text skips CompressedText, so rows come back exactly as stored
+    stored = type_coerce(getattr(Blog, column), Text).label("stored")
+    blogs = Blog.__table__
+    rewrite = (
+        update(blogs)
+        .where(blogs.c.blog_id == bindparam("b_id"))
+        .values({column: type_coerce(bindparam("stored"), Text), "modified_at": blogs.c.modified_at, "revision": blogs.c.revision})
+    )
+    last_id, scanned, rewritten, before, after = 0, 0, 0, 0, 0
+
+    while True:
+        async with SessionLocal() as db:
+            rows = (await db.execute(
+                select(Blog.blog_id, stored).filter(Blog.blog_id > last_id).order_by(Blog.blog_id).limit(batch_size)
+            )).all()
+            if not rows:
+                break
+            changes = []
+            for row in rows:
+                if row.stored is None:
+                    continue
+                encoded = compress_text(decompress_text(row.stored), codec)
+                before += _size(row.stored)
+                after += _size(encoded)
+                if encoded != row.stored:
+                    changes.append({"b_id": row.blog_id, "stored": encoded})
+            if changes and not dry_run:
+                # Re-encoding is not an edit, so modified_at and revision are kept and ETags stay valid;
+                # the search triggers re-index the rows
+                await db.execute(rewrite, changes)
+                await db.commit()
+
+        last_id = rows[-1].blog_id
+        scanned += len(rows)
+        rewritten += len(changes)
+        print(f"{column}: {scanned} rows scanned, {rewritten} re-encoded, {before} -> {after} bytes", file=sys.stderr)
+
+    return scanned, rewritten, before, after
+
+
+async def rewrite_postgres(codec: str, batch_size: int, dry_run: bool):
+
+    method = POSTGRES_METHODS[codec]
+    if dry_run:
+        async with engine.connect() as conn:
+            before = await conn.scalar(text(f"SELECT {POSTGRES_SIZE} FROM blogs"))
+        return 0, 0, before, before
+
+    async with engine.begin() as conn:
+        for column in COMPRESSED_COLUMNS:
+            await conn.execute(text(f"ALTER TABLE blogs ALTER COLUMN {column} SET COMPRESSION {method}"))
+
+    last_id, scanned = 0, 0
+    while True:
+        async with engine.begin() as conn:
+            result = await conn.execute(text(
+                f"UPDATE blogs SET {POSTGRES_REWRITE} WHERE blog_id IN ("
+                "SELECT blog_id FROM blogs WHERE blog_id > :last_id ORDER BY blog_id LIMIT :batch_size"
+                ") RETURNING blog_id"
+            ), {"last_id": last_id, "batch_size": batch_size})
+            ids = result.scalars().all()
+        if not ids:
+            break
+        last_id = max(ids)
+        scanned += len(ids)
+        print(f"{scanned} rows recompressed with {method}", file=sys.stderr)
+
+    async with engine.connect() as conn:
+        after = await conn.scalar(text(f"SELECT {POSTGRES_SIZE} FROM blogs"))
+    return scanned, scanned, None, after
+
+
+async def run(args):
+
+    if engine.dialect.name == "postgresql":
+        result = await rewrite_postgres(args.codec, args.batch_size, args.dry_run)
+    else:
+        compressed = args.codec != "off"
+        if compressed and not args.dry_run:
+            # Before any row is compressed, or the plain triggers would index the compressed bytes
+            async with engine.begin() as conn:
+                await create_search_index(conn, compressed=True)
+        results = [await rewrite_sqlite(column, args.codec, args.batch_size, args.dry_run) for column in COMPRESSED_COLUMNS]
+        result = tuple(sum(values) for values in zip(*results))
+        if not args.dry_run:
+            async with engine.begin() as conn:
+                await create_search_index(conn, compressed)
+                await forget_schema_hash(conn)
+    await engine.dispose()
+    return result
+
+
+def main(argv=None):
+
+    args = parse_args(argv)
+    scanned, rewritten, before, after = asyncio.run(run(args))
+    action = "would re-encode" if args.dry_run else "re-encoded"
+    sizes = f", {before} -> {after} bytes" if before is not None else f", {after} bytes now"
+    print(f"codec={args.codec}: {scanned} values scanned, {action} {rewritten}{sizes}")
+
+
+if __name__ == "__main__":
+    main()
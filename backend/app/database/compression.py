@@ -0,0 +1,81 @@
+import os
+import zlib
+from typing import Optional, Union
+from sqlalchemy import Text
+from sqlalchemy.types import TypeDecorator
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CONTENT_COMPRESSION = os.getenv("CONTENT_COMPRESSION", "off").lower()
+CONTENT_COMPRESSION_LEVEL = int(os.getenv("CONTENT_COMPRESSION_LEVEL", "6"))
+CONTENT_COMPRESSION_MIN_BYTES = int(os.getenv("CONTENT_COMPRESSION_MIN_BYTES", "256"))
+
+# First byte of a stored BLOB; plain TEXT values carry no header and are read as they are
+HEADER_RAW = 0x00
+HEADER_ZLIB = 0x01
+HEADER_ZSTD = 0x02
+
+CODECS = ("off", "zlib", "zstd")
+
+
+def _zstandard():
+
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("Content compressed with zstd needs the 'zstandard' package") from e
+    return zstandard
+
+
+if CONTENT_COMPRESSION not in CODECS:
+    raise ValueError(f"CONTENT_COMPRESSION must be one of {', '.join(CODECS)}, got '{CONTENT_COMPRESSION}'")
+if CONTENT_COMPRESSION == "zstd":
+    _zstandard()
+
+
+def compress_text(value: str, codec: str = CONTENT_COMPRESSION) -> Union[str, bytes]:
+
+    if codec == "off":
+        return value
+    raw = value.encode()
+    if len(raw) < CONTENT_COMPRESSION_MIN_BYTES:
+        return value
+    if codec == "zlib":
+        stored = bytes([HEADER_ZLIB]) + zlib.compress(raw, CONTENT_COMPRESSION_LEVEL)
+    elif codec == "zstd":
+        stored = bytes([HEADER_ZSTD]) + _zstandard().ZstdCompressor(level=CONTENT_COMPRESSION_LEVEL).compress(raw)
+    else:
+        raise ValueError(f"Unknown content codec '{codec}', expected one of {', '.join(CODECS)}")
+    return stored if len(stored) < len(raw) else value
+
+
+def decompress_text(value: Optional[Union[str, bytes]]) -> Optional[str]:
+
+    if value is None or isinstance(value, str):
+        return value
+    header, payload = value[0], memoryview(value)[1:]
+    if header == HEADER_ZLIB:
+        return zlib.decompress(payload).decode()
+    if header == HEADER_ZSTD:
+        return _zstandard().ZstdDecompressor().decompress(payload).decode()
+    if header == HEADER_RAW:
+        return bytes(payload).decode()
+    raise ValueError(f"Unknown content header byte {header:#04x}")
+
+
+class CompressedText(TypeDecorator):
+
+    # Still declared as TEXT: SQLite keeps BLOB values in a TEXT column as they are, so old and new rows mix freely.
+    # Postgres already compresses large values through TOAST and its search column reads content, so it gets plain text.
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+
+        if value is None or dialect.name != "sqlite":
+            return value
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        return decompress_text(value)
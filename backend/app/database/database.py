@@ -1,22 +1,152 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.orm import declarative_base
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import Session, declarative_base
+from typing import Dict, Optional
 from dotenv import load_dotenv
 import os
+import time
+from app.database.compression import decompress_text
+from app.monitoring.metrics import TimedAsyncAdaptedQueuePool, instrument_engine
+from app.monitoring.query_guard import install_query_guard
 
 load_dotenv()
 
 SQLALCHMEY_DATABASE_URL = os.getenv("SQLALCHMEY_DATABASE_URL")
-engine = create_async_engine(SQLALCHMEY_DATABASE_URL, connect_args={"check_same_thread": False})
+SQLALCHMEY_READ_DATABASE_URL = os.getenv("SQLALCHMEY_READ_DATABASE_URL") or SQLALCHMEY_DATABASE_URL
+READ_AFTER_WRITE_SECONDS = float(os.getenv("READ_AFTER_WRITE_SECONDS", "5"))
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "500"))
+
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+    # Lets the search triggers and views read compressed content
+    dbapi_connection.create_function("blog_text", 1, decompress_text, deterministic=True)
+
+
+def create_engine_for(url: str, name: str = "primary", **kwargs) -> AsyncEngine:
+
+    engine = _create_engine(url, name, **kwargs)
+    instrument_engine(engine, name)
+    install_query_guard(engine)
+    return engine
+
+
+def _create_engine(url: str, name: str, **kwargs) -> AsyncEngine:
+
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+
+    if backend == "sqlite":
+        if parsed.database not in (None, "", ":memory:"):
+            kwargs.setdefault("poolclass", TimedAsyncAdaptedQueuePool)
+            kwargs.setdefault("pool_name", name)
+        engine = create_async_engine(url, connect_args={"check_same_thread": False}, **kwargs)
+        event.listen(engine.sync_engine, "connect", _sqlite_pragmas)
+        return engine
+
+    if backend == "postgresql":
+        return create_async_engine(
+            url,
+            poolclass=TimedAsyncAdaptedQueuePool,
+            pool_name=name,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=DB_POOL_PRE_PING,
+            connect_args={
+                "prepared_statement_cache_size": DB_PREPARED_STATEMENT_CACHE_SIZE,
+                "server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)},
+            },
+            **kwargs
+        )
+
+    return create_async_engine(url, pool_pre_ping=DB_POOL_PRE_PING, **kwargs)
+
+
+class ReadAfterWrite:
+
+    def __init__(self, window: float):
+        self.window = window
+        self._until: Dict[str, float] = {}
+
+    def mark(self, key: Optional[str]):
+
+        if not key:
+            return
+        now = time.monotonic()
+        if len(self._until) > 10000:
+            self._until = {k: until for k, until in self._until.items() if until > now}
+        self._until[key] = now + self.window
+
+    def is_sticky(self, key: Optional[str]) -> bool:
+        return bool(key) and self._until.get(key, 0) > time.monotonic()
+
+
+engine = create_engine_for(SQLALCHMEY_DATABASE_URL)
 SessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+if SQLALCHMEY_READ_DATABASE_URL == SQLALCHMEY_DATABASE_URL:
+    read_engine = engine
+    ReadSessionLocal = SessionLocal
+else:
+    read_engine = create_engine_for(SQLALCHMEY_READ_DATABASE_URL, name="replica")
+    ReadSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+read_after_write = ReadAfterWrite(READ_AFTER_WRITE_SECONDS)
 Base = declarative_base()
 
-async def create_table():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
 
-async def get_db() -> AsyncSession: #type: ignore
-    async with SessionLocal() as db:
+@event.listens_for(Session, "after_commit")
+def _mark_writer(session: Session):
+    read_after_write.mark(session.info.get("writer"))
+
+
+def _writer_key(request: Request) -> Optional[str]:
+    return request.headers.get("authorization")
+
+async def create_table() -> bool:
+    from app.database.schema_version import sync_schema
+
+    return await sync_schema(engine, Base.metadata)
+
+async def get_db(request: Request) -> AsyncSession: #type: ignore
+    async with SessionLocal(info={"writer": _writer_key(request)}) as db:
+        try:
+            yield db
+        finally:
+            await db.close()
+
+async def get_read_db(request: Request) -> AsyncSession: #type: ignore
+    session_factory = ReadSessionLocal
+    if read_after_write.is_sticky(_writer_key(request)):
+        session_factory = SessionLocal
+
+    async with session_factory() as db:
         try:
             yield db
         finally:
-            await db.close()
\ No newline at end of file
+            await db.close()
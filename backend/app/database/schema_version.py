@@ -0,0 +1,115 @@
+import hashlib
+import logging
+import os
+from typing import Optional
+from sqlalchemy import Column, MetaData, String, Table, delete, insert, inspect, select, text
+from sqlalchemy.engine import Connection, Dialect
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.schema import CreateIndex, CreateTable
+from dotenv import load_dotenv
+from app.database.search_index import COMPRESSED_SEARCH, create_search_index, search_index_ddl
+
+load_dotenv()
+
+# "hash" skips DDL when the stored schema hash matches the models, "always" runs it on every start
+SCHEMA_SYNC_MODE = os.getenv("SCHEMA_SYNC_MODE", "hash").lower()
+SCHEMA_LOCK_KEY = int(os.getenv("SCHEMA_LOCK_KEY", "727100"))
+SCHEMA_HASH_KEY = "schema_hash"
+
+# Single-column indexes superseded by the composite ones on the models, or duplicating a primary key
+RETIRED_INDEXES = (
+    "ix_blogs_blog_id", "ix_blogs_user_id", "ix_blogs_category_id",
+    "ix_comments_comment_id", "ix_comments_blog_id",
+    "ix_categories_category_id", "ix_contacts_id", "ix_users_id",
+)
+
+logger = logging.getLogger(__name__)
+
+# Kept out of Base.metadata so that it never takes part in its own hash
+schema_meta_metadata = MetaData()
+schema_meta = Table(
+    "schema_meta",
+    schema_meta_metadata,
+    Column("key", String(64), primary_key=True),
+    Column("value", String(128), nullable=False),
+)
+
+
+def schema_hash(metadata: MetaData, dialect: Dialect, compressed: bool = COMPRESSED_SEARCH) -> str:
+
+    # The search DDL depends on whether content may be compressed, so switching CONTENT_COMPRESSION re-syncs it
+    digest = hashlib.sha256()
+    for table in metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    for ddl in search_index_ddl(dialect.name, compressed):
+        digest.update(ddl.encode())
+    return digest.hexdigest()
+
+
+async def forget_schema_hash(conn: AsyncConnection):
+
+    # The next start then syncs the DDL again, e.g. after the search index was switched to another storage mode
+    if await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table(schema_meta.name)):
+        await conn.execute(delete(schema_meta).filter(schema_meta.c.key == SCHEMA_HASH_KEY))
+
+
+async def _stored_hash(conn: AsyncConnection) -> Optional[str]:
+
+    # Checked first because a failed SELECT would abort the surrounding Postgres transaction
+    if not await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table(schema_meta.name)):
+        return None
+    result = await conn.execute(select(schema_meta.c.value).filter(schema_meta.c.key == SCHEMA_HASH_KEY))
+    return result.scalar()
+
+
+def _upgrade_tables(conn: Connection, metadata: MetaData):
+
+    # create_all never alters existing tables; columns and indexes added to a model later are created here
+    inspector = inspect(conn)
+    compiler = conn.dialect.ddl_compiler(conn.dialect, None)
+    preparer = conn.dialect.identifier_preparer
+    for table in metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable and column.server_default is None:
+                logger.warning("Cannot add NOT NULL column %s.%s without a server default", table.name, column.name)
+                continue
+            conn.execute(text(
+                f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {compiler.get_column_specification(column)}"
+            ))
+            logger.warning("Added column %s.%s", table.name, column.name)
+
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                index.create(conn)
+                logger.warning("Created index %s", index.name)
+
+
+async def sync_schema(engine: AsyncEngine, metadata: MetaData, compressed: bool = COMPRESSED_SEARCH) -> bool:
+
+    async with engine.connect() as conn:
+        expected = schema_hash(metadata, conn.dialect, compressed)
+        if SCHEMA_SYNC_MODE != "always" and await _stored_hash(conn) == expected:
+            return False
+
+    async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Workers scaling out together wait here and then find the hash already written
+            await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+            if SCHEMA_SYNC_MODE != "always" and await _stored_hash(conn) == expected:
+                return False
+
+        await conn.run_sync(metadata.create_all)
+        await conn.run_sync(_upgrade_tables, metadata)
+        for name in RETIRED_INDEXES:
+            await conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        await create_search_index(conn, compressed)
+        await conn.run_sync(schema_meta_metadata.create_all)
+        await conn.execute(delete(schema_meta).filter(schema_meta.c.key == SCHEMA_HASH_KEY))
+        await conn.execute(insert(schema_meta).values(key=SCHEMA_HASH_KEY, value=expected))
+    return True
@@ -0,0 +1,200 @@
+import html
+import logging
+import re
+from typing import List, Optional, Sequence
+from sqlalchemy import Float, Select, column, func, literal, literal_column, select, table, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.database.compression import CONTENT_COMPRESSION
+from app.models.model_blog import Blog
+
+SEARCH_CONFIG = "english"
+SNIPPET_START = "<mark>"
+SNIPPET_END = "</mark>"
+SNIPPET_TOKENS = 24
+# Control characters plain_text() strips, so they only ever come from the highlighter and survive html.escape
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+
+logger = logging.getLogger(__name__)
+
+blogs_fts = table("blogs_fts", column("rowid"))
+
+SQLITE_FTS_SOURCE = "blogs_search_source"
+_SQLITE_TRIGGERS = ("blogs_fts_ai", "blogs_fts_ad", "blogs_fts_au")
+
+# The index holds search_text, the tag-stripped text of each blog, so markup never matches or leaks into snippets.
+# blog_text() only exists on the app's own connections, so the index reads it only while search_text may be
+# compressed; otherwise it reads blogs.search_text directly and any sqlite3 client can keep writing blogs
+COMPRESSED_SEARCH = CONTENT_COMPRESSION != "off"
+
+
+def _sqlite_ddl(compressed: bool) -> List[str]:
+
+    source = SQLITE_FTS_SOURCE if compressed else "blogs"
+    new_text = "blog_text(new.search_text)" if compressed else "new.search_text"
+    old_text = "blog_text(old.search_text)" if compressed else "old.search_text"
+    view = f"""
+    CREATE VIEW IF NOT EXISTS {SQLITE_FTS_SOURCE} AS
+        SELECT blog_id, title, blog_text(search_text) AS search_text FROM blogs
+    """
+    return ([view] if compressed else []) + [
+        f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS blogs_fts USING fts5(
+        title, search_text, content='{source}', content_rowid='blog_id', tokenize='porter unicode61'
+    )
+    """,
+        f"""
+    CREATE TRIGGER IF NOT EXISTS blogs_fts_ai AFTER INSERT ON blogs BEGIN
+        INSERT INTO blogs_fts(rowid, title, search_text) VALUES (new.blog_id, new.title, {new_text});
+    END
+    """,
+        f"""
+    CREATE TRIGGER IF NOT EXISTS blogs_fts_ad AFTER DELETE ON blogs BEGIN
+        INSERT INTO blogs_fts(blogs_fts, rowid, title, search_text) VALUES ('delete', old.blog_id, old.title, {old_text});
+    END
+    """,
+        f"""
+    CREATE TRIGGER IF NOT EXISTS blogs_fts_au AFTER UPDATE OF title, search_text ON blogs BEGIN
+        INSERT INTO blogs_fts(blogs_fts, rowid, title, search_text) VALUES ('delete', old.blog_id, old.title, {old_text});
+        INSERT INTO blogs_fts(rowid, title, search_text) VALUES (new.blog_id, new.title, {new_text});
+    END
+    """,
+    ]
+
+
+_POSTGRES_DDL = [
+    f"""
+    ALTER TABLE blogs ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(search_text, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_blogs_search_vector ON blogs USING GIN (search_vector)",
+]
+
+
+def search_index_ddl(dialect: str, compressed: bool = COMPRESSED_SEARCH) -> List[str]:
+
+    if dialect == "sqlite":
+        return _sqlite_ddl(compressed)
+    return {"postgresql": _POSTGRES_DDL}.get(dialect, [])
+
+
+async def _has_compressed_content(conn: AsyncConnection) -> bool:
+    return await conn.scalar(text("SELECT 1 FROM blogs WHERE typeof(search_text) = 'blob' LIMIT 1")) is not None
+
+
+async def create_search_index(conn: AsyncConnection, compressed: bool = COMPRESSED_SEARCH) -> bool:
+
+    dialect = conn.dialect.name
+
+    if dialect == "sqlite":
+        if not compressed and await _has_compressed_content(conn):
+            # Only scanned when the DDL is synced; plain triggers would index the compressed bytes
+            logger.warning("Blog search text is still stored compressed, keeping blog_text() in the search index "
+                           "until `python -m app.database.compress_content --codec off` has run")
+            compressed = True
+        source = SQLITE_FTS_SOURCE if compressed else "blogs"
+        existing = await conn.scalar(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'blogs_fts'"))
+        is_new = existing is None or f"content='{source}'" not in existing or "search_text" not in existing
+        if existing is not None and is_new:
+            # Built for the other storage mode or over the raw content, so it is rebuilt from the current source
+            await conn.execute(text("DROP TABLE blogs_fts"))
+        for trigger in _SQLITE_TRIGGERS:
+            await conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        await conn.execute(text(f"DROP VIEW IF EXISTS {SQLITE_FTS_SOURCE}"))
+        for ddl in _sqlite_ddl(compressed):
+            await conn.execute(text(ddl))
+        if is_new:
+            await conn.execute(text("INSERT INTO blogs_fts(blogs_fts) VALUES ('rebuild')"))
+        return compressed
+
+    if dialect == "postgresql":
+        expression = await conn.scalar(text(
+            "SELECT generation_expression FROM information_schema.columns "
+            "WHERE table_name = 'blogs' AND column_name = 'search_vector'"
+        ))
+        if expression is not None and "search_text" not in expression:
+            # Generated from the raw content by an earlier release; dropping it also drops its GIN index
+            await conn.execute(text("ALTER TABLE blogs DROP COLUMN search_vector"))
+        for ddl in _POSTGRES_DDL:
+            await conn.execute(text(ddl))
+    return False
+
+
+def search_terms(search_query: Optional[str]) -> List[str]:
+
+    return re.findall(r"\w+", search_query or "")
+
+
+def highlight_snippet(snippet: Optional[str]) -> Optional[str]:
+
+    # Escaped before the highlight tags go in, so the snippet is safe to render as HTML
+    if snippet is None:
+        return None
+    return html.escape(snippet, quote=False).replace(_MARK_START, SNIPPET_START).replace(_MARK_END, SNIPPET_END)
+
+
+def build_search_query(dialect: str, terms: List[str], limit: int, offset: int, columns: Sequence = (Blog,)) -> Select:
+
+    if dialect == "sqlite":
+        match = " ".join(f'"{term}"*' for term in terms)
+        rank = (-func.bm25(literal_column("blogs_fts"), 10.0, 1.0)).label("rank")
+        snippet = func.snippet(
+            literal_column("blogs_fts"), -1, _MARK_START, _MARK_END, "...", SNIPPET_TOKENS
+        ).label("snippet")
+
+        return (
+            select(*columns, rank, snippet)
+            .select_from(Blog)
+            .join(blogs_fts, blogs_fts.c.rowid == Blog.blog_id)
+            .where(text("blogs_fts MATCH :match").bindparams(match=match))
+            .where(Blog.is_published == True)
+            .order_by(rank.desc(), Blog.blog_id.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+
+    if dialect == "postgresql":
+        tsquery = func.to_tsquery(SEARCH_CONFIG, " & ".join(f"{term}:*" for term in terms))
+        search_vector = literal_column("blogs.search_vector")
+
+        ranked = (
+            select(Blog.blog_id, func.ts_rank_cd(search_vector, tsquery).label("rank"))
+            .where(search_vector.op("@@")(tsquery))
+            .where(Blog.is_published == True)
+            .order_by(literal_column("rank").desc(), Blog.blog_id.desc())
+            .limit(limit)
+            .offset(offset)
+            .subquery()
+        )
+        snippet = func.ts_headline(
+            SEARCH_CONFIG,
+            func.coalesce(Blog.search_text, ""),
+            tsquery,
+            f"StartSel={_MARK_START}, StopSel={_MARK_END}, MaxWords={SNIPPET_TOKENS}, MinWords={SNIPPET_TOKENS // 2}",
+        ).label("snippet")
+
+        return (
+            select(*columns, ranked.c.rank, snippet)
+            .select_from(Blog)
+            .join(ranked, ranked.c.blog_id == Blog.blog_id)
+            .order_by(ranked.c.rank.desc(), Blog.blog_id.desc())
+        )
+
+    return None
+
+
+def build_fallback_query(terms: List[str], limit: int, offset: int, columns: Sequence = (Blog,)) -> Select:
+
+    query = select(*columns, literal(None, Float).label("rank"), literal(None).label("snippet"))
+
+    for term in terms:
+        query = query.filter(Blog.title.ilike(f"%{term}%") | Blog.search_text.ilike(f"%{term}%"))
+
+    return (
+        query.filter(Blog.is_published == True)
+        .order_by(Blog.created_at.desc(), Blog.blog_id.desc())
+        .limit(limit)
+        .offset(offset)
+    )
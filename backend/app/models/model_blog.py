@@ -1,8 +1,9 @@
 from datetime import datetime
 from typing import List, Optional,TYPE_CHECKING
-from sqlalchemy import Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Integer, String, Text, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database.database import Base
+from app.database.compression import CompressedText
 from sqlalchemy.sql import text
 
 if TYPE_CHECKING:
@@ -10,18 +11,38 @@ if TYPE_CHECKING:
     from app.models.model_category import Category
     from app.models.model_comment import Comment
 
+STALE_RENDER = "rendered_at IS NULL OR rendered_at != modified_at OR search_text IS NULL"
+
 class Blog(Base):
     __tablename__ = "blogs"
+    __table_args__ = (
+        # Listings seek on (created_at, blog_id) so pages come straight off the index without a sort
+        Index("ix_blogs_published_created", "created_at", "blog_id", sqlite_where=text("is_published = 1"), postgresql_where=text("is_published")),
+        Index("ix_blogs_user_created", "user_id", "created_at", "blog_id"),
+        Index("ix_blogs_category_created", "category_id", "created_at", "blog_id"),
+        # Rows whose stored rendering is missing or older than the content, picked up by backfill_renders
+        Index("ix_blogs_stale_render", "blog_id", sqlite_where=text(STALE_RENDER), postgresql_where=text(STALE_RENDER)),
+    )
 
-    blog_id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    blog_id: Mapped[int] = mapped_column(Integer, primary_key=True)
     title: Mapped[str] = mapped_column(String, nullable=False)
-    content: Mapped[Optional[str]] = mapped_column(Text, nullable=False)
+    content: Mapped[Optional[str]] = mapped_column(CompressedText, nullable=False)
+    excerpt: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Rendered from content on every write; rendered_at equals modified_at while they match the content
+    content_html: Mapped[Optional[str]] = mapped_column(CompressedText, nullable=True, deferred=True)
+    # The tag-stripped text of content_html; the search index reads this rather than the markup
+    search_text: Mapped[Optional[str]] = mapped_column(CompressedText, nullable=True, deferred=True)
+    word_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    reading_minutes: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    rendered_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     modified_at: Mapped[datetime] = mapped_column(DateTime, server_default=text('CURRENT_TIMESTAMP'), onupdate=text('CURRENT_TIMESTAMP'), nullable=False)
+    # Bumped by every UPDATE; modified_at only has whole seconds on SQLite, so validators also carry this
+    revision: Mapped[int] = mapped_column(Integer, default=0, server_default=text('0'), onupdate=text('revision + 1'), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=text('CURRENT_TIMESTAMP'), nullable=False)
     is_published: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
 
-    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), index=True)
-    category_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("categories.category_id"), index=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"))
+    category_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("categories.category_id"))
 
     user: Mapped["User"] = relationship("User", back_populates="blogs")
     category: Mapped[Optional["Category"]] = relationship("Category", back_populates="blogs")
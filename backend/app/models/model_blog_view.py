@@ -0,0 +1,13 @@
+from datetime import datetime
+from sqlalchemy import Integer, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database.database import Base
+
+class BlogView(Base):
+    __tablename__ = "blog_views"
+
+    # Hour leads the key so trending reads only the rows inside its window.
+    # No foreign key: counts for a deleted blog drop out of trending through the join and are pruned with the rest.
+    hour: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    blog_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    views: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -11,10 +11,10 @@ if TYPE_CHECKING:
 class Category(Base):
     __tablename__ = "categories"
 
-    category_id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    category_id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
     description: Mapped[Optional[str]] = mapped_column(Text)
-    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     
     user: Mapped["User"] = relationship("User", back_populates="categories")
     blogs: Mapped[List["Blog"]] = relationship("Blog", back_populates="category", cascade="all, delete-orphan")
\ No newline at end of file
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Integer, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database.database import Base
 from sqlalchemy.sql import text
@@ -11,14 +11,18 @@ if TYPE_CHECKING:
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        Index("ix_comments_blog_created", "blog_id", "created_at", "comment_id"),
+    )
 
-    comment_id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    comment_id: Mapped[int] = mapped_column(Integer, primary_key=True)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=text('CURRENT_TIMESTAMP'), nullable=False)
     modified_at: Mapped[datetime] = mapped_column(DateTime, server_default=text('CURRENT_TIMESTAMP'), onupdate=text('CURRENT_TIMESTAMP'), nullable=False)
+    revision: Mapped[int] = mapped_column(Integer, default=0, server_default=text('0'), onupdate=text('revision + 1'), nullable=False)
 
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), index=True)
-    blog_id: Mapped[int] = mapped_column(Integer, ForeignKey("blogs.blog_id"), index=True)
+    blog_id: Mapped[int] = mapped_column(Integer, ForeignKey("blogs.blog_id"))
 
     user: Mapped["User"] = relationship("User", back_populates="comments")
     blog: Mapped["Blog"] = relationship("Blog", back_populates="comments")
\ No newline at end of file
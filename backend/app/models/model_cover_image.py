@@ -0,0 +1,15 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database.database import Base
+
+class CoverImage(Base):
+    __tablename__ = "cover_images"
+
+    # Keyed by the normalized search text, so blogs sharing a title and a category of the same name share one lookup
+    term: Mapped[str] = mapped_column(String, primary_key=True)
+    # NULL when the provider had no image, remembered for a shorter time than a hit
+    url: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    provider: Mapped[str] = mapped_column(String, nullable=False)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
@@ -0,0 +1,270 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(**labels: str) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Iterable[Tuple[str, str]] = ()) -> str:
+
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = _labels(**labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        for labels, value in self.values.items():
+            yield self.name, labels, value
+
+
+class Gauge(Counter):
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str):
+        self.values[_labels(**labels)] = value
+
+
+class Histogram:
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.values: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, **labels: str):
+
+        key = _labels(**labels)
+        series = self.values.get(key)
+        if series is None:
+            series = self.values[key] = [0.0] * (len(self.buckets) + 3)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def samples(self):
+        for labels, series in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f"{self.name}_bucket", labels + (("le", _format_value(bound)),), cumulative
+            yield f"{self.name}_bucket", labels + (("le", "+Inf"),), series[-1]
+            yield f"{self.name}_sum", labels, series[-2]
+            yield f"{self.name}_count", labels, series[-1]
+
+
+class Registry:
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+
+        for collect in self.collectors:
+            collect()
+
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.register(Counter("http_requests_total", "HTTP requests by route and status code."))
+http_requests_in_flight = registry.register(Gauge("http_requests_in_flight", "HTTP requests currently being served."))
+http_request_duration_seconds = registry.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency by route.", LATENCY_BUCKETS)
+)
+http_request_db_statements = registry.register(
+    Histogram("http_request_db_statements", "SQL statements issued per HTTP request.", STATEMENT_BUCKETS)
+)
+http_request_db_seconds = registry.register(
+    Histogram("http_request_db_seconds", "Time spent executing SQL per HTTP request.", LATENCY_BUCKETS)
+)
+db_statements_total = registry.register(Counter("db_statements_total", "SQL statements executed by route."))
+db_statement_seconds_total = registry.register(Counter("db_statement_seconds_total", "Time spent executing SQL by route."))
+db_pool_checkout_wait_seconds = registry.register(
+    Histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.", POOL_WAIT_BUCKETS)
+)
+db_pool_checked_out = registry.register(Gauge("db_pool_checked_out", "Connections currently checked out of the pool."))
+app_startup_seconds = registry.register(Gauge("app_startup_seconds", "Time spent in each startup phase of this worker."))
+render_cache_lookups_total = registry.register(Counter("render_cache_lookups_total", "Rendered blog content lookups by result (hit or miss)."))
+cover_image_lookups_total = registry.register(Counter("cover_image_lookups_total", "Cover image lookups by where they were answered from."))
+blog_views_dropped_total = registry.register(Counter("blog_views_dropped_total", "Blog views not counted because the unflushed counts were full."))
+
+
+@dataclass
+class RequestStats:
+    statements: int = 0
+    db_seconds: float = 0.0
+    budget: Optional[int] = None
+    shapes: Dict[str, int] = field(default_factory=dict)
+    violations: Set[str] = field(default_factory=set)
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+BACKGROUND_ROUTE = "background"
+UNMATCHED_ROUTE = "unmatched"
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+
+    # create_engine hands pool_name over because it is a keyword of this __init__
+    def __init__(self, creator, pool_name: str = "default", **kw):
+        super().__init__(creator, **kw)
+        self.pool_name = pool_name
+
+    def recreate(self):
+
+        pool = super().recreate()
+        pool.pool_name = self.pool_name
+        return pool
+
+    def _do_get(self):
+
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait_seconds.observe(time.perf_counter() - started, pool=self.pool_name)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _request_stats.get()
+    if stats is None:
+        db_statements_total.inc(route=BACKGROUND_ROUTE)
+        db_statement_seconds_total.inc(elapsed, route=BACKGROUND_ROUTE)
+        return
+    stats.statements += 1
+    stats.db_seconds += elapsed
+
+
+def _handle_error(exception_context):
+
+    started = exception_context.connection.info.get("query_started") if exception_context.connection is not None else None
+    if started:
+        started.pop()
+
+
+_instrumented_engines: List[Tuple[str, AsyncEngine]] = []
+
+
+def instrument_engine(engine: AsyncEngine, name: str):
+
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+    _instrumented_engines.append((name, engine))
+
+
+def _collect_pool_usage():
+
+    for name, engine in _instrumented_engines:
+        checkedout = getattr(engine.sync_engine.pool, "checkedout", None)
+        if checkedout is not None:
+            db_pool_checked_out.set(checkedout(), pool=name)
+
+
+registry.collectors.append(_collect_pool_usage)
+
+
+def _route_of(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        method = scope["method"]
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = _route_of(scope)
+            http_requests_in_flight.dec()
+            http_requests_total.inc(method=method, route=route, status=str(status_code))
+            http_request_duration_seconds.observe(elapsed, method=method, route=route)
+            http_request_db_statements.observe(stats.statements, method=method, route=route)
+            http_request_db_seconds.observe(stats.db_seconds, method=method, route=route)
+            db_statements_total.inc(stats.statements, route=route)
+            db_statement_seconds_total.inc(stats.db_seconds, route=route)
+            _request_stats.reset(token)
@@ -0,0 +1,89 @@
+import logging
+import os
+import traceback
+import greenlet
+from typing import List
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session, raiseload
+from dotenv import load_dotenv
+from app.monitoring.metrics import RequestStats, current_request_stats
+
+load_dotenv()
+
+QUERY_GUARD_MODE = os.getenv("QUERY_GUARD_MODE", "off").lower()
+QUERY_BUDGET_DEFAULT = int(os.getenv("QUERY_BUDGET_DEFAULT", "20"))
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))
+
+GUARD_MODES = ("off", "log", "raise")
+if QUERY_GUARD_MODE not in GUARD_MODES:
+    raise ValueError(f"QUERY_GUARD_MODE must be one of {', '.join(GUARD_MODES)}")
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+def query_budget(limit: int):
+
+    async def declare_budget():
+        stats = current_request_stats()
+        if stats is not None:
+            stats.budget = limit
+
+    return declare_budget
+
+
+def _application_stack() -> List[str]:
+
+    current = greenlet.getcurrent()
+    frame = current.parent.gr_frame if current.parent is not None else None
+    summary = traceback.extract_stack(frame)
+    return [
+        line for line, entry in zip(summary.format(), summary)
+        if f"{os.sep}app{os.sep}" in entry.filename and f"{os.sep}monitoring{os.sep}" not in entry.filename
+    ]
+
+
+def _report(stats: RequestStats, key: str, problem: str, statement: str):
+
+    if key in stats.violations and QUERY_GUARD_MODE != "raise":
+        return
+    stats.violations.add(key)
+    message = f"{problem}\n{statement}\n{''.join(_application_stack())}"
+    if QUERY_GUARD_MODE == "raise":
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def _check_statement(conn, cursor, statement, parameters, context, executemany):
+
+    stats = current_request_stats()
+    if stats is None:
+        return
+
+    issued = sum(stats.shapes.values()) + 1
+    repeats = stats.shapes[statement] = stats.shapes.get(statement, 0) + 1
+    budget = stats.budget if stats.budget is not None else QUERY_BUDGET_DEFAULT
+
+    if issued > budget:
+        _report(stats, "budget", f"Query budget of {budget} statements exceeded", statement)
+    if repeats > QUERY_REPEAT_THRESHOLD:
+        _report(stats, statement, f"Possible N+1: statement repeated {repeats} times in one request", statement)
+
+
+def _raiseload_by_default(execute_state):
+
+    if execute_state.is_select and not execute_state.is_column_load and not execute_state.is_relationship_load:
+        execute_state.statement = execute_state.statement.options(raiseload("*", sql_only=True))
+
+
+def install_query_guard(engine: AsyncEngine):
+
+    if QUERY_GUARD_MODE == "off":
+        return
+    event.listen(engine.sync_engine, "before_cursor_execute", _check_statement)
+    if not event.contains(Session, "do_orm_execute", _raiseload_by_default):
+        event.listen(Session, "do_orm_execute", _raiseload_by_default)
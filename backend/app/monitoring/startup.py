@@ -0,0 +1,44 @@
+import os
+import time
+from typing import List, Tuple
+from dotenv import load_dotenv
+
+# Imported first by main.py so that import time is measured; keep this module free of heavy imports
+load_dotenv()
+
+STARTUP_REPORT = os.getenv("STARTUP_REPORT", "true").lower() == "true"
+
+
+class StartupReport:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.phases: List[Tuple[str, float, str]] = []
+
+    def mark(self, phase: str, note: str = ""):
+
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last, note))
+        self.last = now
+
+    @property
+    def total(self) -> float:
+        return self.last - self.started
+
+    def summary(self) -> str:
+
+        parts = [f"{phase} {seconds * 1000:.0f}ms" + (f" ({note})" if note else "") for phase, seconds, note in self.phases]
+        return f"Startup ready in {self.total * 1000:.0f}ms: " + ", ".join(parts)
+
+    def publish(self):
+
+        from app.monitoring.metrics import app_startup_seconds
+
+        for phase, seconds, _ in self.phases:
+            app_startup_seconds.set(seconds, phase=phase)
+        if STARTUP_REPORT:
+            print(self.summary())
+
+
+startup_report = StartupReport()
@@ -0,0 +1,195 @@
+import logging
+import math
+import os
+import re
+import time
+from typing import Dict, Optional, Protocol, Tuple
+from fastapi import HTTPException, Request, status
+from dotenv import load_dotenv
+from app.dao.dao_user import UserDAO
+
+load_dotenv()
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_BACKEND_URL = os.getenv("RATE_LIMIT_BACKEND_URL", "")
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+
+RATE_LIMIT_AUTH = os.getenv("RATE_LIMIT_AUTH", "10/minute")
+RATE_LIMIT_CONTACT = os.getenv("RATE_LIMIT_CONTACT", "5/minute")
+RATE_LIMIT_SEARCH = os.getenv("RATE_LIMIT_SEARCH", "60/minute")
+RATE_LIMIT_WRITE = os.getenv("RATE_LIMIT_WRITE", "120/minute")
+RATE_LIMIT_READ = os.getenv("RATE_LIMIT_READ", "600/minute")
+RATE_LIMIT_EXPORT = os.getenv("RATE_LIMIT_EXPORT", "30/hour")
+RATE_LIMIT_METRICS = os.getenv("RATE_LIMIT_METRICS", "60/minute")
+
+CLIENT_IP = "ip"
+CLIENT_USER = "user"
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+logger = logging.getLogger(__name__)
+
+
+def parse_rate(spec: str) -> Tuple[int, float]:
+
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d*)\s*(second|minute|hour|day)s?\s*", spec)
+    if match is None:
+        raise ValueError(f"Invalid rate limit '{spec}', expected e.g. '10/minute'")
+    count, multiple, period = match.groups()
+    return int(count), int(multiple or 1) * PERIODS[period]
+
+
+class RateLimitBackend(Protocol):
+
+    async def take(self, key: str, rate: float, capacity: int) -> float:
+        """Consume one token and return 0, or the seconds until a token is available."""
+
+
+class MemoryBackend:
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self.buckets: Dict[str, Tuple[float, float]] = {}
+
+    async def take(self, key: str, rate: float, capacity: int) -> float:
+
+        now = time.monotonic()
+        tokens, updated = self.buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+
+        if len(self.buckets) >= self.max_keys and key not in self.buckets:
+            self._prune(now)
+        self.buckets[key] = (tokens, now)
+        return wait
+
+    def _prune(self, now: float):
+
+        # Buckets idle long enough to have refilled carry no state worth keeping.
+        self.buckets = {key: (tokens, updated) for key, (tokens, updated) in self.buckets.items() if now - updated < 3600}
+        if len(self.buckets) >= self.max_keys:
+            self.buckets.clear()
+
+
+_REDIS_TOKEN_BUCKET = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - updated) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBackend:
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_BACKEND_URL points at Redis but the 'redis' package is not installed") from e
+        self.prefix = prefix
+        self.client = redis.from_url(url)
+        self.script = self.client.register_script(_REDIS_TOKEN_BUCKET)
+
+    async def take(self, key: str, rate: float, capacity: int) -> float:
+        return float(await self.script(keys=[self.prefix + key], args=[rate, capacity]))
+
+
+def create_backend(url: str) -> RateLimitBackend:
+
+    if not url:
+        return MemoryBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported RATE_LIMIT_BACKEND_URL '{url}'")
+
+
+_backend: Optional[RateLimitBackend] = None
+
+
+def get_backend() -> RateLimitBackend:
+
+    global _backend
+    if _backend is None:
+        _backend = create_backend(RATE_LIMIT_BACKEND_URL)
+    return _backend
+
+
+def set_backend(backend: RateLimitBackend):
+
+    global _backend
+    _backend = backend
+
+
+def client_ip(request: Request) -> str:
+
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def client_user(request: Request) -> Optional[str]:
+
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = UserDAO(None).decode_access_token(token)
+    if not payload:
+        return None
+    return str(payload.get("uid") or payload.get("sub"))
+
+
+class RateLimit:
+
+    def __init__(self, name: str, spec: str, key: str = CLIENT_IP, methods: Optional[Tuple[str, ...]] = None):
+
+        count, period = parse_rate(spec)
+        self.name = name
+        self.capacity = count
+        self.rate = count / period
+        self.key = key
+        self.methods = methods
+
+    def _client(self, request: Request) -> str:
+
+        if self.key == CLIENT_USER:
+            user = client_user(request)
+            if user is not None:
+                return f"user:{user}"
+        return f"ip:{client_ip(request)}"
+
+    async def __call__(self, request: Request):
+
+        if not RATE_LIMIT_ENABLED or (self.methods and request.method not in self.methods):
+            return
+
+        try:
+            wait = await get_backend().take(f"{self.name}:{self._client(request)}", self.rate, self.capacity)
+        except Exception as e:
+            # A shared backend outage should not take the API down with it.
+            logger.warning("Rate limit backend failed, allowing request: %s", e)
+            return
+
+        if wait > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, please slow down",
+                headers={"Retry-After": str(max(math.ceil(wait), 1))},
+            )
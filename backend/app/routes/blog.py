@@ -1,15 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List, Union
-from app.models.model_user import User
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from typing import List, Optional, Tuple, Union
+from app.schemas.schema_user import CurrentUserDTO
 from app.dao.dao_blog import BlogDAO
-from app.schemas.schema_blog import BlogResponseDTO, BlogCreateDTO, BlogUpdateDTO
-from app.dao.get_dao import get_blog_dao
+from app.schemas.schema_blog import BlogResponseDTO, BlogSummaryDTO, BlogDetailResponseDTO, BlogCreateDTO, BlogUpdateDTO, BlogTrendingDTO
+from app.dao.view_counter import TRENDING_SIZE, trending, view_counter
+from app.dao.get_dao import MAX_BATCH_SIZE, get_blog_dao, get_blog_read_dao, get_blog_fields, get_page_params, parse_ids
+from app.dao.pagination import PageParams, set_page_headers
+from app.routes.fast_json import trusted_response
+from app.routes.http_cache import CACHE_CONTROL_BLOGS, CACHE_CONTROL_TRENDING, conditional_response, last_modified_of, make_etag
 from app.dao.get_dao import get_current_user
+from app.monitoring.query_guard import query_budget
 
 router = APIRouter(prefix="/blogs", tags=["blogs"])
 
+BLOG_VALIDATORS = ("blog_id", "modified_at", "revision")
+
 @router.post("/", response_model=BlogResponseDTO)
-async def create_blog(blog: BlogCreateDTO, current_user: User = Depends(get_current_user), dao_blog : BlogDAO = Depends(get_blog_dao)):
+async def create_blog(blog: BlogCreateDTO, current_user: CurrentUserDTO = Depends(get_current_user), dao_blog : BlogDAO = Depends(get_blog_dao)):
 
     try:
         new_blog = await dao_blog.create_blog(
@@ -23,76 +30,167 @@ async def create_blog(blog: BlogCreateDTO, current_user: User = Depends(get_curr
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail= f"Error creating blog {e}") from e
 
-@router.get("/", response_model=List[BlogResponseDTO])
-async def get_blogs(dao_blog : BlogDAO = Depends(get_blog_dao), current_user: User = Depends(get_current_user)):
+@router.post("/bulk", response_model=List[BlogResponseDTO])
+async def create_blogs(blogs: List[BlogCreateDTO], current_user: CurrentUserDTO = Depends(get_current_user), dao_blog : BlogDAO = Depends(get_blog_dao)):
+
+    if not blogs or len(blogs) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Send between 1 and {MAX_BATCH_SIZE} blogs")
+
+    try:
+        return await dao_blog.create_blogs([blog.model_dump() for blog in blogs], user_id=current_user.id)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail= f"Error creating blogs {e}") from e
+
+@router.get("/", response_model=List[Union[BlogResponseDTO, BlogSummaryDTO]], response_model_exclude_unset=True, dependencies=[Depends(query_budget(3))])
+async def get_blogs(
+    request: Request,
+    response: Response,
+    ids: Optional[str] = Query(None, description="Comma separated blog ids to fetch in one call"),
+    page: PageParams = Depends(get_page_params),
+    fields: Optional[Tuple[str, ...]] = Depends(get_blog_fields),
+    dao_blog : BlogDAO = Depends(get_blog_read_dao),
+    current_user: CurrentUserDTO = Depends(get_current_user)
+):
+
+    blog_ids = parse_ids(ids) if ids is not None else None
 
     try:
-        blogs = await dao_blog.get_all_blogs()
-        return blogs
+        if blog_ids is not None:
+            blogs = await dao_blog.get_blogs_by_ids(blog_ids, fields)
+            etag = make_etag(blogs, BLOG_VALIDATORS)
+            not_modified = conditional_response(request, response, etag, last_modified_of(blogs), CACHE_CONTROL_BLOGS)
+            return not_modified or trusted_response(response, blogs)
+
+        blogs = await dao_blog.get_all_blogs(page, fields)
+        set_page_headers(response, blogs)
+        etag = make_etag(blogs.items, BLOG_VALIDATORS, blogs.next_cursor, blogs.total)
+        not_modified = conditional_response(request, response, etag, last_modified_of(blogs.items), CACHE_CONTROL_BLOGS)
+        return not_modified or trusted_response(response, blogs.items)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error retrieving blogs") from e
 
-@router.put("/{blog_id}", response_model=BlogResponseDTO)
-async def update_blog(blog_id: int, blog: BlogUpdateDTO, current_user: User = Depends(get_current_user), dao_blog : BlogDAO = Depends(get_blog_dao)):
+@router.get("/trending", response_model=List[BlogTrendingDTO], response_model_exclude_unset=True)
+async def get_trending_blogs(
+    request: Request,
+    response: Response,
+    limit: int = Query(20, ge=1, le=TRENDING_SIZE),
+    current_user: CurrentUserDTO = Depends(get_current_user)
+):
 
     try:
-        existing_blog = await dao_blog.get_blogs_by_id(blog_id)
-        if existing_blog is None:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Blog not found")
-        if existing_blog.user_id != current_user.id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to update this blog")
+        await trending.ensure_loaded()
+        blogs = trending.items[:limit]
+        etag = make_etag(blogs, BLOG_VALIDATORS + ("views",))
+        not_modified = conditional_response(request, response, etag, trending.computed_at, CACHE_CONTROL_TRENDING)
+        return not_modified or trusted_response(response, blogs)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error retrieving trending blogs") from e
+
+@router.put("/{blog_id}", response_model=BlogResponseDTO)
+async def update_blog(blog_id: int, blog: BlogUpdateDTO, current_user: CurrentUserDTO = Depends(get_current_user), dao_blog : BlogDAO = Depends(get_blog_dao)):
 
+    try:
         updated_blog = await dao_blog.update_blog(
             blog_id=blog_id,
+            user_id=current_user.id,
             title=blog.title,
             content=blog.content,
             is_published = blog.is_published,
             category_id=blog.category_id
         )
         return updated_blog
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail= f"Error updating blog {e}")
 
 @router.delete("/{blog_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_blog(blog_id: int, current_user: User = Depends(get_current_user), dao_blog : BlogDAO = Depends(get_blog_dao)):
+async def delete_blog(blog_id: int, current_user: CurrentUserDTO = Depends(get_current_user), dao_blog : BlogDAO = Depends(get_blog_dao)):
 
     try:
-        blog = await dao_blog.get_blogs_by_id(blog_id)
-        if blog is None:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Blog not found")
-        if blog.user_id != current_user.id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this blog")
-
-        await dao_blog.delete_blog(blog_id)
+        await dao_blog.delete_blog(blog_id, user_id=current_user.id)
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error deleting blog") from e
 
-@router.get("/{id}/", response_model = Union[BlogResponseDTO, List[BlogResponseDTO]])
+@router.get("/{id}/", response_model = Union[BlogResponseDTO, List[Union[BlogResponseDTO, BlogSummaryDTO]]], response_model_exclude_unset=True, dependencies=[Depends(query_budget(3))])
 async def get_blog(
     id: int, 
-    get_type: str = Query(..., regex="^(USER|BLOG|CATG)$"),
-    current_user: User = Depends(get_current_user),
-    dao_blog : BlogDAO = Depends(get_blog_dao)
+    request: Request,
+    response: Response,
+    get_type: str = Query(..., pattern="^(USER|BLOG|CATG)$"),
+    page: PageParams = Depends(get_page_params),
+    fields: Optional[Tuple[str, ...]] = Depends(get_blog_fields),
+    current_user: CurrentUserDTO = Depends(get_current_user),
+    dao_blog : BlogDAO = Depends(get_blog_read_dao)
 ):
 
     try:
         if get_type == "USER":
-            blogs = await dao_blog.get_blogs_by_user(id)
+            blogs = await dao_blog.get_blogs_by_user(id, page, fields)
             if blogs is None:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No blogs found for this user_id")
-            return blogs
+            set_page_headers(response, blogs)
+            etag = make_etag(blogs.items, BLOG_VALIDATORS, blogs.next_cursor, blogs.total)
+            not_modified = conditional_response(request, response, etag, last_modified_of(blogs.items), CACHE_CONTROL_BLOGS)
+            return not_modified or trusted_response(response, blogs.items)
         
         elif get_type == "BLOG":
             blog = await dao_blog.get_blogs_by_id(id)
             if blog is None:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No blogs found for this blog_id")
-            return blog
+            view_counter.record(blog.blog_id)
+            etag = make_etag([blog], BLOG_VALIDATORS)
+            not_modified = conditional_response(request, response, etag, blog.modified_at, CACHE_CONTROL_BLOGS)
+            return not_modified or blog
         
         elif get_type == "CATG":
-            blog = await dao_blog.get_blogs_by_category_id(id)
-            if blog is None:
+            blogs = await dao_blog.get_blogs_by_category_id(id, page, fields)
+            if blogs is None:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No blogs found for this category_id")
-            return blog
+            set_page_headers(response, blogs)
+            etag = make_etag(blogs.items, BLOG_VALIDATORS + ("name",), blogs.next_cursor, blogs.total)
+            not_modified = conditional_response(request, response, etag, last_modified_of(blogs.items), CACHE_CONTROL_BLOGS)
+            return not_modified or trusted_response(response, blogs.items)
+
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error retrieving blog") from e
 
+@router.get("/{blog_id}/detail", response_model=BlogDetailResponseDTO, dependencies=[Depends(query_budget(4))])
+async def get_blog_detail(
+    blog_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(get_page_params),
+    current_user: CurrentUserDTO = Depends(get_current_user),
+    dao_blog : BlogDAO = Depends(get_blog_read_dao)
+):
+
+    try:
+        blog, comments = await dao_blog.get_blog_detail(blog_id, page)
+        if blog is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No blogs found for this blog_id")
+        view_counter.record(blog.blog_id)
+
+        set_page_headers(response, comments)
+        etag = make_etag(
+            [blog, blog.user, *([blog.category] if blog.category else []), *comments.items],
+            ("blog_id", "modified_at", "revision", "username", "category_id", "name", "comment_id"),
+            comments.next_cursor,
+            comments.total
+        )
+        not_modified = conditional_response(request, response, etag, last_modified_of([blog, *comments.items]), CACHE_CONTROL_BLOGS)
+        return not_modified or blog
+    except HTTPException as e:
+        raise e
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
     except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error retrieving blog") from e
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error retrieving blog") from e
@@ -1,15 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Path
 from typing import List
 from app.dao.dao_category import CategoryDAO
 from app.schemas.schema_category import CategoryResponseDTO, CategoryCreateDTO, CategoryUpdateDTO
-from app.dao.get_dao import get_category_dao
-from app.models.model_user import User
+from app.dao.get_dao import get_category_dao, get_category_read_dao, get_page_params
+from app.dao.pagination import PageParams, set_page_headers
+from app.routes.fast_json import trusted_response
+from app.routes.http_cache import CACHE_CONTROL_CATEGORIES, conditional_response, make_etag
+from app.schemas.schema_user import CurrentUserDTO
 from app.dao.get_dao import get_current_user
 
 router = APIRouter(prefix="/categories", tags=["categories"])
 
+CATEGORY_VALIDATORS = ("category_id", "name", "description", "user_id")
+
 @router.post("/", response_model=CategoryResponseDTO)
-async def create_category(category: CategoryCreateDTO, dao_category : CategoryDAO = Depends(get_category_dao), current_user: User = Depends(get_current_user)):
+async def create_category(category: CategoryCreateDTO, dao_category : CategoryDAO = Depends(get_category_dao), current_user: CurrentUserDTO = Depends(get_current_user)):
 
     try:
         new_category = await dao_category.create_category(
@@ -22,30 +27,41 @@ async def create_category(category: CategoryCreateDTO, dao_category : CategoryDA
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail= f"Error creating category{e}") from e
 
 @router.get("/", response_model=List[CategoryResponseDTO])
-async def get_categories(dao_category : CategoryDAO = Depends(get_category_dao)):
+async def get_categories(request: Request, response: Response, page: PageParams = Depends(get_page_params), dao_category : CategoryDAO = Depends(get_category_read_dao)):
 
     try:
-        categories = await dao_category.get_all_categories()
-        return categories
+        categories = await dao_category.get_all_categories(page)
+        set_page_headers(response, categories)
+        etag = make_etag(categories.items, CATEGORY_VALIDATORS, categories.next_cursor, categories.total)
+        not_modified = conditional_response(request, response, etag, cache_control=CACHE_CONTROL_CATEGORIES)
+        return not_modified or trusted_response(response, categories.items)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error retrieving categories") from e
     
 @router.get("/{user_id}", response_model = List[CategoryResponseDTO])
-async def get_categories_by_user_id(user_id: int = Path(..., title="User ID"), dao_category : CategoryDAO = Depends(get_category_dao)):
+async def get_categories_by_user_id(request: Request, response: Response, user_id: int = Path(..., title="User ID"), dao_category : CategoryDAO = Depends(get_category_read_dao)):
     try:
         categories = await dao_category.get_categories_by_user(user_id)
-        return categories
+        etag = make_etag(categories, CATEGORY_VALIDATORS)
+        not_modified = conditional_response(request, response, etag, cache_control=CACHE_CONTROL_CATEGORIES)
+        return not_modified or categories
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error retrieving categories") from e
 
 @router.get("/{category_id}", response_model=CategoryResponseDTO)
-async def get_category_by_id(category_id: int, dao_category : CategoryDAO = Depends(get_category_dao)):
+async def get_category_by_id(category_id: int, request: Request, response: Response, dao_category : CategoryDAO = Depends(get_category_read_dao)):
 
     try:
         category = await dao_category.get_category_by_id(category_id)
         if category is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
-        return category
+        etag = make_etag([category], CATEGORY_VALIDATORS)
+        not_modified = conditional_response(request, response, etag, cache_control=CACHE_CONTROL_CATEGORIES)
+        return not_modified or category
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error retrieving category") from e
 
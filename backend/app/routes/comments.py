@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from app.models.model_user import User
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from typing import Dict, List
+from app.schemas.schema_user import CurrentUserDTO
 from app.dao.dao_comment import CommentDAO
 from app.schemas.schema_comment import CommentResponseDTO, CommentCreateDTO, CommentUpdateDTO
 from app.dao.get_dao import get_current_user
-from app.dao.get_dao import get_comment_dao
+from app.dao.get_dao import MAX_BATCH_SIZE, get_comment_dao, get_comment_read_dao, get_page_params, parse_ids
+from app.dao.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PageParams, set_page_headers
+from app.monitoring.query_guard import query_budget
+from app.routes.fast_json import trusted_response
+from app.routes.http_cache import CACHE_CONTROL_COMMENTS, conditional_response, last_modified_of, make_etag
 
 router = APIRouter(prefix="/comments", tags=["comments"])
 
+COMMENT_VALIDATORS = ("comment_id", "modified_at", "revision")
+
 @router.post("/", response_model=CommentResponseDTO)
-async def create_comment(comment: CommentCreateDTO, current_user: User = Depends(get_current_user), dao_comment : CommentDAO = Depends(get_comment_dao)):
+async def create_comment(comment: CommentCreateDTO, current_user: CurrentUserDTO = Depends(get_current_user), dao_comment : CommentDAO = Depends(get_comment_dao)):
 
     try:
         new_comment = await dao_comment.create_comment(
@@ -21,52 +27,88 @@ async def create_comment(comment: CommentCreateDTO, current_user: User = Depends
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail = f"Error creating comment {e}") from e
 
+@router.post("/bulk", response_model=List[CommentResponseDTO])
+async def create_comments(comments: List[CommentCreateDTO], current_user: CurrentUserDTO = Depends(get_current_user), dao_comment : CommentDAO = Depends(get_comment_dao)):
+
+    if not comments or len(comments) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Send between 1 and {MAX_BATCH_SIZE} comments")
+
+    try:
+        return await dao_comment.create_comments([comment.model_dump() for comment in comments], user_id=current_user.id)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail = f"Error creating comments {e}") from e
+
+@router.get("/", response_model=Dict[int, List[CommentResponseDTO]], dependencies=[Depends(query_budget(3))])
+async def get_comments_for_blogs(
+    request: Request,
+    response: Response,
+    blog_ids: str = Query(..., description="Comma separated blog ids"),
+    per_blog: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Oldest comments returned per blog; page through the rest with /comments/blogs/{blog_id}/comments"),
+    dao_comment : CommentDAO = Depends(get_comment_read_dao),
+    current_user: CurrentUserDTO = Depends(get_current_user)
+):
+
+    ids = parse_ids(blog_ids, "blog_ids")
+
+    try:
+        grouped = await dao_comment.get_comments_by_blog_ids(ids, per_blog)
+        comments = [comment for group in grouped.values() for comment in group]
+        etag = make_etag(comments, COMMENT_VALIDATORS, ids, per_blog)
+        not_modified = conditional_response(request, response, etag, last_modified_of(comments), CACHE_CONTROL_COMMENTS)
+        return not_modified or trusted_response(response, grouped)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching comments: {e}")
+
 @router.get("/{comment_id}")
-async def get_comment_by_id(comment_id: int,  dao_comment : CommentDAO = Depends(get_comment_dao)):
+async def get_comment_by_id(comment_id: int, request: Request, response: Response, dao_comment : CommentDAO = Depends(get_comment_read_dao)):
 
     try:
         comment = await dao_comment.get_comment_by_id(comment_id)
         if comment is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
-        return comment
+        etag = make_etag([comment], COMMENT_VALIDATORS)
+        not_modified = conditional_response(request, response, etag, comment.modified_at, CACHE_CONTROL_COMMENTS)
+        return not_modified or comment
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error retrieving comment {e}") from e
 
 @router.put("/{comment_id}", response_model=CommentResponseDTO)
-async def update_comment(comment_id: int, comment: CommentUpdateDTO, current_user: User = Depends(get_current_user),  dao_comment : CommentDAO = Depends(get_comment_dao)):
+async def update_comment(comment_id: int, comment: CommentUpdateDTO, current_user: CurrentUserDTO = Depends(get_current_user),  dao_comment : CommentDAO = Depends(get_comment_dao)):
 
     try:
-        existing_comment = await dao_comment.get_comment_by_id(comment_id)
-        if existing_comment is None:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
-        if existing_comment.user_id != current_user.id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to update this comment")
-
         updated_comment = await dao_comment.update_comment(
             comment_id=comment_id,
+            user_id=current_user.id,
             content=comment.content
         )
         return updated_comment
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error updating comment {e}") from e
 
 @router.delete("/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_comment(comment_id: int,  dao_comment : CommentDAO = Depends(get_comment_dao)):
+async def delete_comment(comment_id: int, current_user: CurrentUserDTO = Depends(get_current_user), dao_comment : CommentDAO = Depends(get_comment_dao)):
 
     try:
-        comment = await dao_comment.get_comment_by_id(comment_id)
-        if comment is None:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
-
-        await dao_comment.delete_comment(comment_id)
+        await dao_comment.delete_comment(comment_id, user_id=current_user.id)
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error deleting comment") from e
     
-@router.get("/blogs/{blog_id}/comments", response_model=List[CommentResponseDTO])
-async def get_comments_for_blog(blog_id: int,  dao_comment : CommentDAO = Depends(get_comment_dao), current_user: User = Depends(get_current_user)):
+@router.get("/blogs/{blog_id}/comments", response_model=List[CommentResponseDTO], dependencies=[Depends(query_budget(3))])
+async def get_comments_for_blog(blog_id: int, request: Request, response: Response, page: PageParams = Depends(get_page_params), dao_comment : CommentDAO = Depends(get_comment_read_dao), current_user: CurrentUserDTO = Depends(get_current_user)):
 
     try:
-        comments = await dao_comment.get_comments_by_blog_id(blog_id)
-        return comments
+        comments = await dao_comment.get_comments_by_blog_id(blog_id, page)
+        set_page_headers(response, comments)
+        etag = make_etag(comments.items, COMMENT_VALIDATORS, comments.next_cursor, comments.total)
+        not_modified = conditional_response(request, response, etag, last_modified_of(comments.items), CACHE_CONTROL_COMMENTS)
+        return not_modified or trusted_response(response, comments.items)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching comments: {e}")
\ No newline at end of file
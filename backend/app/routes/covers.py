@@ -0,0 +1,46 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from typing import List
+from dotenv import load_dotenv
+from app.dao.cover_images import cover_images, cover_term
+from app.dao.dao_blog import BlogDAO
+from app.dao.get_dao import get_blog_read_dao, get_current_user
+from app.schemas.schema_cover import CoverImagesDTO
+from app.schemas.schema_user import CurrentUserDTO
+from app.monitoring.query_guard import query_budget
+from app.routes.http_cache import CACHE_CONTROL_COVERS, conditional_response, make_etag
+
+load_dotenv()
+
+COVER_IMAGE_BATCH_LIMIT = int(os.getenv("COVER_IMAGE_BATCH_LIMIT", "100"))
+
+router = APIRouter(prefix="/covers", tags=["covers"])
+
+@router.get("/", response_model=CoverImagesDTO, dependencies=[Depends(query_budget(3))])
+async def get_cover_images(
+    request: Request,
+    response: Response,
+    blog_id: List[int] = Query([], description="Repeat for each blog; its title is the search text"),
+    category: List[str] = Query([], description="Repeat for each category name"),
+    current_user: CurrentUserDTO = Depends(get_current_user),
+    dao_blog: BlogDAO = Depends(get_blog_read_dao)
+):
+
+    try:
+        if len(blog_id) + len(category) > COVER_IMAGE_BATCH_LIMIT:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {COVER_IMAGE_BATCH_LIMIT} covers per request")
+
+        titles = {blog["blog_id"]: cover_term(blog["title"]) for blog in await dao_blog.get_blogs_by_ids(blog_id, ["title"])} if blog_id else {}
+        names = {name: cover_term(name) for name in category}
+        urls = await cover_images.resolve([*titles.values(), *names.values()])
+
+        covers = CoverImagesDTO(
+            blogs={blog: urls.get(term) for blog, term in titles.items()},
+            categories={name: urls.get(term) for name, term in names.items()},
+        )
+        etag = make_etag([], (), sorted(covers.blogs.items()), sorted(covers.categories.items()))
+        return conditional_response(request, response, etag, cache_control=CACHE_CONTROL_COVERS) or covers
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error resolving cover images") from e
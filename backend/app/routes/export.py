@@ -0,0 +1,53 @@
+import os
+from datetime import datetime, timezone
+from typing import Optional
+import orjson
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from dotenv import load_dotenv
+from app.dao.dao_blog import BlogDAO
+from app.dao.dao_comment import CommentDAO
+from app.dao.get_dao import get_current_user
+from app.database.database import ReadSessionLocal
+from app.schemas.schema_user import CurrentUserDTO
+
+load_dotenv()
+
+EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", "500"))
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+def _as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value is not None and value.tzinfo else value
+
+
+def _export_response(stream) -> StreamingResponse:
+
+    # The session lives inside the generator because the body is sent after the endpoint returns.
+    async def body():
+        async with ReadSessionLocal() as db:
+            async for rows in stream(db):
+                yield b"".join(orjson.dumps(row) + b"\n" for row in rows)
+
+    watermark = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0).isoformat()
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE, headers={"X-Export-Watermark": watermark})
+
+
+@router.get("/blogs")
+async def export_blogs(
+    modified_since: Optional[datetime] = Query(None, description="Only blogs modified at or after this UTC timestamp"),
+    current_user: CurrentUserDTO = Depends(get_current_user)
+):
+    since = _as_naive_utc(modified_since)
+    return _export_response(lambda db: BlogDAO(db).stream_blogs(since, EXPORT_FETCH_SIZE))
+
+
+@router.get("/comments")
+async def export_comments(
+    modified_since: Optional[datetime] = Query(None, description="Only comments modified at or after this UTC timestamp"),
+    current_user: CurrentUserDTO = Depends(get_current_user)
+):
+    since = _as_naive_utc(modified_since)
+    return _export_response(lambda db: CommentDAO(db).stream_comments(since, EXPORT_FETCH_SIZE))
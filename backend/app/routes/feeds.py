@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from typing import Optional
+from app.dao.feed_cache import RenderedFeed, feed_cache
+from app.database.database import ReadSessionLocal
+from app.routes.http_cache import CACHE_CONTROL_FEEDS, conditional_response
+
+router = APIRouter(tags=["feeds"])
+
+def _scope(category_id: Optional[int], author_id: Optional[int]):
+
+    if category_id is not None and author_id is not None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Filter by category_id or author_id, not both")
+    if category_id is not None:
+        return "category", category_id
+    if author_id is not None:
+        return "author", author_id
+    return None, None
+
+def _xml_response(request: Request, feed: RenderedFeed, media_type: str) -> Response:
+
+    response = Response(content=feed.body, media_type=media_type)
+    not_modified = conditional_response(request, response, feed.etag, feed.last_modified, CACHE_CONTROL_FEEDS)
+    return not_modified or response
+
+@router.get("/feed.xml", response_class=Response)
+async def rss_feed(request: Request, category_id: Optional[int] = Query(None), author_id: Optional[int] = Query(None)):
+    await feed_cache.ensure_loaded(ReadSessionLocal)
+    return _xml_response(request, feed_cache.get("rss", *_scope(category_id, author_id)), "application/rss+xml")
+
+@router.get("/atom.xml", response_class=Response)
+async def atom_feed(request: Request, category_id: Optional[int] = Query(None), author_id: Optional[int] = Query(None)):
+    await feed_cache.ensure_loaded(ReadSessionLocal)
+    return _xml_response(request, feed_cache.get("atom", *_scope(category_id, author_id)), "application/atom+xml")
+
+@router.get("/sitemap.xml", response_class=Response)
+async def sitemap(request: Request):
+    await feed_cache.ensure_loaded(ReadSessionLocal)
+    return _xml_response(request, feed_cache.get("sitemap"), "application/xml")
@@ -0,0 +1,87 @@
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Iterable, Optional, Sequence
+from fastapi import Request, Response, status
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CACHE_CONTROL_BLOGS = os.getenv("CACHE_CONTROL_BLOGS", "private, no-cache")
+CACHE_CONTROL_COMMENTS = os.getenv("CACHE_CONTROL_COMMENTS", "private, no-cache")
+CACHE_CONTROL_CATEGORIES = os.getenv("CACHE_CONTROL_CATEGORIES", "public, max-age=60")
+CACHE_CONTROL_SEARCH = os.getenv("CACHE_CONTROL_SEARCH", "public, max-age=30")
+CACHE_CONTROL_FEEDS = os.getenv("CACHE_CONTROL_FEEDS", "public, max-age=300")
+CACHE_CONTROL_TRENDING = os.getenv("CACHE_CONTROL_TRENDING", "public, max-age=60")
+CACHE_CONTROL_COVERS = os.getenv("CACHE_CONTROL_COVERS", "private, max-age=3600")
+
+
+def _field(item: Any, name: str) -> Any:
+    return item.get(name) if isinstance(item, dict) else getattr(item, name, None)
+
+
+def make_etag(items: Iterable[Any], fields: Sequence[str], *extra: Any) -> str:
+
+    digest = hashlib.blake2b(digest_size=16)
+    for item in items:
+        digest.update(repr(tuple(_field(item, name) for name in fields)).encode())
+    digest.update(repr(extra).encode())
+    return f'W/"{digest.hexdigest()}"'
+
+
+def last_modified_of(items: Iterable[Any], field: str = "modified_at") -> Optional[datetime]:
+
+    stamps = [_field(item, field) for item in items]
+    stamps = [stamp for stamp in stamps if stamp is not None]
+    return max(stamps) if stamps else None
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _not_modified_since(header: str, last_modified: datetime) -> bool:
+
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = CACHE_CONTROL_BLOGS
+) -> Optional[Response]:
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    if last_modified is not None:
+        response.headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag)
+    elif if_modified_since is not None and last_modified is not None:
+        not_modified = _not_modified_since(if_modified_since, last_modified)
+    else:
+        not_modified = False
+
+    if not_modified:
+        headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
@@ -1,13 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from app.dao.get_dao import get_blog_dao
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import List, Optional, Tuple, Union
+from app.dao.get_dao import get_blog_read_dao, get_search_fields
 from app.dao.dao_blog import BlogDAO
+from app.schemas.schema_blog import BlogSearchResultDTO, BlogSummaryDTO
+from app.monitoring.query_guard import query_budget
+from app.routes.fast_json import trusted_response
+from app.routes.http_cache import CACHE_CONTROL_SEARCH, conditional_response, last_modified_of, make_etag
 
 router = APIRouter(prefix="/search", tags=["search"])
 
-@router.get("/blogs")
-async def search_blogs(q: str = Query(..., description="Search query"), dao_blog: BlogDAO = Depends(get_blog_dao)):
+@router.get("/blogs", response_model=List[Union[BlogSearchResultDTO, BlogSummaryDTO]], response_model_exclude_unset=True, dependencies=[Depends(query_budget(2))])
+async def search_blogs(
+    request: Request,
+    response: Response,
+    q: str = Query(..., description="Search query"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    fields: Optional[Tuple[str, ...]] = Depends(get_search_fields),
+    dao_blog: BlogDAO = Depends(get_blog_read_dao)
+):
     try:
-        results = await dao_blog.search_blogs(search_query=q)
-        return results
+        results = await dao_blog.search_blogs(search_query=q, limit=limit, offset=offset, fields=fields)
+        etag = make_etag(results, ("blog_id", "modified_at", "revision", "rank"))
+        not_modified = conditional_response(request, response, etag, last_modified_of(results), CACHE_CONTROL_SEARCH)
+        return not_modified or trusted_response(response, results)
     except Exception as e:
-        raise HTTPException(status_code=500,detail="An error occurred while searching blogs")
\ No newline at end of file
+        raise HTTPException(status_code=500,detail="An error occurred while searching blogs")
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from app.dao.dao_user import UserDAO
-from app.schemas.schema_user import UserCreateDTO, RefreshTokenDTO
-from app.dao.get_dao import get_user_dao
+from app.schemas.schema_user import UserCreateDTO, RefreshTokenDTO, PasswordChangeDTO, CurrentUserDTO
+from app.dao.get_dao import get_user_dao, get_current_user
 import jwt
 
 router = APIRouter(tags=["auth"])
@@ -21,6 +21,9 @@ async def create_user(user_data: UserCreateDTO, dao_user : UserDAO = Depends(get
 
         return {"message": "User created successfully"}
 
+    except HTTPException as e:
+        raise e
+
     except Exception as e:
         print(f"Error in token generation: {str(e)}")
 
@@ -38,8 +41,8 @@ async def token(user: OAuth2PasswordRequestForm = Depends(), dao_user : UserDAO
         if user_retrieved is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid username or password")
 
-        access_token = dao_user.create_access_token({"sub": user_retrieved.username})
-        refresh_token = dao_user.create_refresh_token({"user": user_retrieved.username})
+        access_token = dao_user.create_access_token(dao_user.token_claims(user_retrieved))
+        refresh_token = dao_user.create_refresh_token({"user": user_retrieved.username, "ver": user_retrieved.token_version})
 
         return {"access_token": access_token, 
                 "refresh_token":refresh_token,
@@ -48,6 +51,9 @@ async def token(user: OAuth2PasswordRequestForm = Depends(), dao_user : UserDAO
                 "username":user_retrieved.username,
                 "email":user_retrieved.email}
 
+    except HTTPException as e:
+        raise e
+
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
 
@@ -64,9 +70,28 @@ async def refresh_token(refresh_data: RefreshTokenDTO, dao_user : UserDAO = Depe
         if not username:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
 
-        new_access_token = dao_user.create_access_token({"user": username})
+        user = await dao_user.get_user_by_username(username)
+        if user is None or payload.get("ver", 0) != user.token_version:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token has been revoked")
+
+        new_access_token = dao_user.create_access_token(dao_user.token_claims(user))
 
         return {"access_token": new_access_token, "token_type": "bearer"}
     
     except HTTPException as e:
-        raise e
\ No newline at end of file
+        raise e
+
+@router.put("/password/")
+async def change_password(password_data: PasswordChangeDTO, current_user: CurrentUserDTO = Depends(get_current_user), dao_user : UserDAO = Depends(get_user_dao)):
+
+    user = await dao_user.authenticate_user(current_user.username, password_data.current_password)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid username or password")
+
+    user = await dao_user.update_password(user.id, password_data.new_password)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    return {"access_token": dao_user.create_access_token(dao_user.token_claims(user)),
+            "refresh_token": dao_user.create_refresh_token({"user": user.username, "ver": user.token_version}),
+            "token_type": "bearer"}
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional, List
 from pydantic import BaseModel, ConfigDict
-from app.schemas.schema_user import UserResponseDTO
+from app.schemas.schema_user import AuthorDTO
 from app.schemas.schema_category import CategoryResponseDTO
 from app.schemas.schema_comment import CommentResponseDTO
 
@@ -24,17 +24,49 @@ class BlogResponseDTO(BaseModel):
     is_published : Optional[bool] = None
     created_at: datetime
     modified_at: datetime
+    revision: int = 0
     user_id: int
     category_id: Optional[int]
     name : Optional[str] = None
+    excerpt: Optional[str] = None
+    content_html: Optional[str] = None
+    word_count: Optional[int] = None
+    reading_minutes: Optional[int] = None
 
     model_config = ConfigDict(
         from_attributes=True,
         extra='allow'
     )
 
+class BlogSummaryDTO(BaseModel):
+    blog_id: int
+    modified_at: datetime
+    revision: int = 0
+    title: Optional[str] = None
+    content: Optional[str] = None
+    excerpt: Optional[str] = None
+    word_count: Optional[int] = None
+    reading_minutes: Optional[int] = None
+    is_published : Optional[bool] = None
+    created_at: Optional[datetime] = None
+    user_id: Optional[int] = None
+    category_id: Optional[int] = None
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        extra='allow'
+    )
+
+class BlogTrendingDTO(BlogSummaryDTO):
+    views: int
+    score: float
+
+class BlogSearchResultDTO(BlogResponseDTO):
+    rank: Optional[float] = None
+    snippet: Optional[str] = None
+
 class BlogDetailResponseDTO(BlogResponseDTO):
-    user: UserResponseDTO
+    user: AuthorDTO
     category: Optional[CategoryResponseDTO]
     comments: List[CommentResponseDTO] = []
 
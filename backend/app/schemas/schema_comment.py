@@ -14,6 +14,7 @@ class CommentResponseDTO(BaseModel):
     content: str
     created_at: datetime
     modified_at: datetime
+    revision: int = 0
     user_id: int
     blog_id: int
 
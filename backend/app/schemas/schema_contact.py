@@ -11,3 +11,6 @@ class ContactResponseDTO(ContactCreateDTO):
 
     class Config:
         from_attributes = True
+
+class ContactAcceptedDTO(ContactCreateDTO):
+    status: str = "queued"
@@ -0,0 +1,7 @@
+from typing import Dict, Optional
+from pydantic import BaseModel
+
+class CoverImagesDTO(BaseModel):
+    # null where no image was found; the client shows its default cover
+    blogs: Dict[int, Optional[str]] = {}
+    categories: Dict[str, Optional[str]] = {}
@@ -20,6 +20,27 @@ class UserResponseDTO(BaseModel):
         extra='allow'
     )
 
+class AuthorDTO(BaseModel):
+    # What other readers may see of a user; no email
+    id: int
+    username: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+class CurrentUserDTO(BaseModel):
+    id: int
+    username: str
+    token_version: int = 0
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        frozen=True
+    )
+
+class PasswordChangeDTO(BaseModel):
+    current_password: str
+    new_password: str
+
 class RefreshTokenDTO(BaseModel):
     
     model_config = ConfigDict(
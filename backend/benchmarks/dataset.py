@@ -0,0 +1,103 @@
+import random
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dao.password_hasher import get_pwd_context
+from app.dao.rendering import render_content
+from app.models.model_blog import Blog
+from app.models.model_category import Category
+from app.models.model_comment import Comment
+from app.models.model_user import User
+
+BENCHMARK_PASSWORD = "benchmark-password"
+
+VOCABULARY = (
+    "python fastapi react postgres sqlite index query cache latency throughput async await database "
+    "design pattern service frontend backend deploy docker cloud scale worker queue stream search "
+    "travel food music photography garden coffee running books writing history science space ocean"
+).split()
+
+
+@dataclass
+class DatasetSize:
+    users: int = 50
+    categories: int = 10
+    blogs: int = 1000
+    comments: int = 5000
+
+
+@dataclass
+class Dataset:
+    usernames: List[str]
+    blog_ids: List[int]
+    category_ids: List[int]
+    vocabulary: List[str]
+
+
+def _sentence(rng: random.Random) -> str:
+    words = rng.choices(VOCABULARY, k=rng.randint(6, 18))
+    return " ".join(words).capitalize() + "."
+
+
+def _content(rng: random.Random) -> str:
+    paragraphs = max(1, int(rng.lognormvariate(1.6, 0.6)))
+    return "".join(
+        "<p>" + " ".join(_sentence(rng) for _ in range(rng.randint(2, 6))) + "</p>"
+        for _ in range(paragraphs)
+    )
+
+
+async def _insert(db: AsyncSession, model, rows: List[dict], key=None, batch_size: int = 1000) -> List[int]:
+
+    ids = []
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        if key is None:
+            await db.execute(insert(model), batch)
+        else:
+            result = await db.execute(insert(model).returning(key, sort_by_parameter_order=True), batch)
+            ids.extend(result.scalars().all())
+    return ids
+
+
+async def seed_dataset(db: AsyncSession, size: DatasetSize, seed: int = 42) -> Dataset:
+
+    rng = random.Random(seed)
+    hashed_password = get_pwd_context().hash(BENCHMARK_PASSWORD)
+
+    usernames = [f"bench_user_{i}" for i in range(size.users)]
+    user_ids = await _insert(db, User, [
+        {"username": username, "email": f"{username}@example.com", "hashed_password": hashed_password}
+        for username in usernames
+    ], key=User.id)
+
+    category_ids = await _insert(db, Category, [
+        {"name": f"bench-category-{i}", "description": _sentence(rng), "user_id": rng.choice(user_ids)}
+        for i in range(size.categories)
+    ], key=Category.category_id)
+
+    blogs = []
+    rendered_at = datetime.utcnow().replace(microsecond=0)
+    for _ in range(size.blogs):
+        content = _content(rng)
+        blogs.append({
+            "title": _sentence(rng)[:80],
+            "content": content,
+            **render_content(content).values(),
+            "modified_at": rendered_at,
+            "rendered_at": rendered_at,
+            "is_published": rng.random() < 0.9,
+            "user_id": rng.choice(user_ids),
+            "category_id": rng.choice(category_ids),
+        })
+    blog_ids = await _insert(db, Blog, blogs, key=Blog.blog_id)
+
+    await _insert(db, Comment, [
+        {"content": _sentence(rng), "blog_id": rng.choice(blog_ids), "user_id": rng.choice(user_ids)}
+        for _ in range(size.comments)
+    ])
+
+    await db.commit()
+    return Dataset(usernames=usernames, blog_ids=blog_ids, category_ids=category_ids, vocabulary=list(VOCABULARY))
@@ -0,0 +1,282 @@
+"""Index advisor for the Blogifyy DAO queries.
+
+Runs every read path of the DAOs against a seeded database, captures the SQL
+they send and prints the EXPLAIN (Postgres) / EXPLAIN QUERY PLAN (SQLite) of
+each statement, flagging full table scans and sorts that are not served by an
+index. Exits with status 1 when an unexpected finding is reported, so it can
+guard schema or query changes in CI.
+
+    cd backend
+    python -m benchmarks.index_advisor --blogs 5000 --comments 20000
+
+Pass --database-url to check an existing Postgres database; add --no-seed to
+plan against the data already there. Postgres prefers sequential scans on tiny
+tables, so seed a realistic amount of rows before trusting its plans.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.load_test import configure_environment
+
+SCAN = "full scan"
+SORT = "sort"
+INDEX_SCAN = "index scan without limit"
+PAGE_SIZE = 20
+
+
+def parse_args(argv=None):
+
+    parser = argparse.ArgumentParser(description="EXPLAIN every DAO query and flag full scans and sorts")
+    parser.add_argument("--database-url", default=None, help="Database to plan against (default: temp SQLite file)")
+    parser.add_argument("--no-seed", action="store_true", help="Plan against the rows already in --database-url")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--blogs", type=int, default=5000)
+    parser.add_argument("--comments", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--verbose", action="store_true", help="Print the plan of every statement, not just flagged ones")
+    return parser.parse_args(argv)
+
+
+@dataclass
+class Sample:
+    blog_id: int
+    user_id: int
+    username: str
+    category_id: int
+    term: str
+    since: datetime
+
+
+@dataclass
+class Scenario:
+    name: str
+    run: Callable[..., Awaitable]
+    # Findings that are inherent to the query, e.g. exports walk every row and search sorts by rank
+    expected: Tuple[str, ...] = ()
+
+
+@dataclass
+class Statement:
+    scenario: Scenario
+    sql: str
+    parameters: tuple
+    plan: List[str] = field(default_factory=list)
+    findings: List[str] = field(default_factory=list)
+
+
+async def _drain(stream):
+
+    async for _ in stream:
+        pass
+
+
+def build_scenarios() -> List[Scenario]:
+
+    from app.dao.dao_blog import SUMMARY_FIELDS, BlogDAO
+    from app.dao.dao_blog_view import BlogViewDAO
+    from app.dao.dao_category import CategoryDAO
+    from app.dao.dao_comment import CommentDAO
+    from app.dao.dao_cover_image import CoverImageDAO
+    from app.dao.dao_user import UserDAO
+    from app.dao.feed_cache import FeedCache
+    from app.dao.pagination import PageParams
+    from app.dao.view_counter import TRENDING_SIZE, current_hour, decay_weights
+
+    async def paged(call):
+        page = await call(PageParams(limit=PAGE_SIZE, include_total=True))
+        if page.next_cursor:
+            await call(PageParams(limit=PAGE_SIZE, cursor=page.next_cursor))
+
+    async def feed_cache(db, s):
+        cache = FeedCache()
+        await cache.load(db)
+        await cache.blogs_changed(db, [s.blog_id])
+
+    return [
+        Scenario("BlogDAO.get_all_blogs", lambda db, s: paged(lambda page: BlogDAO(db).get_all_blogs(page)), (INDEX_SCAN,)),
+        Scenario("BlogDAO.get_all_blogs(summary)", lambda db, s: paged(lambda page: BlogDAO(db).get_all_blogs(page, SUMMARY_FIELDS)), (INDEX_SCAN,)),
+        Scenario("BlogDAO.get_blogs_by_user", lambda db, s: paged(lambda page: BlogDAO(db).get_blogs_by_user(s.user_id, page))),
+        Scenario("BlogDAO.get_blogs_by_category_id", lambda db, s: paged(lambda page: BlogDAO(db).get_blogs_by_category_id(s.category_id, page))),
+        Scenario("BlogDAO.get_blogs_by_ids", lambda db, s: BlogDAO(db).get_blogs_by_ids([s.blog_id])),
+        Scenario("BlogDAO.get_blogs_by_id", lambda db, s: BlogDAO(db).get_blogs_by_id(s.blog_id)),
+        Scenario("BlogDAO.get_blog_detail", lambda db, s: BlogDAO(db).get_blog_detail(s.blog_id, PageParams(limit=PAGE_SIZE))),
+        Scenario("BlogDAO.search_blogs", lambda db, s: BlogDAO(db).search_blogs(s.term), (SORT,)),
+        Scenario("BlogDAO.stream_blogs", lambda db, s: _drain(BlogDAO(db).stream_blogs(s.since)), (SCAN, INDEX_SCAN)),
+        Scenario("CommentDAO.get_comments_by_blog_id", lambda db, s: paged(lambda page: CommentDAO(db).get_comments_by_blog_id(s.blog_id, page))),
+        # The table is read by index seeks; the scan and sort run over the numbered rows, at most per_blog for each id
+        Scenario("CommentDAO.get_comments_by_blog_ids", lambda db, s: CommentDAO(db).get_comments_by_blog_ids([s.blog_id, s.blog_id + 1]), (SCAN, SORT)),
+        Scenario("CommentDAO.get_comment_by_id", lambda db, s: CommentDAO(db).get_comment_by_id(1)),
+        Scenario("CommentDAO.stream_comments", lambda db, s: _drain(CommentDAO(db).stream_comments(s.since)), (SCAN, INDEX_SCAN)),
+        Scenario("CategoryDAO.get_all_categories", lambda db, s: paged(lambda page: CategoryDAO(db).get_all_categories(page)), (INDEX_SCAN,)),
+        Scenario("CategoryDAO.get_categories_by_user", lambda db, s: CategoryDAO(db).get_categories_by_user(s.user_id)),
+        Scenario("CategoryDAO.get_category_by_id", lambda db, s: CategoryDAO(db).get_category_by_id(s.category_id)),
+        Scenario("UserDAO.get_user_by_username", lambda db, s: UserDAO(db).get_user_by_username(s.username)),
+        Scenario("UserDAO.user_exists", lambda db, s: UserDAO(db).user_exists(s.username, f"{s.username}@example.com")),
+        # Trending ranks by an aggregate, so it always sorts; it runs once per refresh interval, not per request
+        Scenario("BlogViewDAO.top_blogs", lambda db, s: BlogViewDAO(db).top_blogs(decay_weights(current_hour()), TRENDING_SIZE), (SORT,)),
+        Scenario("FeedCache.load", feed_cache, (SCAN, INDEX_SCAN, SORT)),
+        Scenario("CoverImageDAO.get_many", lambda db, s: CoverImageDAO(db).get_many([s.term, s.username])),
+    ]
+
+
+def _sqlite_findings(sql: str, plan: List[str]) -> List[str]:
+
+    findings = []
+    limited = re.search(r"\bLIMIT\b", sql, re.IGNORECASE) is not None
+    filtered = re.search(r"\bWHERE\b", sql, re.IGNORECASE) is not None
+    sorted_in_memory = any("TEMP B-TREE" in line for line in plan)
+    # A scan in index (or rowid) order that stops at LIMIT only reads the rows of one page
+    early_stop = limited and not sorted_in_memory
+    for line in plan:
+        if "TEMP B-TREE" in line:
+            findings.append(SORT)
+        elif line.startswith("SCAN ") and "VIRTUAL TABLE" not in line:
+            if " USING " not in line and (filtered or not early_stop):
+                findings.append(SCAN)
+            elif not early_stop:
+                findings.append(INDEX_SCAN)
+    return findings
+
+
+def _postgres_nodes(node: dict, depth: int = 0):
+
+    yield node, depth
+    for child in node.get("Plans", []):
+        yield from _postgres_nodes(child, depth + 1)
+
+
+def _postgres_findings(plan: dict) -> Tuple[List[str], List[str]]:
+
+    lines, findings = [], []
+    limited = plan.get("Node Type") == "Limit"
+    for node, depth in _postgres_nodes(plan):
+        kind = node["Node Type"]
+        target = " ".join(part for part in (
+            f"on {node['Relation Name']}" if "Relation Name" in node else "",
+            f"using {node['Index Name']}" if "Index Name" in node else "",
+            f"filter {node['Filter']}" if "Filter" in node else "",
+        ) if part)
+        lines.append(f"{'  ' * depth}{kind} {target}".rstrip())
+        if kind == "Seq Scan":
+            findings.append(SCAN)
+        elif kind in ("Sort", "Incremental Sort"):
+            findings.append(SORT)
+        elif kind in ("Index Scan", "Index Only Scan") and not limited and "Index Cond" not in node:
+            findings.append(INDEX_SCAN)
+    return lines, findings
+
+
+async def explain(conn, statement: Statement):
+
+    if conn.dialect.name == "sqlite":
+        result = await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement.sql, statement.parameters)
+        statement.plan = [row[3] for row in result.all()]
+        statement.findings = _sqlite_findings(statement.sql, statement.plan)
+    else:
+        result = await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement.sql, statement.parameters)
+        document = result.scalar()
+        document = json.loads(document) if isinstance(document, str) else document
+        statement.plan, statement.findings = _postgres_findings(document[0]["Plan"])
+
+
+async def pick_sample(db) -> Sample:
+
+    from sqlalchemy import select
+    from app.models.model_blog import Blog
+    from app.models.model_user import User
+
+    blog_id, user_id = (await db.execute(
+        select(Blog.blog_id, Blog.user_id).filter(Blog.is_published == True).order_by(Blog.blog_id).limit(1)
+    )).one()
+    username = await db.scalar(select(User.username).filter(User.id == user_id))
+    category_id = await db.scalar(select(Blog.category_id).filter(Blog.category_id.is_not(None)).limit(1))
+    title = await db.scalar(select(Blog.title).filter(Blog.blog_id == blog_id))
+    term = max(re.findall(r"\w+", title) or ["blog"], key=len)
+    return Sample(blog_id, user_id, username, category_id or 0, term, datetime.utcnow() - timedelta(days=1))
+
+
+async def run(args) -> List[Statement]:
+
+    from sqlalchemy import event
+    from app.database.database import SessionLocal, create_table, engine
+    from app.models.model_contact import Contact  # noqa: F401, registers the table for create_table
+    from benchmarks.dataset import DatasetSize, seed_dataset
+
+    scenarios = build_scenarios()
+
+    await create_table()
+    if not args.no_seed:
+        size = DatasetSize(users=args.users, categories=args.categories, blogs=args.blogs, comments=args.comments)
+        async with SessionLocal() as db:
+            await seed_dataset(db, size, seed=args.seed)
+        if engine.dialect.name == "postgresql":
+            async with engine.begin() as conn:
+                await conn.exec_driver_sql("ANALYZE")
+
+    async with SessionLocal() as db:
+        sample = await pick_sample(db)
+
+    captured: Dict[Tuple[str, str], Statement] = {}
+    current: List[Optional[Scenario]] = [None]
+
+    def capture(conn, cursor, sql, parameters, context, executemany):
+        scenario = current[0]
+        if scenario is not None and not executemany and sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.setdefault((scenario.name, sql), Statement(scenario, sql, tuple(parameters or ())))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        for scenario in scenarios:
+            current[0] = scenario
+            async with SessionLocal() as db:
+                await scenario.run(db, sample)
+        current[0] = None
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    async with engine.connect() as conn:
+        for statement in captured.values():
+            await explain(conn, statement)
+
+    await engine.dispose()
+    return list(captured.values())
+
+
+def report(statements: List[Statement], verbose: bool) -> int:
+
+    problems = 0
+    for statement in statements:
+        unexpected = sorted(set(finding for finding in statement.findings if finding not in statement.scenario.expected))
+        expected = sorted(set(statement.findings) - set(unexpected))
+        problems += bool(unexpected)
+        status = "FLAG" if unexpected else "ok  "
+        notes = ", ".join(unexpected + [f"{finding} (expected)" for finding in expected])
+        print(f"{status} {statement.scenario.name}" + (f": {notes}" if notes else ""))
+        if verbose or unexpected:
+            print("       " + " ".join(statement.sql.split()))
+            for line in statement.plan:
+                print(f"         {line}")
+
+    print(f"\n{len(statements)} statements planned, {problems} flagged")
+    return 1 if problems else 0
+
+
+def main(argv=None):
+
+    args = parse_args(argv)
+    configure_environment(args)
+    with contextlib.redirect_stdout(sys.stderr):
+        statements = asyncio.run(run(args))
+    sys.exit(report(statements, args.verbose))
+
+
+if __name__ == "__main__":
+    main()
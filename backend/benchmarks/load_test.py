@@ -0,0 +1,230 @@
+"""In-process load test for the Blogifyy API.
+
+Seeds a synthetic dataset through the ORM models, drives the FastAPI app from
+main.py over an ASGI transport and prints per-route throughput and latency
+percentiles as JSON.
+
+    cd backend
+    python -m benchmarks.load_test --blogs 2000 --requests 5000 --concurrency 32
+
+By default a throwaway SQLite database is created in a temp directory; pass
+--database-url to run against an empty Postgres database instead.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+DEFAULT_MIX = "home=40,detail=30,search=15,comment=10,login=5"
+
+
+def parse_args(argv=None):
+
+    parser = argparse.ArgumentParser(description="Blogifyy end-to-end load test")
+    parser.add_argument("--database-url", default=None, help="Empty database to seed (default: temp SQLite file)")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--categories", type=int, default=10)
+    parser.add_argument("--blogs", type=int, default=1000)
+    parser.add_argument("--comments", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=2000, help="Measured requests")
+    parser.add_argument("--warmup", type=int, default=100, help="Unmeasured requests sent first")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Scenario weights, e.g. home=40,detail=30")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args):
+
+    if args.database_url is None:
+        workdir = tempfile.mkdtemp(prefix="blogifyy-bench-")
+        args.database_url = f"sqlite+aiosqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    os.environ["SQLALCHMEY_DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-benchmark-secret-key")
+    os.environ.setdefault("REFRESH_SECRET_KEY", "benchmark-refresh-key-benchmark-refresh-key")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+    os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "1")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name.strip()}', expected one of {', '.join(SCENARIOS)}")
+        weights[name.strip()] = int(weight or 1)
+    return weights
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+class Context:
+
+    def __init__(self, client, dataset, tokens, rng):
+        self.client = client
+        self.dataset = dataset
+        self.tokens = tokens
+        self.rng = rng
+
+    def auth(self) -> dict:
+        return {"Authorization": f"Bearer {self.rng.choice(self.tokens)}"}
+
+
+async def scenario_home(ctx: Context):
+    response = await ctx.client.get("/blogs/", params={"view": "summary", "limit": 20}, headers=ctx.auth())
+    return "GET /blogs/", response
+
+
+async def scenario_detail(ctx: Context):
+    blog_id = ctx.rng.choice(ctx.dataset.blog_ids)
+    response = await ctx.client.get(f"/blogs/{blog_id}/detail", params={"limit": 20}, headers=ctx.auth())
+    return "GET /blogs/{blog_id}/detail", response
+
+
+async def scenario_search(ctx: Context):
+    query = " ".join(ctx.rng.sample(ctx.dataset.vocabulary, ctx.rng.randint(1, 2)))
+    response = await ctx.client.get("/search/blogs", params={"q": query, "limit": 20})
+    return "GET /search/blogs", response
+
+
+async def scenario_comment(ctx: Context):
+    blog_id = ctx.rng.choice(ctx.dataset.blog_ids)
+    response = await ctx.client.post("/comments/", json={"content": "Benchmark comment", "blog_id": blog_id}, headers=ctx.auth())
+    return "POST /comments/", response
+
+
+async def scenario_login(ctx: Context):
+    from benchmarks.dataset import BENCHMARK_PASSWORD
+
+    username = ctx.rng.choice(ctx.dataset.usernames)
+    response = await ctx.client.post("/token/", data={"username": username, "password": BENCHMARK_PASSWORD})
+    return "POST /token/", response
+
+
+SCENARIOS = {
+    "home": scenario_home,
+    "detail": scenario_detail,
+    "search": scenario_search,
+    "comment": scenario_comment,
+    "login": scenario_login,
+}
+
+
+async def run(args) -> dict:
+
+    import httpx
+    from main import app
+    from app.database.database import SessionLocal
+    from benchmarks.dataset import BENCHMARK_PASSWORD, DatasetSize, seed_dataset
+
+    weights = parse_mix(args.mix)
+    names, cumulative = list(weights), list(weights.values())
+    rng = random.Random(args.seed)
+
+    async with app.router.lifespan_context(app):
+        size = DatasetSize(users=args.users, categories=args.categories, blogs=args.blogs, comments=args.comments)
+        started = time.perf_counter()
+        async with SessionLocal() as db:
+            dataset = await seed_dataset(db, size, seed=args.seed)
+        seed_seconds = time.perf_counter() - started
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            tokens = []
+            for username in dataset.usernames[:10]:
+                response = await client.post("/token/", data={"username": username, "password": BENCHMARK_PASSWORD})
+                response.raise_for_status()
+                tokens.append(response.json()["access_token"])
+
+            ctx = Context(client, dataset, tokens, rng)
+            latencies: Dict[str, List[float]] = defaultdict(list)
+            statuses: Dict[str, Counter] = defaultdict(Counter)
+            remaining = {"warmup": args.warmup, "measured": args.requests}
+
+            async def worker():
+                while remaining["warmup"] > 0 or remaining["measured"] > 0:
+                    measured = remaining["warmup"] <= 0
+                    remaining["measured" if measured else "warmup"] -= 1
+                    scenario = SCENARIOS[rng.choices(names, weights=cumulative)[0]]
+                    began = time.perf_counter()
+                    route, response = await scenario(ctx)
+                    elapsed = time.perf_counter() - began
+                    if measured:
+                        latencies[route].append(elapsed)
+                        statuses[route][response.status_code] += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            duration = time.perf_counter() - started
+
+    routes = {}
+    for route, values in sorted(latencies.items()):
+        values.sort()
+        errors = sum(count for code, count in statuses[route].items() if code >= 400)
+        routes[route] = {
+            "count": len(values),
+            "errors": errors,
+            "status": {str(code): count for code, count in sorted(statuses[route].items())},
+            "throughput_rps": round(len(values) / duration, 2),
+            "mean_ms": round(sum(values) / len(values) * 1000, 3),
+            "p50_ms": round(percentile(values, 50) * 1000, 3),
+            "p95_ms": round(percentile(values, 95) * 1000, 3),
+            "p99_ms": round(percentile(values, 99) * 1000, 3),
+            "max_ms": round(values[-1] * 1000, 3),
+        }
+
+    return {
+        "config": {
+            "database_url": args.database_url.split("@")[-1],
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "mix": weights,
+            "seed": args.seed,
+        },
+        "dataset": {**size.__dict__, "seed_seconds": round(seed_seconds, 3)},
+        "total": {
+            "requests": sum(route["count"] for route in routes.values()),
+            "errors": sum(route["errors"] for route in routes.values()),
+            "duration_s": round(duration, 3),
+            "throughput_rps": round(sum(route["count"] for route in routes.values()) / duration, 2),
+        },
+        "routes": routes,
+    }
+
+
+def main(argv=None):
+
+    args = parse_args(argv)
+    configure_environment(args)
+    with contextlib.redirect_stdout(sys.stderr):
+        report = asyncio.run(run(args))
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(payload + "\n")
+    else:
+        sys.stdout.write(payload + "\n")
+
+
+if __name__ == "__main__":
+    main()
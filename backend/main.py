@@ -1,20 +1,67 @@
-from fastapi import FastAPI
+from app.monitoring.startup import startup_report
+import asyncio
+from fastapi import Depends, FastAPI
 from contextlib import asynccontextmanager
-from app.database.database import create_table
-from app.routes import blog,user,comments,category,search,contact
+import sqlalchemy
+
+startup_report.mark("import framework")
+
+from app.database.database import SessionLocal, create_table
+from app.dao.dao_blog import BlogDAO
+from app.dao.contact_queue import contact_queue
+from app.dao.cover_images import cover_images
+from app.dao.feed_cache import FEED_CACHE_RELOAD_SECONDS, feed_cache
+from app.dao.password_hasher import shutdown_password_hasher
+from app.dao.view_counter import trending, view_counter
+from app.monitoring.metrics import MetricsMiddleware
+from app.ratelimit.limiter import (
+    CLIENT_IP, CLIENT_USER, WRITE_METHODS, RATE_LIMIT_AUTH, RATE_LIMIT_CONTACT, RATE_LIMIT_EXPORT, RATE_LIMIT_METRICS,
+    RATE_LIMIT_READ, RATE_LIMIT_SEARCH, RATE_LIMIT_WRITE, RateLimit
+)
+from app.routes import blog,user,comments,category,search,contact,metrics,export,feeds,covers
 from fastapi.middleware.cors import CORSMiddleware
 
+startup_report.mark("import app")
+
+async def warm_up():
+
+    # Runs once the worker is already serving; feed routes load the cache on demand if they get there first
+    try:
+        async with SessionLocal() as db:
+            filled = await BlogDAO(db).backfill_renders()
+        if filled:
+            print(f"Rendered content for {filled} blogs")
+        await feed_cache.ensure_loaded(SessionLocal)
+        await trending.ensure_loaded()
+    except Exception as e:
+        print(f"Error warming up caches: {e}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI): 
+    startup_report.mark("server start")
     try:
-        print("Creating database tables...")
-        await create_table()
-        print("Database tables created successfully")
+        migrated = await create_table()
+        startup_report.mark("schema", "migrated" if migrated else "up to date")
     except Exception as e:
         print(f"Error creating database tables: {e}")
         raise
+    warm_up_task = asyncio.create_task(warm_up())
+    reload_feeds = None
+    if FEED_CACHE_RELOAD_SECONDS > 0:
+        reload_feeds = asyncio.create_task(feed_cache.reload_periodically(SessionLocal, FEED_CACHE_RELOAD_SECONDS))
+    contact_queue.start()
+    view_counter.start()
+    startup_report.mark("background tasks")
+    startup_report.publish()
     yield  
     print("Shutting down...")
+    warm_up_task.cancel()
+    await contact_queue.drain()
+    await view_counter.drain()
+    await cover_images.close()
+    if reload_feeds is not None:
+        reload_feeds.cancel()
+    shutdown_password_hasher()
 
 
 app = FastAPI(
@@ -28,11 +75,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Export-Watermark"],
 )
+app.add_middleware(MetricsMiddleware)
+
+def limits(name: str, read: str = RATE_LIMIT_READ, write: str = RATE_LIMIT_WRITE, key: str = CLIENT_USER):
+    return [
+        Depends(RateLimit(f"{name}-read", read, key=key)),
+        Depends(RateLimit(f"{name}-write", write, key=key, methods=WRITE_METHODS)),
+    ]
+
+app.include_router(blog.router, dependencies=limits("blogs"))
+app.include_router(user.router, dependencies=[Depends(RateLimit("auth", RATE_LIMIT_AUTH, key=CLIENT_IP))])
+app.include_router(comments.router, dependencies=limits("comments"))
+app.include_router(search.router, dependencies=[Depends(RateLimit("search", RATE_LIMIT_SEARCH, key=CLIENT_USER))])
+app.include_router(category.router, dependencies=limits("categories"))
+app.include_router(contact.router, dependencies=[Depends(RateLimit("contact", RATE_LIMIT_CONTACT, key=CLIENT_IP))])
+app.include_router(export.router, dependencies=[Depends(RateLimit("export", RATE_LIMIT_EXPORT, key=CLIENT_USER))])
+app.include_router(feeds.router, dependencies=[Depends(RateLimit("feeds", RATE_LIMIT_READ, key=CLIENT_IP))])
+app.include_router(covers.router, dependencies=limits("covers"))
+app.include_router(metrics.router, dependencies=[Depends(RateLimit("metrics", RATE_LIMIT_METRICS, key=CLIENT_IP))])
 
-app.include_router(blog.router)
-app.include_router(user.router)
-app.include_router(comments.router)
-app.include_router(search.router)
-app.include_router(category.router)
-app.include_router(contact.router)
\ No newline at end of file
+startup_report.mark("build app")
\ No newline at end of file
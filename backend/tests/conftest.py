@@ -0,0 +1,48 @@
+import os
+import tempfile
+
+# Settings are read when app modules are imported, so the test database is chosen before any of them load
+os.environ["SQLALCHMEY_DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='blog-tests-')}/test.db"
+os.environ.pop("SQLALCHMEY_READ_DATABASE_URL", None)
+os.environ["COVER_IMAGE_PROVIDER"] = "stub"
+os.environ["STARTUP_REPORT"] = "false"
+os.environ.setdefault("SECRET_KEY", "test-secret-key-test-secret-key-0123")
+os.environ.setdefault("REFRESH_SECRET_KEY", "test-refresh-key-test-refresh-key-01")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+
+import pytest
+from app.database.database import Base, SessionLocal, create_table, engine
+from app.models import model_blog, model_blog_view, model_category, model_comment, model_contact, model_cover_image, model_user  # noqa: F401
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db():
+
+    await create_table()
+    async with SessionLocal() as session:
+        yield session
+    async with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            await conn.execute(table.delete())
+    # Pooled aiosqlite connections belong to this test's event loop
+    await engine.dispose()
+
+
+@pytest.fixture
+async def user_id(db) -> int:
+
+    from app.models.model_user import User
+
+    user = User(username="writer", email="writer@example.com", hashed_password="x")
+    db.add(user)
+    await db.flush()
+    user_id = user.id
+    await db.commit()
+    return user_id
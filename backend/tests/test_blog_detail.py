@@ -0,0 +1,25 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from app.dao.dao_blog import BlogDAO
+from app.dao.get_dao import get_blog_read_dao, get_current_user
+from app.routes import blog as blog_route
+from app.schemas.schema_user import CurrentUserDTO
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_detail_shows_the_author_without_their_email(db, user_id):
+
+    blogs = BlogDAO(db)
+    blog = await blogs.create_blog(title="Post", content="<p>Body</p>", is_published=True, category_id=None, user_id=user_id)
+
+    app = FastAPI()
+    app.include_router(blog_route.router)
+    app.dependency_overrides[get_blog_read_dao] = lambda: blogs
+    app.dependency_overrides[get_current_user] = lambda: CurrentUserDTO(id=999, username="reader")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(f"/blogs/{blog.blog_id}/detail")
+
+    assert response.status_code == 200
+    assert response.json()["user"] == {"id": user_id, "username": "writer"}
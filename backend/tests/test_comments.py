@@ -0,0 +1,23 @@
+import pytest
+from app.dao.dao_blog import BlogDAO
+from app.dao.dao_comment import CommentDAO
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_batch_read_caps_comments_per_blog(db, user_id):
+
+    blogs = BlogDAO(db)
+    busy = await blogs.create_blog(title="Busy", content="Body", is_published=True, category_id=None, user_id=user_id)
+    quiet = await blogs.create_blog(title="Quiet", content="Body", is_published=True, category_id=None, user_id=user_id)
+    comments = CommentDAO(db)
+    await comments.create_comments([{"content": f"comment {n}", "blog_id": busy.blog_id} for n in range(7)], user_id)
+    await comments.create_comments([{"content": "only one", "blog_id": quiet.blog_id}], user_id)
+
+    grouped = await comments.get_comments_by_blog_ids([busy.blog_id, quiet.blog_id, 999], per_blog=3)
+
+    # Oldest first, in the order the per-blog pages continue from
+    assert [comment["content"] for comment in grouped[busy.blog_id]] == ["comment 0", "comment 1", "comment 2"]
+    assert [comment["content"] for comment in grouped[quiet.blog_id]] == ["only one"]
+    assert grouped[999] == []
+    assert "position" not in grouped[busy.blog_id][0]
@@ -0,0 +1,172 @@
+import sqlite3
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from app.dao.dao_blog import BlogDAO
+from app.database import compress_content
+from app.database.compression import HEADER_RAW, HEADER_ZLIB, compress_text, decompress_text
+from app.database.database import Base, create_engine_for, engine
+from app.database.schema_version import schema_hash, sync_schema
+
+pytestmark = pytest.mark.anyio
+
+LONG_TEXT = "Compression keeps long articles small on disk. " * 40
+
+
+@pytest.fixture
+async def search_engine(tmp_path):
+
+    engine = create_engine_for(f"sqlite+aiosqlite:///{tmp_path}/search.db", name="search")
+    yield engine, f"{tmp_path}/search.db"
+    await engine.dispose()
+
+
+def _sqlite3_write(path: str, *statements: str):
+
+    # A plain sqlite3 client, without the blog_text() function the app registers on its own connections
+    with sqlite3.connect(path) as conn:
+        for statement in statements:
+            conn.execute(statement)
+
+
+async def _matches(engine, term: str) -> list:
+
+    async with engine.connect() as conn:
+        result = await conn.execute(text("SELECT rowid FROM blogs_fts WHERE blogs_fts MATCH :term ORDER BY rowid"), {"term": term})
+        return result.scalars().all()
+
+
+async def _storage(engine) -> list:
+
+    async with engine.connect() as conn:
+        return (await conn.execute(text("SELECT typeof(content) FROM blogs ORDER BY blog_id"))).scalars().all()
+
+
+@pytest.mark.parametrize("codec", ["zlib", "zstd"])
+def test_round_trip(codec):
+
+    if codec == "zstd":
+        pytest.importorskip("zstandard")
+    stored = compress_text(LONG_TEXT, codec)
+    assert isinstance(stored, bytes) and len(stored) < len(LONG_TEXT)
+    assert decompress_text(stored) == LONG_TEXT
+
+
+def test_small_and_incompressible_values_stay_text():
+
+    assert compress_text("short", "zlib") == "short"
+    assert compress_text(LONG_TEXT, "off") == LONG_TEXT
+    noise = "".join(chr(0x4E00 + (n * 7919) % 20000) for n in range(400))
+    assert decompress_text(compress_text(noise, "zlib")) == noise
+
+
+def test_headers():
+
+    assert decompress_text(None) is None
+    assert decompress_text("plain") == "plain"
+    assert decompress_text(bytes([HEADER_RAW]) + b"raw") == "raw"
+    assert compress_text(LONG_TEXT, "zlib")[0] == HEADER_ZLIB
+    with pytest.raises(ValueError):
+        decompress_text(b"\x7fgarbage")
+    with pytest.raises(ValueError):
+        compress_text(LONG_TEXT, "brotli")
+
+
+def test_schema_hash_follows_the_storage_mode():
+
+    dialect = engine.dialect
+    assert schema_hash(Base.metadata, dialect, compressed=False) != schema_hash(Base.metadata, dialect, compressed=True)
+    assert schema_hash(Base.metadata, dialect, compressed=False) == schema_hash(Base.metadata, dialect, compressed=False)
+
+
+async def test_plain_mode_keeps_sqlite3_clients_working(search_engine):
+
+    engine, path = search_engine
+    await sync_schema(engine, Base.metadata, compressed=False)
+
+    _sqlite3_write(
+        path,
+        "INSERT INTO users (id, username, email, hashed_password) VALUES (1, 'cli', 'cli@example.com', 'x')",
+        "INSERT INTO blogs (blog_id, title, content, search_text, is_published, user_id) VALUES (1, 'From a script', 'orchids everywhere', 'orchids everywhere', 1, 1)",
+        "UPDATE blogs SET content = 'tulips everywhere', search_text = 'tulips everywhere' WHERE blog_id = 1",
+    )
+    assert await _matches(engine, "tulips") == [1]
+    assert await _matches(engine, "orchids") == []
+
+
+async def test_compressed_mode_indexes_decompressed_text(search_engine):
+
+    engine, path = search_engine
+    await sync_schema(engine, Base.metadata, compressed=True)
+    async with engine.begin() as conn:
+        await conn.execute(text("INSERT INTO users (id, username, email, hashed_password) VALUES (1, 'app', 'app@example.com', 'x')"))
+        await conn.execute(
+            text("INSERT INTO blogs (blog_id, title, content, search_text, is_published, user_id) VALUES (1, 'Stored small', :content, :content, 1, 1)"),
+            {"content": compress_text(LONG_TEXT + " orchids", "zlib")},
+        )
+    assert await _storage(engine) == ["blob"]
+    assert await _matches(engine, "orchids") == [1]
+
+    # The triggers call blog_text(), which only the app's connections have
+    with pytest.raises(sqlite3.OperationalError, match="blog_text"):
+        _sqlite3_write(path, "UPDATE blogs SET title = 'Renamed' WHERE blog_id = 1")
+
+
+async def test_switching_modes_rebuilds_the_index(search_engine):
+
+    engine, path = search_engine
+    await sync_schema(engine, Base.metadata, compressed=False)
+    _sqlite3_write(
+        path,
+        "INSERT INTO users (id, username, email, hashed_password) VALUES (1, 'cli', 'cli@example.com', 'x')",
+        "INSERT INTO blogs (blog_id, title, content, search_text, is_published, user_id) VALUES (1, 'Plain', 'orchids', 'orchids', 1, 1)",
+    )
+
+    assert await sync_schema(engine, Base.metadata, compressed=True)
+    assert await _matches(engine, "orchids") == [1]
+    assert not await sync_schema(engine, Base.metadata, compressed=True)
+
+    # Nothing is stored compressed, so going back to plain lets sqlite3 clients write again
+    assert await sync_schema(engine, Base.metadata, compressed=False)
+    _sqlite3_write(path, "INSERT INTO blogs (blog_id, title, content, search_text, is_published, user_id) VALUES (2, 'Plain', 'orchids too', 'orchids too', 1, 1)")
+    assert await _matches(engine, "orchids") == [1, 2]
+
+
+async def test_plain_mode_keeps_blog_text_while_rows_are_compressed(search_engine):
+
+    engine, path = search_engine
+    await sync_schema(engine, Base.metadata, compressed=True)
+    async with engine.begin() as conn:
+        await conn.execute(text("INSERT INTO users (id, username, email, hashed_password) VALUES (1, 'app', 'app@example.com', 'x')"))
+        await conn.execute(
+            text("INSERT INTO blogs (blog_id, title, content, search_text, is_published, user_id) VALUES (1, 'Stored small', :content, :content, 1, 1)"),
+            {"content": compress_text(LONG_TEXT + " orchids", "zlib")},
+        )
+
+    await sync_schema(engine, Base.metadata, compressed=False)
+    assert await _matches(engine, "orchids") == [1]
+    async with engine.connect() as conn:
+        assert "blogs_search_source" in await conn.scalar(text("SELECT sql FROM sqlite_master WHERE name = 'blogs_fts'"))
+
+
+async def test_re_encode_command_round_trip(db, user_id):
+
+    blogs = BlogDAO(db)
+    blog = await blogs.create_blog(title="Long read", content=LONG_TEXT + " orchids", is_published=True, category_id=None, user_id=user_id)
+    path = make_url(str(engine.url)).database
+    assert await _storage(engine) == ["text"]
+
+    await compress_content.run(compress_content.parse_args(["--codec", "zlib"]))
+    assert await _storage(engine) == ["blob"]
+    assert await _matches(engine, "orchids") == [blog.blog_id]
+    db.expire_all()
+    stored = (await blogs.get_blogs_by_ids([blog.blog_id]))[0]
+    assert stored["content"] == LONG_TEXT + " orchids"
+    # Not an edit, so the validators clients hold stay current
+    assert (stored["modified_at"], stored["revision"]) == (blog.modified_at, blog.revision)
+
+    await compress_content.run(compress_content.parse_args(["--codec", "off"]))
+    assert await _storage(engine) == ["text"]
+    assert await _matches(engine, "orchids") == [blog.blog_id]
+    _sqlite3_write(path, f"UPDATE blogs SET content = 'tulips', search_text = 'tulips' WHERE blog_id = {blog.blog_id}")
+    assert await _matches(engine, "tulips") == [blog.blog_id]
@@ -0,0 +1,103 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from app.dao import contact_queue as contact_queue_module
+from app.dao.contact_queue import ContactWriteBehind
+from app.database.database import SessionLocal
+from app.models.model_contact import Contact
+
+pytestmark = pytest.mark.anyio
+
+
+def _contact(n: int) -> dict:
+    return {"name": f"name {n}", "email": f"{n}@example.com", "subject": "hello", "message": "message"}
+
+
+class FailingSession:
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionRefusedError("database is down")
+        return SessionLocal()
+
+
+class StuckSession:
+
+    async def __aenter__(self):
+        await asyncio.Event().wait()
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+async def _count(db) -> int:
+    return await db.scalar(select(func.count()).select_from(Contact))
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(contact_queue_module, "CONTACT_RETRY_BACKOFF", 0)
+
+
+async def test_submissions_are_written_in_batches_and_drained(db):
+
+    queue = ContactWriteBehind(SessionLocal, batch_size=3, flush_interval=60, max_size=100)
+    for n in range(7):
+        queue.submit(_contact(n))
+    await queue.drain(timeout=5)
+
+    assert queue._task.done()
+    assert await _count(db) == 7
+
+
+async def test_writer_retries_and_survives_a_failed_batch(db, monkeypatch):
+
+    monkeypatch.setattr(contact_queue_module, "CONTACT_WRITE_RETRIES", 2)
+    sessions = FailingSession(failures=3)
+    queue = ContactWriteBehind(sessions, batch_size=1, flush_interval=0, max_size=100)
+    queue.submit(_contact(1))
+    queue.submit(_contact(2))
+    queue.submit(_contact(3))
+    await queue.drain(timeout=5)
+
+    # The first batch fails both attempts and is dropped, the second succeeds on its retry, the third on its first try
+    assert sessions.calls == 5
+    assert await _count(db) == 2
+
+
+async def test_start_restarts_a_writer_that_stopped(db):
+
+    queue = ContactWriteBehind(SessionLocal, batch_size=10, flush_interval=0, max_size=100)
+    queue.start()
+    dead = queue._task
+    dead.cancel()
+    await asyncio.sleep(0)
+
+    queue.submit(_contact(1))
+    assert queue._task is not dead
+    await queue.drain(timeout=5)
+    assert await _count(db) == 1
+
+
+async def test_drain_with_a_full_queue_and_a_stuck_database_returns_by_the_deadline():
+
+    queue = ContactWriteBehind(StuckSession, batch_size=1, flush_interval=0, max_size=2)
+    queue.submit(_contact(0))
+    # The writer takes the first submission and hangs on the database, then the queue fills up behind it
+    await asyncio.sleep(0.01)
+    queue.submit(_contact(1))
+    queue.submit(_contact(2))
+    with pytest.raises(HTTPException):
+        queue.submit(_contact(3))
+
+    await asyncio.wait_for(queue.drain(timeout=0.1), timeout=2)
+    await asyncio.sleep(0)
+    assert queue._task.cancelled()
+    with pytest.raises(HTTPException):
+        queue.submit(_contact(4))
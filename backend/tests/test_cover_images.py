@@ -0,0 +1,154 @@
+import asyncio
+from datetime import timedelta
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import select
+from app.dao import cover_images as covers
+from app.dao.cover_images import CoverImageResolver, StubProvider
+from app.dao.get_dao import get_blog_read_dao, get_current_user
+from app.database.database import SessionLocal
+from app.models.model_cover_image import CoverImage
+from app.routes import covers as covers_route
+
+pytestmark = pytest.mark.anyio
+
+IMAGES = {"rust": "https://images.test/rust.jpg", "go": "https://images.test/go.jpg"}
+
+
+class SlowProvider(StubProvider):
+
+    # Holds every lookup until released, so concurrent requests overlap
+    def __init__(self, images):
+        super().__init__(images)
+        self.release = asyncio.Event()
+
+    async def search(self, term):
+
+        await self.release.wait()
+        return await super().search(term)
+
+
+def resolver(provider, size=16):
+    return CoverImageResolver(SessionLocal, provider, size, timedelta(hours=2), timedelta(hours=1), 4)
+
+
+def persisting(provider):
+
+    provider.persist = True
+    return provider
+
+
+async def _stored(db):
+    return {row.term: row.url for row in await db.scalars(select(CoverImage))}
+
+
+async def test_memory_tier_answers_repeated_lookups(db):
+
+    provider = StubProvider(IMAGES)
+    images = resolver(provider)
+    assert await images.resolve(["rust", "go", "rust"]) == {"rust": IMAGES["rust"], "go": IMAGES["go"]}
+    assert await images.resolve(["rust"]) == {"rust": IMAGES["rust"]}
+    assert provider.calls == ["rust", "go"]
+
+
+async def test_database_tier_is_shared_across_resolvers(db):
+
+    first = persisting(StubProvider(IMAGES))
+    await resolver(first).resolve(["rust", "haskell"])
+    assert await _stored(db) == {"rust": IMAGES["rust"], "haskell": None}
+
+    second = persisting(StubProvider(IMAGES))
+    assert await resolver(second).resolve(["rust", "haskell"]) == {"rust": IMAGES["rust"], "haskell": None}
+    assert second.calls == []
+
+
+async def test_stub_results_are_not_persisted(db):
+
+    provider = StubProvider(IMAGES)
+    assert await resolver(provider).resolve(["rust"]) == {"rust": IMAGES["rust"]}
+    assert await _stored(db) == {}
+
+
+async def test_hits_expire_after_the_ttl(db, monkeypatch):
+
+    start = covers._now()
+    provider = persisting(StubProvider(IMAGES))
+    images = resolver(provider)
+    await images.resolve(["rust"])
+
+    monkeypatch.setattr(covers, "_now", lambda: start + timedelta(minutes=90))
+    await images.resolve(["rust"])
+    assert provider.calls == ["rust"]
+
+    monkeypatch.setattr(covers, "_now", lambda: start + timedelta(hours=3))
+    await images.resolve(["rust"])
+    assert provider.calls == ["rust", "rust"]
+
+
+async def test_misses_expire_after_the_shorter_miss_ttl(db, monkeypatch):
+
+    start = covers._now()
+    provider = persisting(StubProvider(IMAGES))
+    images = resolver(provider)
+    assert await images.resolve(["haskell"]) == {"haskell": None}
+
+    monkeypatch.setattr(covers, "_now", lambda: start + timedelta(minutes=30))
+    await images.resolve(["haskell"])
+    assert provider.calls == ["haskell"]
+
+    # Past the miss TTL in memory and in the database, though still inside the hit TTL
+    monkeypatch.setattr(covers, "_now", lambda: start + timedelta(minutes=90))
+    provider.images["haskell"] = "https://images.test/haskell.jpg"
+    assert await images.resolve(["haskell"]) == {"haskell": "https://images.test/haskell.jpg"}
+    assert provider.calls == ["haskell", "haskell"]
+
+
+async def test_failed_lookups_are_retried(db):
+
+    class FailingProvider(StubProvider):
+        async def search(self, term):
+            await super().search(term)
+            raise RuntimeError("provider down")
+
+    provider = FailingProvider(IMAGES)
+    images = resolver(provider)
+    assert await images.resolve(["rust"]) == {"rust": None}
+    assert await images.resolve(["rust"]) == {"rust": None}
+    assert provider.calls == ["rust", "rust"]
+
+
+async def test_concurrent_lookups_share_one_provider_call(db):
+
+    provider = SlowProvider(IMAGES)
+    images = resolver(provider)
+    requests = [asyncio.create_task(images.resolve(["rust"])) for _ in range(5)]
+    await asyncio.sleep(0.05)
+    assert len(images.inflight) == 1
+    provider.release.set()
+
+    assert await asyncio.gather(*requests) == [{"rust": IMAGES["rust"]}] * 5
+    assert provider.calls == ["rust"]
+    assert images.inflight == {}
+
+
+async def test_memory_tier_is_bounded(db):
+
+    provider = StubProvider(IMAGES)
+    images = resolver(provider, size=2)
+    await images.resolve(["rust", "go", "haskell"])
+    assert list(images.entries) == ["go", "haskell"]
+
+
+async def test_route_rejects_batches_over_the_limit(monkeypatch):
+
+    monkeypatch.setattr(covers_route, "COVER_IMAGE_BATCH_LIMIT", 2)
+    app = FastAPI()
+    app.include_router(covers_route.router)
+    app.dependency_overrides[get_current_user] = lambda: None
+    app.dependency_overrides[get_blog_read_dao] = lambda: None
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/covers/", params={"category": ["a", "b", "c"]})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "At most 2 covers per request"
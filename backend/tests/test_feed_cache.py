@@ -0,0 +1,32 @@
+import asyncio
+import pytest
+from app.dao.feed_cache import FeedCache
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_reload_loop_survives_failed_loads(monkeypatch):
+
+    cache = FeedCache()
+    attempts = []
+
+    async def load(db):
+        attempts.append(db)
+        if len(attempts) < 3:
+            raise RuntimeError("decode failed")
+        cache.loaded = True
+
+    class Session:
+        async def __aenter__(self):
+            return "session"
+
+        async def __aexit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(cache, "load", load)
+    task = asyncio.create_task(cache.reload_periodically(Session, 0))
+    while len(attempts) < 4:
+        await asyncio.sleep(0)
+    assert not task.done()
+    assert cache.loaded
+    task.cancel()
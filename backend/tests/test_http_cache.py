@@ -0,0 +1,33 @@
+import pytest
+from app.dao.dao_blog import BlogDAO
+from app.dao.dao_comment import CommentDAO
+from app.routes.blog import BLOG_VALIDATORS
+from app.routes.comments import COMMENT_VALIDATORS
+from app.routes.http_cache import make_etag
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_blog_etag_changes_for_edits_within_one_second(db, user_id):
+
+    blogs = BlogDAO(db)
+    blog = await blogs.create_blog(title="Draft", content="First words", is_published=True, category_id=None, user_id=user_id)
+    first = await blogs.update_blog(blog.blog_id, user_id, title=None, is_published=None, content="Second words", category_id=None)
+    second = await blogs.update_blog(blog.blog_id, user_id, title=None, is_published=None, content="Third words", category_id=None)
+
+    assert (first.revision, second.revision) == (1, 2)
+    # Listings select columns by name, so the revision has to be among them for the validators to see it
+    listed = (await blogs.get_blogs_by_ids([blog.blog_id], ["title"]))[0]
+    assert listed["revision"] == 2
+    assert len({make_etag([row], BLOG_VALIDATORS) for row in (blog, first, second)}) == 3
+
+
+async def test_comment_etag_changes_for_edits_within_one_second(db, user_id):
+
+    blog = await BlogDAO(db).create_blog(title="Post", content="Body", is_published=True, category_id=None, user_id=user_id)
+    comments = CommentDAO(db)
+    comment = await comments.create_comment("first", blog.blog_id, user_id)
+    edited = await comments.update_comment(comment.comment_id, user_id, "second")
+
+    assert edited.revision == comment.revision + 1
+    assert make_etag([comment], COMMENT_VALIDATORS) != make_etag([edited], COMMENT_VALIDATORS)
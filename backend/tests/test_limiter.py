@@ -0,0 +1,129 @@
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from app.ratelimit import limiter
+from app.ratelimit.limiter import CLIENT_IP, WRITE_METHODS, MemoryBackend, RateLimit, parse_rate, set_backend
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class BrokenBackend:
+
+    async def take(self, key: str, rate: float, capacity: int) -> float:
+        raise ConnectionError("redis is down")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+
+    clock = Clock()
+    monkeypatch.setattr(limiter.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def backend(monkeypatch):
+
+    monkeypatch.setattr(limiter, "RATE_LIMIT_ENABLED", True)
+    backend = MemoryBackend()
+    set_backend(backend)
+    yield backend
+    set_backend(None)
+
+
+def _client(*dependencies) -> httpx.AsyncClient:
+
+    app = FastAPI(dependencies=[Depends(dependency) for dependency in dependencies])
+
+    @app.get("/items")
+    async def read_items():
+        return []
+
+    @app.post("/items")
+    async def create_item():
+        return {}
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.parametrize("spec, expected", [
+    ("10/minute", (10, 60)),
+    ("5 / 2 hours", (5, 7200)),
+    ("1/second", (1, 1)),
+    ("100/day", (100, 86400)),
+])
+def test_parse_rate(spec, expected):
+    assert parse_rate(spec) == expected
+
+
+@pytest.mark.parametrize("spec", ["", "ten/minute", "10/fortnight", "10 per minute"])
+def test_parse_rate_rejects(spec):
+    with pytest.raises(ValueError):
+        parse_rate(spec)
+
+
+async def test_bucket_allows_a_burst_then_refills(clock):
+
+    bucket = MemoryBackend()
+    assert [await bucket.take("k", rate=1.0, capacity=3) for _ in range(3)] == [0, 0, 0]
+    assert await bucket.take("k", rate=1.0, capacity=3) == pytest.approx(1.0)
+
+    clock.now += 2.5
+    assert await bucket.take("k", rate=1.0, capacity=3) == 0
+    assert await bucket.take("k", rate=1.0, capacity=3) == 0
+    assert await bucket.take("k", rate=1.0, capacity=3) == pytest.approx(0.5)
+    # Another key has its own bucket
+    assert await bucket.take("other", rate=1.0, capacity=3) == 0
+
+
+async def test_bucket_never_refills_past_capacity(clock):
+
+    bucket = MemoryBackend()
+    await bucket.take("k", rate=1.0, capacity=2)
+    clock.now += 3600
+    assert [await bucket.take("k", rate=1.0, capacity=2) for _ in range(3)][-1] > 0
+
+
+async def test_pruning_keeps_the_key_count_bounded(clock):
+
+    bucket = MemoryBackend(max_keys=3)
+    for n in range(10):
+        await bucket.take(f"k{n}", rate=1.0, capacity=1)
+    assert len(bucket.buckets) <= 3
+
+
+async def test_limit_answers_429_with_retry_after(clock, backend):
+
+    async with _client(RateLimit("items", "2/minute", key=CLIENT_IP)) as client:
+        assert [(await client.get("/items")).status_code for _ in range(2)] == [200, 200]
+        limited = await client.get("/items")
+        assert limited.status_code == 429
+        assert limited.headers["Retry-After"] == "30"
+
+        clock.now += 30
+        assert (await client.get("/items")).status_code == 200
+
+
+async def test_write_limit_only_counts_write_methods(clock, backend):
+
+    write = RateLimit("items-write", "1/minute", key=CLIENT_IP, methods=WRITE_METHODS)
+    async with _client(write) as client:
+        assert (await client.post("/items")).status_code == 200
+        assert [(await client.get("/items")).status_code for _ in range(5)] == [200] * 5
+        assert (await client.post("/items")).status_code == 429
+
+
+async def test_backend_failure_lets_requests_through(backend):
+
+    set_backend(BrokenBackend())
+    async with _client(RateLimit("items", "1/minute", key=CLIENT_IP)) as client:
+        assert [(await client.get("/items")).status_code for _ in range(3)] == [200, 200, 200]
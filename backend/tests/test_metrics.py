@@ -0,0 +1,40 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from app.database.database import create_engine_for
+from app.routes import metrics
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def client():
+
+    app = FastAPI()
+    app.include_router(metrics.router)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def test_metrics_is_not_served_without_a_token(client, monkeypatch):
+
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "")
+    assert (await client.get("/metrics", headers={"Authorization": "Bearer "})).status_code == 404
+
+
+async def test_metrics_requires_the_token(client, monkeypatch):
+
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "scrape-secret")
+    assert (await client.get("/metrics")).status_code == 401
+    assert (await client.get("/metrics", headers={"Authorization": "Bearer wrong"})).status_code == 401
+    response = await client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    assert "http_requests_total" in response.text
+
+
+async def test_pool_keeps_its_name_across_dispose(tmp_path):
+
+    engine = create_engine_for(f"sqlite+aiosqlite:///{tmp_path}/pool.db", name="replica")
+    async with engine.connect():
+        pass
+    await engine.dispose()
+    assert engine.pool.pool_name == "replica"
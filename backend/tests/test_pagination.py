@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert, text
+from app.dao.dao_blog import BlogDAO
+from app.dao.pagination import PageParams, decode_cursor, encode_cursor
+from app.models.model_blog import Blog
+
+pytestmark = pytest.mark.anyio
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+
+async def _seed(db, user_id, count: int, published=lambda i: True):
+
+    # Three posts per timestamp, so pages have to break ties on blog_id
+    await db.execute(insert(Blog), [
+        {
+            "title": f"post {i}", "content": f"body {i}", "is_published": published(i), "user_id": user_id,
+            "created_at": START + timedelta(minutes=i // 3), "modified_at": START,
+        }
+        for i in range(count)
+    ])
+    await db.commit()
+
+
+async def _all_pages(list_page, limit: int):
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = await list_page(PageParams(limit=limit, cursor=cursor))
+        assert len(page.items) <= limit
+        seen.extend(page.items)
+        pages += 1
+        cursor = page.next_cursor
+        if cursor is None:
+            return seen, pages
+
+
+async def test_pages_visit_every_row_once_in_order(db, user_id):
+
+    await _seed(db, user_id, 20)
+    items, pages = await _all_pages(lambda page: BlogDAO(db).get_all_blogs(page), limit=3)
+
+    ids = [item["blog_id"] for item in items]
+    assert len(ids) == len(set(ids)) == 20
+    assert pages == 7
+    keys = [(item["created_at"], item["blog_id"]) for item in items]
+    assert keys == sorted(keys, reverse=True)
+
+
+async def test_last_full_page_has_no_cursor(db, user_id):
+
+    await _seed(db, user_id, 6)
+    page = await BlogDAO(db).get_all_blogs(PageParams(limit=6))
+    assert len(page.items) == 6
+    assert page.next_cursor is None
+
+
+async def test_filters_apply_before_the_seek(db, user_id):
+
+    await _seed(db, user_id, 12, published=lambda i: i % 2 == 0)
+    items, _ = await _all_pages(lambda page: BlogDAO(db).get_all_blogs(page), limit=4)
+    assert sorted(item["blog_id"] for item in items) == list(range(1, 13, 2))
+
+
+async def test_total_counts_the_whole_listing(db, user_id):
+
+    await _seed(db, user_id, 7)
+    page = await BlogDAO(db).get_all_blogs(PageParams(limit=2, include_total=True))
+    assert page.total == 7
+    assert len(page.items) == 2
+
+
+def test_cursor_round_trip():
+
+    cursor = encode_cursor([START, 42])
+    assert decode_cursor(cursor, [Blog.created_at, Blog.blog_id]) == [START, 42]
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor([1]), encode_cursor(["x", "y"])])
+def test_bad_cursor_is_a_value_error(cursor):
+
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, [Blog.created_at, Blog.blog_id])
+
+
+
+async def test_ties_with_current_timestamp_text(db, user_id):
+
+    # Rows written by CURRENT_TIMESTAMP are stored without the ".000000" that SQLAlchemy adds
+    await _seed(db, user_id, 9)
+    await db.execute(text("UPDATE blogs SET created_at = substr(created_at, 1, 19)"))
+    await db.commit()
+
+    items, _ = await _all_pages(lambda page: BlogDAO(db).get_all_blogs(page), limit=2)
+    assert [item["blog_id"] for item in items] == list(range(9, 0, -1))
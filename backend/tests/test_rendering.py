@@ -0,0 +1,126 @@
+import pytest
+from sqlalchemy import update
+from app.dao.dao_blog import BlogDAO
+from app.models.model_blog import Blog
+from app.dao.rendering import LINK_REL, RenderCache, make_excerpt, render_content, render_cache, safe_url, sanitize_html
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("dirty, clean", [
+    ("<p>Hi <script>alert(1)</script>there</p>", "<p>Hi there</p>"),
+    ("<p onclick='steal()' style='color:red'>text</p>", '<p style="color: red">text</p>'),
+    ("<p style='position:fixed; background-color: url(javascript:x)'>text</p>", "<p>text</p>"),
+    ("<p class='ql-align-center hidden'>text</p>", '<p class="ql-align-center">text</p>'),
+    ("<li data-list='evil'>text</li>", "<li>text</li>"),
+    ("<style>p{}</style><iframe src='https://evil'><p>inside</p></iframe>after", "after"),
+    ("<svg><svg></svg><script>x</script></svg>kept", "kept"),
+    ("<custom>inner <b>bold</b></custom>", "inner <b>bold</b>"),
+    ("<ul><li>one<li>two</ul>", "<ul><li>one</li><li>two</li></ul>"),
+    ("<p><b>unclosed", "<p><b>unclosed</b></p>"),
+    ("<b><i>crossed</b></i>", "<b><i>crossed</i></b>"),
+    ("stray </div> close", "stray  close"),
+    ("1 < 2 &amp; 3 > 2", "1 &lt; 2 &amp; 3 &gt; 2"),
+    ("line<br/>break<hr>", "line<br>break<hr>"),
+    ("<img src='https://cdn.example/a.png' alt='A \"quoted\" alt' onerror='x'>", '<img src="https://cdn.example/a.png" alt="A &quot;quoted&quot; alt">'),
+    ("<pre class='language-python'>code</pre><code class='x\" onmouseover=\"y'>c</code>", '<pre class="language-python">code</pre><code>c</code>'),
+])
+def test_sanitize_html(dirty, clean):
+    assert sanitize_html(dirty) == clean
+
+
+def test_quill_output_keeps_lists_alignment_indentation_and_colours():
+
+    # As Quill 2 writes it to root.innerHTML with the toolbar the editor offers
+    quill = (
+        '<h2 class="ql-align-center">Heading</h2>'
+        '<ol><li data-list="bullet"><span class="ql-ui" contenteditable="false"></span>first</li>'
+        '<li data-list="bullet" class="ql-indent-1"><span class="ql-ui" contenteditable="false"></span>nested</li>'
+        '<li data-list="ordered"><span class="ql-ui" contenteditable="false"></span>numbered</li></ol>'
+        '<p class="ql-align-right ql-indent-2"><span style="color: rgb(230, 0, 0);">red</span> and '
+        '<span style="background-color: rgb(255, 255, 0);">marked</span> <sub>low</sub><sup>high</sup></p>'
+        '<p><a href="https://example.com" rel="noopener noreferrer" target="_blank">link</a>'
+        '<img src="data:image/png;base64,iVBORw0KGgo="></p>'
+    )
+    assert sanitize_html(quill) == (
+        '<h2 class="ql-align-center">Heading</h2>'
+        '<ol><li data-list="bullet"><span class="ql-ui"></span>first</li>'
+        '<li data-list="bullet" class="ql-indent-1"><span class="ql-ui"></span>nested</li>'
+        '<li data-list="ordered"><span class="ql-ui"></span>numbered</li></ol>'
+        '<p class="ql-align-right ql-indent-2"><span style="color: rgb(230, 0, 0)">red</span> and '
+        '<span style="background-color: rgb(255, 255, 0)">marked</span> <sub>low</sub><sup>high</sup></p>'
+        f'<p><a href="https://example.com" rel="{LINK_REL}">link</a>'
+        '<img src="data:image/png;base64,iVBORw0KGgo="></p>'
+    )
+    assert sanitize_html('<img src="data:image/svg+xml;base64,PHN2Zz4=">') == "<img>"
+
+
+@pytest.mark.parametrize("href", [
+    "javascript:alert(1)",
+    "JavaScript:alert(1)",
+    "java\tscript:alert(1)",
+    " \x01javascript:alert(1)",
+    "data:text/html;base64,PHNjcmlwdD4=",
+    "vbscript:msgbox",
+])
+def test_unsafe_urls_are_dropped(href):
+
+    assert not safe_url(href)
+    assert sanitize_html(f'<a href="{href}">link</a>') == f'<a rel="{LINK_REL}">link</a>'
+
+
+@pytest.mark.parametrize("href", ["https://example.com/a?b=1&c=2", "/relative/path", "#anchor", "mailto:me@example.com"])
+def test_safe_urls_are_kept(href):
+
+    assert safe_url(href)
+    assert 'href="' in sanitize_html(f'<a href="{href}">link</a>')
+
+
+def test_excerpt_cuts_plain_text_at_a_word():
+
+    content = "<h2>Title</h2><p>" + "word " * 100 + "</p><script>hidden()</script>"
+    excerpt = make_excerpt(content, length=50)
+    assert excerpt.startswith("Title word word")
+    assert excerpt.endswith("...") and len(excerpt) <= 53
+    assert "hidden" not in make_excerpt(content)
+    assert make_excerpt("<p>short &amp; sweet</p>") == "short & sweet"
+
+
+def test_render_content_counts_visible_words_only():
+
+    rendered = render_content("<p>" + "word " * 460 + "</p><script>" + "ignored " * 1000 + "</script>")
+    assert rendered.word_count == 460
+    assert rendered.reading_minutes == 2
+    assert render_content("").reading_minutes == 1
+
+
+def test_render_cache_is_keyed_by_content_and_bounded():
+
+    cache = RenderCache(size=2)
+    first, second = render_content("<p>first</p>"), render_content("<p>second</p>")
+    cache.put("<p>first</p>", first)
+    cache.put("<p>second</p>", second)
+    assert cache.get("<p>first</p>") is first and cache.get("<p>second</p>") is second
+    cache.put("<p>third</p>", first)
+    assert cache.get("<p>first</p>") is None
+    assert len(cache.entries) == 2
+
+
+async def test_edits_within_one_second_never_serve_an_old_rendering(db, user_id):
+
+    blogs = BlogDAO(db)
+    blog = await blogs.create_blog(title="Post", content="<p>first draft</p>", is_published=True, category_id=None, user_id=user_id)
+    assert render_cache.get(blog.content) is not None
+
+    # Another worker stores a new version within the same second, so modified_at stays put
+    await db.execute(
+        update(Blog)
+        .where(Blog.blog_id == blog.blog_id)
+        .values(content="<p>second draft</p>", content_html="<p>second draft</p>", modified_at=Blog.modified_at, rendered_at=Blog.rendered_at)
+    )
+    await db.commit()
+    db.expire_all()
+
+    fetched = await blogs.get_blogs_by_id(blog.blog_id)
+    assert fetched.modified_at == blog.modified_at
+    assert fetched.content_html == "<p>second draft</p>"
@@ -0,0 +1,95 @@
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.dao.dao_blog import BlogDAO
+from app.dao.dao_user import UserDAO
+from app.database.database import Base, create_engine_for
+from app.database.schema_version import sync_schema
+
+pytestmark = pytest.mark.anyio
+
+# The tables as the first release created them, before any column was added to the models
+BASELINE_DDL = (
+    """CREATE TABLE users (
+        id INTEGER NOT NULL PRIMARY KEY,
+        username VARCHAR NOT NULL UNIQUE,
+        email VARCHAR NOT NULL UNIQUE,
+        hashed_password VARCHAR NOT NULL
+    )""",
+    """CREATE TABLE categories (
+        category_id INTEGER NOT NULL PRIMARY KEY,
+        name VARCHAR(50) NOT NULL UNIQUE,
+        description TEXT,
+        user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE
+    )""",
+    """CREATE TABLE blogs (
+        blog_id INTEGER NOT NULL PRIMARY KEY,
+        title VARCHAR NOT NULL,
+        content TEXT NOT NULL,
+        modified_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        is_published BOOLEAN NOT NULL,
+        user_id INTEGER REFERENCES users (id),
+        category_id INTEGER REFERENCES categories (category_id)
+    )""",
+    """CREATE TABLE comments (
+        comment_id INTEGER NOT NULL PRIMARY KEY,
+        content TEXT NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        modified_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        user_id INTEGER REFERENCES users (id),
+        blog_id INTEGER REFERENCES blogs (blog_id)
+    )""",
+    """CREATE TABLE contacts (
+        id INTEGER NOT NULL PRIMARY KEY,
+        name VARCHAR NOT NULL,
+        email VARCHAR NOT NULL,
+        subject VARCHAR NOT NULL,
+        message TEXT NOT NULL
+    )""",
+    "INSERT INTO users (id, username, email, hashed_password) VALUES (1, 'early', 'early@example.com', 'x')",
+    "INSERT INTO blogs (blog_id, title, content, is_published, user_id) VALUES (1, 'First', 'Written before the upgrade', 1, 1)",
+)
+
+
+@pytest.fixture
+async def legacy_engine(tmp_path):
+
+    engine = create_engine_for(f"sqlite+aiosqlite:///{tmp_path}/legacy.db", name="legacy")
+    async with engine.begin() as conn:
+        for statement in BASELINE_DDL:
+            await conn.execute(text(statement))
+    yield engine
+    await engine.dispose()
+
+
+async def _columns(engine, table: str) -> set:
+
+    async with engine.connect() as conn:
+        return await conn.run_sync(lambda sync_conn: {column["name"] for column in inspect(sync_conn).get_columns(table)})
+
+
+async def test_upgrade_adds_token_version_to_existing_users(legacy_engine):
+
+    assert await sync_schema(legacy_engine, Base.metadata)
+    assert "token_version" in await _columns(legacy_engine, "users")
+
+    async with async_sessionmaker(legacy_engine, expire_on_commit=False)() as db:
+        users = UserDAO(db)
+        user = await users.get_user_by_username("early")
+        assert users.token_claims(user) == {"sub": "early", "uid": 1, "ver": 0}
+        updated = await users.update_password(user.id, "a-new-password")
+        assert updated.token_version == 1
+
+
+async def test_upgrade_adds_and_backfills_blog_excerpts(legacy_engine):
+
+    assert await sync_schema(legacy_engine, Base.metadata)
+    assert {"excerpt", "content_html", "word_count", "reading_minutes", "rendered_at"} <= await _columns(legacy_engine, "blogs")
+
+    async with async_sessionmaker(legacy_engine, expire_on_commit=False)() as db:
+        blogs = BlogDAO(db)
+        assert (await blogs.get_blogs_by_ids([1], ["excerpt"]))[0]["excerpt"] is None
+        assert await blogs.backfill_renders() == 1
+        assert (await blogs.get_blogs_by_ids([1], ["excerpt"]))[0]["excerpt"] == "Written before the upgrade"
+        assert await blogs.backfill_renders() == 0
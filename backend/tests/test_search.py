@@ -0,0 +1,117 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import text
+from app.dao.dao_blog import BlogDAO
+from app.dao.get_dao import get_blog_read_dao
+from app.routes import search
+
+pytestmark = pytest.mark.anyio
+
+
+async def _create(blogs: BlogDAO, user_id: int, title: str, content: str, is_published: bool = True) -> int:
+
+    blog = await blogs.create_blog(title=title, content=content, is_published=is_published, category_id=None, user_id=user_id)
+    return blog.blog_id
+
+
+async def _ids(blogs: BlogDAO, query: str, **kwargs) -> list:
+    return [blog["blog_id"] for blog in await blogs.search_blogs(query, **kwargs)]
+
+
+async def test_markup_is_neither_matched_nor_returned(db, user_id):
+
+    blogs = BlogDAO(db)
+    await _create(blogs, user_id, "Async tips", "<p>python asyncio &lt;b&gt;bold&lt;/b&gt; <script>alert(1)</script> <strong>loops</strong></p>")
+
+    for tag in ("script", "strong", "alert"):
+        assert await _ids(blogs, tag) == []
+
+    [result] = await blogs.search_blogs("python")
+    assert result["snippet"] == "<mark>python</mark> asyncio &lt;b&gt;bold&lt;/b&gt; loops"
+
+
+async def test_title_matches_rank_above_content_matches(db, user_id):
+
+    blogs = BlogDAO(db)
+    in_content = await _create(blogs, user_id, "Weekend notes", "<p>A few words about gardening and orchids.</p>")
+    in_title = await _create(blogs, user_id, "Orchids", "<p>A few words about gardening.</p>")
+
+    results = await blogs.search_blogs("orchids")
+    assert [blog["blog_id"] for blog in results] == [in_title, in_content]
+    assert results[0]["rank"] > results[1]["rank"]
+
+
+async def test_only_published_blogs_are_found(db, user_id):
+
+    blogs = BlogDAO(db)
+    published = await _create(blogs, user_id, "Orchids", "<p>Public</p>")
+    await _create(blogs, user_id, "Orchids draft", "<p>Private</p>", is_published=False)
+
+    assert await _ids(blogs, "orchids") == [published]
+
+
+async def test_terms_match_as_prefixes(db, user_id):
+
+    blogs = BlogDAO(db)
+    blog_id = await _create(blogs, user_id, "Notes", "<p>Concurrency in python</p>")
+
+    assert await _ids(blogs, "pyth") == [blog_id]
+    assert await _ids(blogs, "concur pyth") == [blog_id]
+    assert await _ids(blogs, "ython") == []
+
+
+async def test_updates_and_deletes_keep_the_index_current(db, user_id):
+
+    blogs = BlogDAO(db)
+    blog_id = await _create(blogs, user_id, "Orchids", "<p>Growing tulips</p>")
+
+    await blogs.update_blog(blog_id, user_id, "Roses", None, "<p>Growing lilies</p>", None)
+    assert await _ids(blogs, "orchids") == []
+    assert await _ids(blogs, "tulips") == []
+    assert await _ids(blogs, "roses lilies") == [blog_id]
+
+    await blogs.delete_blog(blog_id, user_id)
+    assert await _ids(blogs, "roses") == []
+
+
+async def test_limit_and_offset_page_through_results(db, user_id):
+
+    blogs = BlogDAO(db)
+    ids = [await _create(blogs, user_id, "Orchids", "<p>Same text</p>") for _ in range(4)]
+
+    # Equal ranks fall back to the newest blog first
+    assert await _ids(blogs, "orchids", limit=2) == ids[::-1][:2]
+    assert await _ids(blogs, "orchids", limit=2, offset=2) == ids[::-1][2:]
+    assert await _ids(blogs, "orchids", limit=2, offset=4) == []
+
+
+async def test_rows_written_without_search_text_are_found_after_backfill(db, user_id):
+
+    await db.execute(text(
+        "INSERT INTO blogs (blog_id, title, content, is_published, user_id) VALUES (100, 'Imported', '<p>orchids</p>', 1, :user_id)"
+    ), {"user_id": user_id})
+    await db.commit()
+
+    blogs = BlogDAO(db)
+    assert await _ids(blogs, "orchids") == []
+    assert await blogs.backfill_renders() == 1
+    assert await _ids(blogs, "orchids") == [100]
+
+
+async def test_summary_results_keep_rank_and_snippet(db, user_id):
+
+    blogs = BlogDAO(db)
+    await _create(blogs, user_id, "Indoor plants", "<p>Growing orchids indoors</p>")
+
+    app = FastAPI()
+    app.include_router(search.router)
+    app.dependency_overrides[get_blog_read_dao] = lambda: blogs
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        [summary] = (await client.get("/search/blogs", params={"q": "orchids", "view": "summary"})).json()
+        [chosen] = (await client.get("/search/blogs", params={"q": "orchids", "fields": "title"})).json()
+
+    assert "content" not in summary
+    assert summary["rank"] > 0
+    assert summary["snippet"] == "Growing <mark>orchids</mark> indoors"
+    assert "rank" not in chosen and "snippet" not in chosen
@@ -0,0 +1,106 @@
+import asyncio
+import pytest
+from sqlalchemy import select
+from app.dao.dao_blog import BlogDAO
+from app.dao.view_counter import TrendingCache, ViewCounter, current_hour
+from app.database.database import SessionLocal
+from app.models.model_blog_view import BlogView
+from app.monitoring.metrics import blog_views_dropped_total
+
+pytestmark = pytest.mark.anyio
+
+
+def _broken_session():
+    raise ConnectionRefusedError("database is down")
+
+
+def _counter(session_factory=SessionLocal, max_pending: int = 100) -> ViewCounter:
+    return ViewCounter(session_factory, TrendingCache(SessionLocal, 10), flush_interval=60, max_pending=max_pending)
+
+
+async def _views(db) -> dict:
+    return {view.blog_id: view.views for view in await db.scalars(select(BlogView))}
+
+
+async def test_flush_upserts_counts_into_the_hour_row(db):
+
+    counter = _counter()
+    counter.closing = True
+    for blog_id in (1, 1, 2):
+        counter.record(blog_id)
+    assert await counter.flush() == 3
+    counter.record(1)
+    assert await counter.flush() == 1
+    assert await counter.flush() == 0
+
+    assert await _views(db) == {1: 3, 2: 1}
+    assert (await db.scalar(select(BlogView.hour))) == current_hour()
+
+
+async def test_failed_flush_keeps_the_counts_for_the_next_one(db):
+
+    counter = _counter(_broken_session)
+    counter.closing = True
+    counter.record(1)
+    counter.record(1)
+    assert await counter.flush() == 0
+    counter.record(1)
+
+    counter.session_factory = SessionLocal
+    assert await counter.flush() == 3
+    assert await _views(db) == {1: 3}
+
+
+async def test_pending_counts_are_bounded_while_flushes_fail():
+
+    counter = _counter(_broken_session, max_pending=2)
+    counter.closing = True
+    dropped = sum(blog_views_dropped_total.values.values())
+    for blog_id in (1, 2, 3, 4, 1):
+        counter.record(blog_id)
+
+    assert dict(counter.pending) == {(1, current_hour()): 2, (2, current_hour()): 1}
+    assert sum(blog_views_dropped_total.values.values()) - dropped == 2
+
+
+async def test_record_restarts_a_writer_that_stopped(db):
+
+    counter = _counter()
+    counter.start()
+    dead = counter._task
+    dead.cancel()
+    await asyncio.sleep(0)
+
+    counter.record(1)
+    assert counter._task is not dead and not counter._task.done()
+    await counter.drain(timeout=5)
+    assert await _views(db) == {1: 1}
+
+
+async def test_drain_logs_a_failed_writer_instead_of_raising(db):
+
+    async def broken():
+        raise RuntimeError("bug in the writer")
+
+    counter = _counter()
+    counter._task = asyncio.create_task(broken())
+    counter.pending[(1, current_hour())] = 5
+    await counter.drain(timeout=5)
+    assert await _views(db) == {1: 5}
+
+
+async def test_trending_ranks_published_blogs_by_views(db, user_id):
+
+    blogs = BlogDAO(db)
+    quiet = await blogs.create_blog(title="Quiet", content="Body", is_published=True, category_id=None, user_id=user_id)
+    popular = await blogs.create_blog(title="Popular", content="Body", is_published=True, category_id=None, user_id=user_id)
+    draft = await blogs.create_blog(title="Draft", content="Body", is_published=False, category_id=None, user_id=user_id)
+
+    counter = _counter()
+    counter.closing = True
+    for blog_id in [quiet.blog_id] + [popular.blog_id] * 3 + [draft.blog_id] * 5:
+        counter.record(blog_id)
+    await counter.flush()
+    await counter.trending.refresh()
+
+    assert [(item["blog_id"], item["views"]) for item in counter.trending.items] == [(popular.blog_id, 3), (quiet.blog_id, 1)]
@@ -1,42 +1,25 @@
-import { useState, useEffect } from 'react';
 import { HistoryState, Link } from '@tanstack/react-router';
-import { fetchPexelImage } from './get-pexel-image';
 import { Blog } from '@/interface/Blog';
 
 interface BlogCardProps {
     blog: Blog;
     convertHtmlToText: (html: string) => string;
+    imageUrl: string;
+    isLoading?: boolean;
   }
 
 interface CustomHistoryState extends HistoryState{
 author? : number;
 }
 
-const BlogCard = ({ blog, convertHtmlToText }: BlogCardProps) => {
-  const [imageUrl, setImageUrl] = useState<string | null>(null);
-  const [isLoading, setIsLoading] = useState(true);
-
-  useEffect(() => {
-    const loadImage = async () => {
-      try {
-        const url = await fetchPexelImage(blog.title);
-        setImageUrl(url);
-      } catch (error) {
-        console.error("Error loading image:", error);
-      } finally {
-        setIsLoading(false);
-      }
-    };
-    
-    loadImage();
-  }, [blog.title]);
+const BlogCard = ({ blog, convertHtmlToText, imageUrl, isLoading = false }: BlogCardProps) => {
 
     return (
         <div className="bg-white rounded-2xl shadow-sm hover:shadow-xl transition-all duration-300 overflow-hidden">
         <div
             className="h-48 bg-cover bg-center relative"
             style={{ 
-            backgroundImage: !isLoading ? `url(${imageUrl || '/florian-klauer-mk7D-4UCfmg-unsplash.jpg'})` : 'none'
+            backgroundImage: !isLoading ? `url(${imageUrl})` : 'none'
             }}
         >
             {isLoading && (
@@ -47,7 +30,7 @@ const BlogCard = ({ blog, convertHtmlToText }: BlogCardProps) => {
         </div>
         <div className="p-6">
             <h3 className="text-xl font-semibold text-gray-800 mb-3 line-clamp-2">{blog.title}</h3>
-            <p className="text-gray-600 line-clamp-3 mb-4">{convertHtmlToText(blog.content.slice(0,150))}</p>
+            <p className="text-gray-600 line-clamp-3 mb-4">{blog.excerpt ?? convertHtmlToText(blog.content.slice(0,150))}</p>
             <Link
             to="/blogs/$blogid"
             params={{ blogid: String(blog.blog_id) }}
@@ -2,9 +2,8 @@ import React, { useState } from 'react';
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Trash2, Edit2, Check, X } from "lucide-react";
-import { useQuery} from "@tanstack/react-query";
-import { fetchComments } from "@/services/comment.service";
 import { useComments } from '@/hooks/use-comment';
+import LoadMore from '@/components/load-more';
 
 
 interface CommentsProps {
@@ -18,12 +17,7 @@ const CommentComponent = ({ blogId, currentUserId, isBlogAuthor }: CommentsProps
   const [editingCommentId, setEditingCommentId] = useState<number | null>(null);
   const [editedContent, setEditedContent] = useState("");
 
-  const {createCommentMutation, updateCommentMutation, deleteCommentMutation} = useComments(blogId)
-
-  const { data: comments = [], isLoading } = useQuery({
-    queryKey: ["comments", blogId],
-    queryFn: () => fetchComments(blogId),
-  });
+  const {comments, isLoading, loadMoreComments, createCommentMutation, updateCommentMutation, deleteCommentMutation} = useComments(blogId)
 
   const handleSubmitComment = (e: React.FormEvent) => {
     e.preventDefault();
@@ -181,6 +175,7 @@ const CommentComponent = ({ blogId, currentUserId, isBlogAuthor }: CommentsProps
             </div>
           </div>
         ))}
+        <LoadMore {...loadMoreComments} label="Show more comments" autoLoad={false} />
       </div>
     </div>
   );
@@ -0,0 +1,42 @@
+import { useEffect, useRef } from "react";
+import { Loader2 } from "lucide-react";
+import { Button } from "@/components/ui/button";
+import { LoadMore as LoadMoreState } from "@/hooks/use-paged-query";
+
+interface LoadMoreProps extends LoadMoreState {
+  label?: string;
+  autoLoad?: boolean;
+}
+
+// Requests the next page when scrolled into view, with a button for when the observer does not fire
+const LoadMore = ({ hasNextPage, isFetchingNextPage, fetchNextPage, label = "Load more", autoLoad = true }: LoadMoreProps) => {
+  const ref = useRef<HTMLDivElement>(null);
+
+  useEffect(() => {
+    const element = ref.current;
+    if (!autoLoad || !element || !hasNextPage) return;
+    const observer = new IntersectionObserver((entries) => {
+      if (entries[0].isIntersecting && !isFetchingNextPage) fetchNextPage();
+    }, { rootMargin: "200px" });
+    observer.observe(element);
+    return () => observer.disconnect();
+  }, [autoLoad, hasNextPage, isFetchingNextPage, fetchNextPage]);
+
+  if (!hasNextPage) return null;
+
+  return (
+    <div ref={ref} className="col-span-full flex justify-center py-6">
+      <Button
+        variant="outline"
+        onClick={() => fetchNextPage()}
+        disabled={isFetchingNextPage}
+        className="rounded-full border-purple-300 text-purple-600 hover:bg-purple-50 px-6 py-2 flex items-center gap-2"
+      >
+        {isFetchingNextPage && <Loader2 className="animate-spin" size={16} />}
+        {label}
+      </Button>
+    </div>
+  );
+};
+
+export default LoadMore;
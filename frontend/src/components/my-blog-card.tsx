@@ -1,32 +1,15 @@
-import { useState, useEffect } from 'react';
 import { Link } from '@tanstack/react-router';
 import { PenSquare } from 'lucide-react';
 import { Blog } from '@/interface/Blog';
-import { fetchPexelImage } from './get-pexel-image';
 
 interface MyBlogCardProps {
   blog: Blog;
   convertHtmlToText?: (html: string) => string;
+  imageUrl: string;
+  isLoading?: boolean;
 }
 
-const MyBlogCard = ({ blog, convertHtmlToText }: MyBlogCardProps) => {
-  const [imageUrl, setImageUrl] = useState<string | null>(null);
-  const [isLoading, setIsLoading] = useState(true);
-
-  useEffect(() => {
-    const loadImage = async () => {
-      try {
-        const url = await fetchPexelImage(blog.title);
-        setImageUrl(url);
-      } catch (error) {
-        console.error("Error loading image:", error);
-      } finally {
-        setIsLoading(false);
-      }
-    };
-    
-    loadImage();
-  }, [blog.title]);
+const MyBlogCard = ({ blog, convertHtmlToText, imageUrl, isLoading = false }: MyBlogCardProps) => {
 
   const getStatusColor = (isPublished: boolean) => {
     return isPublished 
@@ -51,7 +34,7 @@ const MyBlogCard = ({ blog, convertHtmlToText }: MyBlogCardProps) => {
         className="h-48 bg-cover bg-center relative"
         style={{ 
           backgroundImage: !isLoading 
-            ? `url(${imageUrl || '/florian-klauer-mk7D-4UCfmg-unsplash.jpg'})` 
+            ? `url(${imageUrl})` 
             : 'none'
         }}
       >
@@ -72,7 +55,7 @@ const MyBlogCard = ({ blog, convertHtmlToText }: MyBlogCardProps) => {
         </h3>
         
         <p className="text-gray-600 mb-6 line-clamp-3">
-          {formatContent(blog.content)}
+          {blog.excerpt ?? formatContent(blog.content)}
         </p>
 
         <div className="flex items-center justify-between">
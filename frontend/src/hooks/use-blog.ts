@@ -11,19 +11,20 @@ import {
 
 import { Blog } from "@/interface/Blog";
 import { isAuthenticated } from "@/services/auth.service";
+import { usePagedQuery } from "./use-paged-query";
 
 export const useBlogs = () => {
   const queryClient = useQueryClient();
   const user = isAuthenticated();
 
-  const { data: blogs, isLoading, isError, error, isFetching } = useQuery({
+  const { items: blogs, isLoading, isError, error, isFetching, loadMore: loadMoreBlogs } = usePagedQuery({
     queryKey: ["blogs"],
     queryFn: getBlogs,
   });
 
-  const { data: userBlogs, isLoading: isUserBlogsLoading, isError: isUserBlogsError, error: userBlogsError} = useQuery({
+  const { items: userBlogs, isLoading: isUserBlogsLoading, isError: isUserBlogsError, error: userBlogsError, loadMore: loadMoreUserBlogs } = usePagedQuery({
     queryKey: ["userBlogs", localStorage.getItem("user_id")],
-    queryFn: () => getBlogsByUserId(Number(localStorage.getItem("user_id"))),
+    queryFn: (cursor) => getBlogsByUserId(Number(localStorage.getItem("user_id")), cursor),
     enabled: user,
     retry: false
   });
@@ -53,6 +54,8 @@ export const useBlogs = () => {
   return {
     blogs,
     userBlogs,
+    loadMoreBlogs,
+    loadMoreUserBlogs,
     isLoading,
     isUserBlogsLoading,
     isUserBlogsError,
@@ -67,9 +70,9 @@ export const useBlogs = () => {
 };
 
 export const useCategoryBlogs = (catId?: number) => {
-  return useQuery({
+  return usePagedQuery({
     queryKey: ["categoryBlogs", catId],
-    queryFn: () => getBlogsByCategoryId(catId!),
+    queryFn: (cursor) => getBlogsByCategoryId(catId!, cursor),
     enabled: !!catId,
   });
 };
@@ -1,13 +1,14 @@
-import { useMutation, useQuery, useQueryClient} from "@tanstack/react-query";
+import { useMutation, useQueryClient} from "@tanstack/react-query";
 import {
   getCategories,
   createCategory,
 } from "@/services/category.service";
+import { usePagedQuery } from "./use-paged-query";
 
 export const useCategories = () => {
   const queryClient = useQueryClient();
 
-  const { data: categories, isLoading, isError, error, isFetching } = useQuery({
+  const { items: categories, isLoading, isError, error, isFetching, loadMore: loadMoreCategories } = usePagedQuery({
     queryKey: ["categories"],
     queryFn: getCategories,
   });
@@ -21,6 +22,7 @@ export const useCategories = () => {
 
   return {
     categories,
+    loadMoreCategories,
     isLoading,
     isFetching,
     isError,
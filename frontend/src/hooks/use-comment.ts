@@ -1,19 +1,19 @@
-import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
+import { useMutation, useQueryClient } from "@tanstack/react-query";
 import {
   fetchComments,
   createComment,
   updateComment,
   deleteComment,
 } from "@/services/comment.service";
-import { BlogComment } from "@/interface/Comments";
 import { Flip, toast } from 'react-toastify';
+import { usePagedQuery } from "./use-paged-query";
 
 export const useComments = (blogId: number) => {
   const queryClient = useQueryClient();
 
-  const commentsQuery = useQuery<BlogComment[], Error>({
+  const commentsQuery = usePagedQuery({
     queryKey: ["comments", blogId],
-    queryFn: () => fetchComments(blogId),
+    queryFn: (cursor) => fetchComments(blogId, cursor),
   });
 
     const createCommentMutation = useMutation({
@@ -76,8 +76,9 @@ export const useComments = (blogId: number) => {
     });
 
   return {
-    comments: commentsQuery.data ?? [],
+    comments: commentsQuery.items ?? [],
     isLoading: commentsQuery.isLoading,
+    loadMoreComments: commentsQuery.loadMore,
     createCommentMutation,
     updateCommentMutation,
     deleteCommentMutation,
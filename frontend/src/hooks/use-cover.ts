@@ -0,0 +1,20 @@
+import { useQuery } from "@tanstack/react-query";
+import { getCoverImages } from "@/services/cover.service";
+
+export const DEFAULT_COVER = "/florian-klauer-mk7D-4UCfmg-unsplash.jpg";
+
+// One request for every card on the page; the backend caches the results and the query keeps them for an hour
+export const useCoverImages = ({ blogIds = [], categories = [] }: { blogIds?: number[]; categories?: string[] }) => {
+  const { data: covers, isLoading } = useQuery({
+    queryKey: ["covers", blogIds, categories],
+    queryFn: () => getCoverImages({ blogIds, categories }),
+    enabled: blogIds.length > 0 || categories.length > 0,
+    staleTime: 60 * 60 * 1000,
+  });
+
+  return {
+    blogCover: (blogId: number) => covers?.blogs[blogId] || DEFAULT_COVER,
+    categoryCover: (name: string) => covers?.categories[name] || DEFAULT_COVER,
+    isLoading,
+  };
+};
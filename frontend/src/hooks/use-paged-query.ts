@@ -0,0 +1,37 @@
+import { useMemo } from "react";
+import { QueryKey, useInfiniteQuery } from "@tanstack/react-query";
+import { Page } from "@/services/pagination";
+
+export interface LoadMore {
+  hasNextPage: boolean;
+  isFetchingNextPage: boolean;
+  fetchNextPage: () => unknown;
+}
+
+interface PagedQueryOptions<T> {
+  queryKey: QueryKey;
+  queryFn: (cursor?: string) => Promise<Page<T>>;
+  enabled?: boolean;
+  retry?: boolean;
+}
+
+// Loads one page at a time; the next one is only requested through loadMore, never drained up front
+export const usePagedQuery = <T>({ queryKey, queryFn, enabled, retry }: PagedQueryOptions<T>) => {
+  const query = useInfiniteQuery({
+    queryKey,
+    queryFn: ({ pageParam }) => queryFn(pageParam),
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (lastPage: Page<T>) => lastPage.nextCursor,
+    enabled,
+    retry,
+  });
+
+  const items = useMemo(() => query.data?.pages.flatMap((page) => page.items), [query.data]);
+  const loadMore: LoadMore = {
+    hasNextPage: query.hasNextPage,
+    isFetchingNextPage: query.isFetchingNextPage,
+    fetchNextPage: query.fetchNextPage,
+  };
+
+  return { ...query, items, loadMore };
+};
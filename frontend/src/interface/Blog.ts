@@ -8,4 +8,9 @@ export interface Blog {
     user_id : number;
     category_id : number;
     thumbnail?:any;
+    excerpt? : string;
+    content_html? : string;
+    word_count? : number;
+    reading_minutes? : number;
+    revision? : number;
 }
\ No newline at end of file
@@ -36,7 +36,7 @@ export default function BlogCreatePage({
 
   const navigate = useNavigate();
   const { createMutation, updateMutation, deleteMutation } = useBlogs();
-  const { categories } = useCategories();
+  const { categories, loadMoreCategories } = useCategories();
   const [title, setTitle] = useState(initialTitle);
   const [content, setContent] = useState(initialContent);
   const [isPublished, setIsPublished] = useState(initialIsPublished);
@@ -220,6 +220,17 @@ export default function BlogCreatePage({
                       </SelectItem>
                     ))}
                   </SelectGroup>
+                  {loadMoreCategories.hasNextPage && (
+                    <Button
+                      type="button"
+                      variant="ghost"
+                      onClick={() => loadMoreCategories.fetchNextPage()}
+                      disabled={loadMoreCategories.isFetchingNextPage}
+                      className="w-full text-purple-600 hover:bg-purple-50"
+                    >
+                      More categories
+                    </Button>
+                  )}
                 </SelectContent>
               </Select>
 
@@ -3,9 +3,12 @@ import { Loader2, PenSquare, Plus, AlertCircle, ArrowLeft } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { useNavigate } from "@tanstack/react-router";
 import MyBlogCard from "@/components/my-blog-card";
+import { useCoverImages } from "@/hooks/use-cover";
+import LoadMore from "@/components/load-more";
 
 export default function BlogPage() {
-  const { userBlogs, isLoading, isError } = useBlogs();
+  const { userBlogs, loadMoreUserBlogs, isLoading, isError } = useBlogs();
+  const { blogCover, isLoading: isCoversLoading } = useCoverImages({ blogIds: userBlogs?.map((blog: any) => blog.blog_id) });
   const navigate = useNavigate();
 
   const handleGoBack = () => {
@@ -77,8 +80,11 @@ export default function BlogPage() {
                 key={blog.blog_id} 
                 blog={blog}
                 convertHtmlToText={convertHtmlToText} // Make sure you have this function available
+                imageUrl={blogCover(blog.blog_id)}
+                isLoading={isCoversLoading}
               />
             ))}
+            <LoadMore {...loadMoreUserBlogs} label="Load more stories" />
           </div>
         )}
       </div>
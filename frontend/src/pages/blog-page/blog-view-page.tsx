@@ -13,7 +13,7 @@ export default function BlogViewPage() {
       blogId={blog.blog_id}
       author = {Number(author)}
       initialTitle={blog.title}
-      initialContent={blog.content}
+      initialContent={blog.content_html ?? blog.content}
       initialIsPublished={blog.is_published}
       initialCategoryId={blog.category_id}
     />
@@ -1,6 +1,6 @@
 import {Dialog,DialogContent,DialogDescription,DialogHeader,DialogTitle,DialogTrigger,DialogFooter} from "@/components/ui/dialog";
 import { useCategories } from "@/hooks/use-category";
-import { useEffect, useState } from "react";
+import { useState } from "react";
 import { BlogCategory, CategoryWithImage } from "@/interface/Category";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
@@ -8,12 +8,12 @@ import { Label } from "@/components/ui/label";
 import { Textarea } from "@/components/ui/textarea";
 import { ArrowLeft } from "lucide-react";
 import { CategoryCard } from "@/components/category-card";
-import { fetchPexelImage } from "@/components/get-pexel-image";
+import { useCoverImages } from "@/hooks/use-cover";
 import { Flip, toast } from "react-toastify";
+import LoadMore from "@/components/load-more";
 
 const CategoriesPage = () => {
-  const { categories, isLoading, isError, createMutation } = useCategories();
-  const [categoriesWithImages, setCategoriesWithImages] = useState<CategoryWithImage[]>([]);
+  const { categories, loadMoreCategories, isLoading, isError, createMutation } = useCategories();
   const [newCategory, setNewCategory] = useState({ name: "", description: "" });
   const [isDialogOpen, setIsDialogOpen] = useState(false);
 
@@ -36,21 +36,11 @@ const CategoriesPage = () => {
     setNewCategory(prev => ({ ...prev, [name]: value }));
   };
 
-  useEffect(() => {
-    const addImages = async () => {
-      if (categories) {
-        const withImages: CategoryWithImage[] = await Promise.all(
-          categories.map(async (category: BlogCategory) => ({
-            ...category,
-            imageUrl: await fetchPexelImage(category.name) || '/florian-klauer-mk7D-4UCfmg-unsplash.jpg'
-          }))
-        );
-        setCategoriesWithImages(withImages);
-      }
-    };
-
-    addImages();
-  }, [categories]);
+  const { categoryCover } = useCoverImages({ categories: categories?.map((category: BlogCategory) => category.name) });
+  const categoriesWithImages: CategoryWithImage[] = (categories ?? []).map((category: BlogCategory) => ({
+    ...category,
+    imageUrl: categoryCover(category.name)
+  }));
 
   if (isLoading) {
     return (
@@ -152,6 +142,7 @@ const CategoriesPage = () => {
                 imageUrl={category.imageUrl}
               />
             ))}
+            <LoadMore {...loadMoreCategories} label="Load more categories" />
           </div>
         </div>
       </div>
@@ -1,8 +1,13 @@
-import { useLoaderData } from "@tanstack/react-router";
+import { useParams } from "@tanstack/react-router";
 import { Link } from "@tanstack/react-router";
 import { Blog } from "@/interface/Blog";
 import { Button } from "@/components/ui/button";
-import { ArrowLeft } from "lucide-react";
+import { ArrowLeft, Loader2 } from "lucide-react";
+import { useCategoryBlogs } from "@/hooks/use-blog";
+import LoadMore from "@/components/load-more";
+
+// Category listings also carry the category's name on every row
+type CategoryBlog = Blog & { name?: string };
 
 export default function CategoriesBlogPage() {
   
@@ -10,9 +15,19 @@ export default function CategoriesBlogPage() {
     window.history.back();
   };
 
-  const blogs = useLoaderData({from: "/blogs/category/$catid"});
-  
-  if (!blogs || blogs.length === 0) {
+  const { catid } = useParams({from: "/blogs/category/$catid"});
+  const { items, loadMore, isLoading } = useCategoryBlogs(Number(catid));
+  const blogs = (items ?? []) as CategoryBlog[];
+
+  if (isLoading) {
+    return (
+      <div className="h-screen flex justify-center pt-20">
+        <Loader2 className="animate-spin text-purple-600" size={40} />
+      </div>
+    );
+  }
+
+  if (blogs.length === 0) {
     return (
       <div className="h-screen bg-gradient-to-br from-purple-50 to-white overflow-hidden">
         <div className="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8 pt-20">
@@ -55,7 +70,7 @@ export default function CategoriesBlogPage() {
         </div>
 
         <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-8">
-          {blogs.map((blog: Blog) => (
+          {blogs.map((blog: CategoryBlog) => (
             <div
               key={blog.blog_id}
               className="bg-white rounded-2xl shadow-sm hover:shadow-xl transition-all duration-300 overflow-hidden"
@@ -66,7 +81,7 @@ export default function CategoriesBlogPage() {
               />
               <div className="p-6">
                 <h3 className="text-xl font-semibold text-gray-800 mb-3 line-clamp-2">{blog.title}</h3>
-                <p className="text-gray-600 line-clamp-3 mb-4">{blog.content}</p>
+                <p className="text-gray-600 line-clamp-3 mb-4">{blog.excerpt ?? blog.content}</p>
                 <Link
                   to="/blogs/$blogid"
                   params={{ blogid: String(blog.blog_id) }}
@@ -77,6 +92,7 @@ export default function CategoriesBlogPage() {
               </div>
             </div>
           ))}
+          <LoadMore {...loadMore} label="Load more stories" />
           </div>
         </div>
       </div>
@@ -10,31 +10,38 @@ import { Blog } from "@/interface/Blog";
 import { BlogCategory } from "@/interface/Category";
 import { Search, PenSquare, BookOpen, Loader2 } from "lucide-react";
 import BlogCard from '@/components/blog-card';
+import { useCoverImages } from "@/hooks/use-cover";
+import LoadMore from '@/components/load-more';
 
 export default function HomePage() {
 
   const navigate = useNavigate();
   const isAuthenticated = useAuth();
-  const { blogs: defaultBlogs, isLoading: isBlogsLoading, isError: isBlogsError } = useBlogs();
-  const { categories, isLoading: isCategoriesLoading, isError: isCategoriesError} = useCategories();
+  const { blogs: defaultBlogs, loadMoreBlogs, isLoading: isBlogsLoading, isError: isBlogsError } = useBlogs();
+  const { categories, loadMoreCategories, isLoading: isCategoriesLoading, isError: isCategoriesError} = useCategories();
   const [searchQuery, setSearchQuery] = useState("");
   const [activeCategoryId, setActiveCategoryId] = useState<number | null>(null);
-  const { data: categoryBlogs, isLoading: isCategoryBlogsLoading } = useCategoryBlogs(activeCategoryId!);
+  const { items: categoryBlogs, loadMore: loadMoreCategoryBlogs, isLoading: isCategoryBlogsLoading } = useCategoryBlogs(activeCategoryId!);
   
   const convertHtmlToText = (html: string) => {
     const doc = new DOMParser().parseFromString(html, "text/html");
     return doc.body.textContent || "";
   };
   
+  const blogsToShow = activeCategoryId ? categoryBlogs : defaultBlogs;
+  const loadMore = activeCategoryId ? loadMoreCategoryBlogs : loadMoreBlogs;
+  // Covers for every loaded page, so typing in the search box filters cards without new lookups
+  const blogIds = useMemo(() => (blogsToShow ?? []).map((blog: Blog) => blog.blog_id), [blogsToShow]);
+  const { blogCover, isLoading: isCoversLoading } = useCoverImages({ blogIds });
+
   const filteredBlogs = useMemo(() => {
-    const blogsToFilter = activeCategoryId ? categoryBlogs : defaultBlogs;
-    if (!blogsToFilter) return [];
+    if (!blogsToShow) return [];
     
-    return blogsToFilter.filter((blog: Blog) => 
+    return blogsToShow.filter((blog: Blog) => 
       blog.title.toLowerCase().includes(searchQuery.toLowerCase()) ||
       blog.content.toLowerCase().includes(searchQuery.toLowerCase())
     );
-  }, [searchQuery, defaultBlogs, categoryBlogs, activeCategoryId]);
+  }, [searchQuery, blogsToShow]);
 
   useEffect(() => {
     if (!isAuthenticated) {
@@ -115,6 +122,16 @@ export default function HomePage() {
               </Button>
             ))
           )}
+          {loadMoreCategories.hasNextPage && (
+            <Button
+              variant="ghost"
+              onClick={() => loadMoreCategories.fetchNextPage()}
+              disabled={loadMoreCategories.isFetchingNextPage}
+              className="rounded-full px-6 py-2 text-purple-600 hover:bg-purple-50"
+            >
+              More categories
+            </Button>
+          )}
         </div>
 
         {isBlogsLoading || isCategoryBlogsLoading ? (
@@ -128,13 +145,16 @@ export default function HomePage() {
                 key={blog.blog_id} 
                 blog={blog}
                 convertHtmlToText={convertHtmlToText} 
+                imageUrl={blogCover(blog.blog_id)}
+                isLoading={isCoversLoading}
               />
             ))}
-            {filteredBlogs.length === 0 && (
+            {filteredBlogs.length === 0 && !loadMore.hasNextPage && (
               <div className="col-span-full text-center py-12">
                 <p className="text-gray-500 text-lg">No stories found matching your criteria</p>
               </div>
             )}
+            <LoadMore {...loadMore} label="Load more stories" />
           </div>
         )}
       </div>
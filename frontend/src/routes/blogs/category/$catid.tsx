@@ -1,4 +1,3 @@
-import { getBlogsByCategoryId } from '@/services/blog.service'
 import CategoriesBlogPage from '@/pages/categories/category-blog-page';
 import { createFileRoute, redirect} from '@tanstack/react-router'
 import { isAuthenticated } from '@/services/auth.service';
@@ -9,9 +8,6 @@ export const Route = createFileRoute('/blogs/category/$catid')({
           return redirect({ to: "/login" });
         }
       },
+    // Pages are fetched by the component through useCategoryBlogs, so it can load more as the reader scrolls
     component: CategoriesBlogPage,
-    loader: async({params}) => {
-        const blogData = await getBlogsByCategoryId(Number(params.catid));
-        return blogData
-}
 })
@@ -1,15 +1,15 @@
 import {api} from "./auth.service";
 import { Blog } from "@/interface/Blog";
+import { Page, getPage } from "./pagination";
 
 export const createBlog = async (blogData: Partial<Blog>) => {
     const response = await api.post("/blogs/", blogData);
     return response.data;
   };
   
-export const getBlogs = async () => {
+export const getBlogs = async (cursor?: string): Promise<Page<Blog>> => {
   try {
-    const response = await api.get("/blogs/");
-    return response.data;
+    return await getPage<Blog>("/blogs/", {}, cursor);
   } catch (err) {
     console.error("Failed to fetch blogs:", err);
     throw new Error("An error occurred while fetching blogs. Please try again later.");
@@ -22,16 +22,14 @@ export const getBlogById = async (blogId: number) => {
   return response.data;
 };
 
-export const getBlogsByUserId = async (userId?: number) => {
+export const getBlogsByUserId = async (userId?: number, cursor?: string): Promise<Page<Blog>> => {
   if (!userId) throw new Error("User ID is not present");
-  const response = await api.get(`/blogs/${userId}/?get_type=USER`);
-  return response.data;
+  return getPage<Blog>(`/blogs/${userId}/`, { get_type: "USER" }, cursor);
 };
 
-export const getBlogsByCategoryId = async (catId?: number) => {
+export const getBlogsByCategoryId = async (catId?: number, cursor?: string): Promise<Page<Blog>> => {
   if (!catId) throw new Error("Category ID is not present");
-  const response = await api.get(`/blogs/${catId}/?get_type=CATG`);
-  return response.data;
+  return getPage<Blog>(`/blogs/${catId}/`, { get_type: "CATG" }, cursor);
 };
 
 export const updateBlog = async (blogId: number, updatedData: Partial<Blog>) => {
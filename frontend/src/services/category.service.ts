@@ -1,13 +1,15 @@
 import {api} from "./auth.service";
+import { BlogCategory } from "@/interface/Category";
+import { MAX_PAGE_SIZE, Page, getPage } from "./pagination";
 
 export const createCategory = async (categoryData: { name: string; description?: string }) => {
 const response = await api.post("/categories", categoryData);
 return response.data;
 };
 
-export const getCategories = async () => {
-const response = await api.get("/categories");
-return response.data;
+// Categories are short rows shown as chips and select options, so they come in the largest pages
+export const getCategories = async (cursor?: string): Promise<Page<BlogCategory>> => {
+return getPage<BlogCategory>("/categories", {}, cursor, MAX_PAGE_SIZE);
 };
 
 export const getCategoryById = async (categoryId: number) => {
@@ -1,5 +1,6 @@
 import {api} from "./auth.service";
 import { BlogComment } from "@/interface/Comments";
+import { Page, getPage } from "./pagination";
 
 export const createComment = async (commentData: { content: string; blog_id: number }) => {
     const response = await api.post("/comments/", commentData);
@@ -20,7 +21,6 @@ export const deleteComment = async (commentId: number) => {
 await api.delete(`/comments/${commentId}`);
 };
 
-export const fetchComments = async (blogId: number): Promise<BlogComment[]> => {
-  const response = await api.get(`/comments/blogs/${blogId}/comments`);
-  return response.data;
+export const fetchComments = async (blogId: number, cursor?: string): Promise<Page<BlogComment>> => {
+  return getPage<BlogComment>(`/comments/blogs/${blogId}/comments`, {}, cursor);
 };
\ No newline at end of file
@@ -0,0 +1,14 @@
+import {api} from "./auth.service";
+
+export interface CoverImages {
+  blogs: Record<number, string | null>;
+  categories: Record<string, string | null>;
+}
+
+export const getCoverImages = async ({ blogIds = [], categories = [] }: { blogIds?: number[]; categories?: string[] }): Promise<CoverImages> => {
+  const params = new URLSearchParams();
+  blogIds.forEach((blogId) => params.append("blog_id", String(blogId)));
+  categories.forEach((name) => params.append("category", name));
+  const response = await api.get(`/covers/?${params.toString()}`);
+  return response.data;
+};
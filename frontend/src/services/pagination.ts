@@ -0,0 +1,20 @@
+import {api} from "./auth.service";
+
+// List endpoints put the cursor for the next page in X-Next-Cursor; the API serves at most 100 items per page
+export const PAGE_SIZE = 20;
+export const MAX_PAGE_SIZE = 100;
+
+export interface Page<T> {
+  items: T[];
+  nextCursor?: string;
+}
+
+export const getPage = async <T = any>(
+  path: string,
+  params: Record<string, string | number> = {},
+  cursor?: string,
+  limit: number = PAGE_SIZE,
+): Promise<Page<T>> => {
+  const response = await api.get(path, { params: { ...params, limit, ...(cursor ? { cursor } : {}) } });
+  return { items: response.data, nextCursor: response.headers["x-next-cursor"] || undefined };
+};